@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from trplots.plot_utils import adjust_bracket_positions
+
+
+def _recursive_positions(brackets, base_y, bracket_height, bracket_hspace):
+    """段の探索を1段ずつ再帰的に行う以前の配置 (search_y_pos) の再現"""
+
+    def search_y_pos(confirmed, b, y):
+        is_overlapped = any(
+            b["x1"] <= c["x2"]
+            and b["x2"] >= c["x1"]
+            and b["y_bottom"] <= c["y_bar"]
+            and b["y_bar"] >= c["y_bottom"]
+            for c in confirmed
+        )
+        if not is_overlapped:
+            return y
+        new_y = y + bracket_hspace
+        for c in confirmed:
+            if (
+                b["x1"] < c["x2"]
+                and b["x2"] > c["x1"]
+                and new_y < c["y_bar"]
+                and new_y + bracket_height > c["y_bottom"]
+            ):
+                return search_y_pos(confirmed, b, new_y)
+        return new_y
+
+    confirmed = []
+    for b in brackets:
+        b = {**b, "y_bottom": base_y, "y_bar": base_y + bracket_height}
+        b["y_bottom"] = search_y_pos(confirmed, b, base_y)
+        b["y_bar"] = b["y_bottom"] + bracket_height
+        confirmed.append(b)
+    return confirmed
+
+
+def _random_brackets(rng, n_boxes, n_brackets):
+    brackets = []
+    for _ in range(n_brackets):
+        x1, x2 = sorted(rng.integers(0, n_boxes, 2) * 0.5)
+        brackets.append({"x1": x1, "x2": x2, "mark": "*"})
+    # 呼び出し元と同じく短いブラケットから配置する
+    brackets.sort(key=lambda b: b["x2"] - b["x1"])
+    return brackets
+
+
+# 高さ間隔に対して高さが整数倍になる場合 (上下で接する場合) を含む
+@pytest.mark.parametrize(
+    "bracket_height, bracket_hspace",
+    [
+        (0.25, 0.25),
+        (0.5, 0.25),
+        (0.75, 0.25),
+        (0.25, 0.5),
+        (0.3, 0.125),
+        (0.1, 0.03),
+    ],
+)
+def test_adjust_bracket_positions_matches_recursive_search(
+    bracket_height, bracket_hspace
+):
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        brackets = _random_brackets(
+            rng, int(rng.integers(2, 9)), int(rng.integers(1, 12))
+        )
+        expected = _recursive_positions(brackets, 0.0, bracket_height, bracket_hspace)
+        actual = adjust_bracket_positions(
+            [dict(b) for b in brackets], 0.0, bracket_height, bracket_hspace
+        )
+        np.testing.assert_allclose(
+            [b["y_bottom"] for b in actual],
+            [b["y_bottom"] for b in expected],
+            atol=1e-9,
+        )
@@ -0,0 +1,87 @@
+import io
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.axes import Axes
+
+import trplots as trp
+
+
+@pytest.fixture
+def legend_calls(monkeypatch):
+    calls = []
+    original = Axes.legend
+
+    def legend(self, *args, **kwargs):
+        calls.append(self)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Axes, "legend", legend)
+    return calls
+
+
+def _box_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "group": rng.integers(0, 3, n),
+            "category": rng.choice(["A", "B", "C"], n),
+            "value": rng.normal(size=n),
+        }
+    )
+
+
+def _legend_texts(ax):
+    return [text.get_text() for text in ax.get_legend().get_texts()]
+
+
+def test_legend_is_built_once_in_configure_ax(legend_calls):
+    fig, ax = plt.subplots()
+    trp_box = trp.TrendPlots(ax)
+    trp_box.add_box_mean_plot(
+        _box_data(), "group", "value", "category", is_add_jitter=True
+    )
+    assert legend_calls == []
+
+    trp_box.configure_ax(
+        "x", "y", legend_correspondence_dict={"A": "a", "B": "b", "C": "c"}
+    )
+    fig.savefig(io.BytesIO())
+    plt.close(fig)
+
+    assert len(legend_calls) == 1
+    assert _legend_texts(ax) == ["a", "b", "c"]
+
+
+def test_legend_is_built_once_on_first_draw(legend_calls):
+    fig, ax = plt.subplots()
+    locator = ax.get_axes_locator()
+    trp_box = trp.TrendPlots(ax)
+    trp_box.add_box_mean_plot(_box_data(), "group", "value", "category")
+    assert ax.get_legend() is None
+
+    fig.savefig(io.BytesIO())
+    fig.savefig(io.BytesIO())
+    plt.close(fig)
+
+    assert len(legend_calls) == 1
+    assert _legend_texts(ax) == ["A", "B", "C"]
+    assert ax.get_legend().get_title().get_text() == "category"
+    assert ax.get_axes_locator() is locator
+
+
+def test_tight_layout_includes_deferred_legend(legend_calls):
+    fig, ax = plt.subplots()
+    trp_box = trp.TrendPlots(ax)
+    trp_box.add_box_mean_plot(_box_data(), "group", "value", "category")
+    fig.tight_layout()
+    plt.close(fig)
+
+    assert len(legend_calls) == 1
+    assert ax.get_legend() is not None
@@ -0,0 +1,37 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+import trplots as trp
+
+
+@pytest.mark.parametrize("decimate", [None, "minmax"])
+@pytest.mark.parametrize("is_datetime", [False, True])
+def test_appended_plot_matches_full_plot(decimate, is_datetime):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(3000, 4)).cumsum(0), columns=list("aabb"))
+    data.iloc[500:510, :2] = np.nan
+    if is_datetime:
+        data.index = pd.date_range("2024-01-01", periods=len(data), freq="min")
+
+    fig, ax = plt.subplots()
+    trp_live = trp.TrendPlots(ax)
+    trp_live.add_line_mean_sd_plot(data.iloc[:100], decimate=decimate)
+    for start in range(100, len(data), 100):
+        trp_live.update_line_mean_sd_plot(data.iloc[start : start + 100], append=True)
+    fig_full, ax_full = plt.subplots()
+    trp.TrendPlots(ax_full).add_line_mean_sd_plot(data, decimate=decimate)
+    fig.canvas.draw()
+    fig_full.canvas.draw()
+    plt.close(fig)
+    plt.close(fig_full)
+
+    np.testing.assert_allclose(ax.get_xlim(), ax_full.get_xlim())
+    np.testing.assert_allclose(ax.get_ylim(), ax_full.get_ylim())
+    for line, line_full in zip(ax.lines, ax_full.lines):
+        np.testing.assert_array_equal(line.get_xydata(), line_full.get_xydata())
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import trplots as trp
+from trplots.plot_stats import _betainc
+
+
+def test_adjust_p_values_holm():
+    p_adj = trp.adjust_p_values([0.01, 0.04, 0.03, 0.005, np.nan], "holm")
+    np.testing.assert_allclose(p_adj, [0.03, 0.06, 0.06, 0.02, np.nan])
+
+
+def test_adjust_p_values_fdr_bh():
+    p_adj = trp.adjust_p_values([0.01, 0.04, 0.03, 0.005, np.nan], "fdr_bh")
+    np.testing.assert_allclose(p_adj, [0.02, 0.04, 0.04, 0.02, np.nan])
+
+
+def test_adjust_p_values_is_capped_at_one():
+    p_adj = trp.adjust_p_values([0.5, 0.9, 0.2], "holm")
+    np.testing.assert_allclose(p_adj, [1.0, 1.0, 0.6])
+
+
+def test_adjust_p_values_rejects_unknown_correction():
+    with pytest.raises(ValueError):
+        trp.adjust_p_values([0.01], "sidak")
+
+
+def test_p_to_mark():
+    marks = trp.p_to_mark([0.0005, 0.001, 0.005, 0.049, 0.05, np.nan], ns_mark="ns")
+    assert marks == ["***", "**", "**", "*", "ns", "ns"]
+
+
+def test_p_to_mark_uses_none_without_ns_mark():
+    assert trp.p_to_mark([0.2, 0.02]) == [None, "*"]
+
+
+# t分布表の両側検定の臨界値 (自由度, t値, p値)
+@pytest.mark.parametrize(
+    "df, t, p",
+    [
+        (1, 12.706205, 0.05),
+        (2, 4.302653, 0.05),
+        (5, 2.570582, 0.05),
+        (10, 2.228139, 0.05),
+        (30, 2.042272, 0.05),
+        (10, 3.169273, 0.01),
+        (20, 2.845340, 0.01),
+    ],
+)
+def test_t_distribution_p_values_match_table(df, t, p):
+    assert _betainc(df / 2, 0.5, df / (df + t**2)) == pytest.approx(p, abs=1e-5)
+
+
+def test_welch_t_test():
+    # 平均値の差 -2, 標準誤差 1 (t = -2), 自由度 8
+    data = pd.DataFrame(
+        {"g": ["a"] * 5 + ["b"] * 5, "v": [1, 2, 3, 4, 5, 3, 4, 5, 6, 7]}
+    )
+    results = trp.pairwise_tests(data, "g", "v", correction=None)
+    assert results["statistic"].iloc[0] == pytest.approx(-2.0)
+    assert results["p"].iloc[0] == pytest.approx(0.0805162, abs=1e-6)
@@ -0,0 +1,52 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import trplots as trp
+
+
+def _box_data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "group": rng.choice(["a", "b", "c"], n),
+            "value": rng.normal(size=n),
+            "category": rng.choice(["x", "y"], n),
+        }
+    )
+
+
+def test_trend_plots_does_not_cache_by_default():
+    data = _box_data()
+    fig, ax = plt.subplots()
+    trp_box = trp.TrendPlots(ax)
+    trp_box.add_box_mean_plot(data, "group", "value", "category")
+    # 指紋の標本に含まれない行をその場で書き換える
+    data.iloc[1234, 1] = 1e6
+    result = trp_box.single_describe(data, "group", "value", "category")
+    plt.close(fig)
+
+    assert trp_box.stats_cache is None
+    pd.testing.assert_frame_equal(
+        result, trp.single_describe(data, "group", "value", "category")
+    )
+    assert result.max().max() == 1e6
+
+
+def test_trend_plots_reuses_given_stats_cache():
+    data = _box_data()
+    cache = trp.StatsCache()
+    fig, ax = plt.subplots()
+    trp_box = trp.TrendPlots(ax, stats_cache=cache)
+    trp_box.add_box_mean_plot(data, "group", "value", "category")
+    result = trp_box.single_describe(data, "group", "value", "category")
+    plt.close(fig)
+
+    assert cache.hits == 1
+    pd.testing.assert_frame_equal(
+        result, trp.single_describe(data, "group", "value", "category")
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import trplots as trp
+
+_QUARTILES = {"25%": 0.25, "50%": 0.5, "75%": 0.75}
+
+
+def _chunks(data, size):
+    return (data.iloc[i : i + size] for i in range(0, len(data), size))
+
+
+def _group_data(values, seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(values)
+    return pd.DataFrame(
+        {
+            "group": rng.choice(["a", "b"], n),
+            "category": rng.choice(["x", "y"], n),
+            "value": values,
+        }
+    )
+
+
+@pytest.mark.parametrize("compression", [50, 200])
+@pytest.mark.parametrize("chunk_size", [1000, 50_000])
+@pytest.mark.parametrize("distribution", ["normal", "lognormal", "sorted"])
+def test_streaming_describe_matches_single_describe(
+    distribution, chunk_size, compression
+):
+    rng = np.random.default_rng(1)
+    values = {
+        "normal": rng.normal(size=200_000),
+        "lognormal": rng.lognormal(size=200_000),
+        "sorted": np.sort(rng.normal(size=200_000)),
+    }[distribution]
+    data = _group_data(values)
+
+    expected = trp.single_describe(data, "group", "value", "category")
+    actual = trp.streaming_describe(
+        _chunks(data, chunk_size), "group", "value", "category", compression
+    )
+
+    exact_columns = ["count", "mean", "std", "min", "max"]
+    pd.testing.assert_frame_equal(actual[exact_columns], expected[exact_columns])
+    # 四分位数は順位の誤差 (データ数に対する割合) が上限以内であることを確認する
+    for (group, category), row in actual.iterrows():
+        values = np.sort(
+            data.loc[
+                (data["group"] == group) & (data["category"] == category), "value"
+            ].to_numpy()
+        )
+        for column, q in _QUARTILES.items():
+            bound = 2 * np.pi * np.sqrt(q * (1 - q)) / compression
+            rank = np.searchsorted(values, row[column]) / len(values)
+            assert abs(rank - q) <= bound
+
+
+def test_streaming_describe_is_exact_for_small_groups():
+    rng = np.random.default_rng(2)
+    compression = 200
+    n = int(compression / np.pi)
+    data = pd.DataFrame(
+        {"group": np.repeat(["a", "b"], n), "value": rng.normal(size=2 * n)}
+    )
+    expected = trp.single_describe(data, "group", "value")
+    actual = trp.streaming_describe(
+        _chunks(data, 7), "group", "value", None, compression
+    )
+    pd.testing.assert_frame_equal(actual, expected)
@@ -3,16 +3,42 @@ from .trplots import (
     PLOT_DEFAULTS,
     FLIERPROPS_DEFAULTS,
     TrendPlots,
+    BoxLayout,
+    BracketPlan,
+    LegendEntries,
     box_mean_plot,
+    box_stats_plot,
+    get_box_layout,
     get_boxwidth,
     get_boxcenter_x,
     add_brackets_for_boxplot,
+    add_auto_brackets_for_boxplot,
+    compile_brackets,
+    apply_bracket_plan,
     plot_bracket,
     get_graph_area,
     check_bracket,
     line_mean_sd_plot,
     line_group_coloring_plot,
+    calc_box_stats,
+    calc_series_stats,
+    calc_series_band,
+    SeriesStatsAccumulator,
+    StatsCache,
+    GroupDescribeAccumulator,
+    pairwise_tests,
+    adjust_p_values,
+    p_to_mark,
+    decimate_indices,
+    lttb_indices,
+    minmax_indices,
     single_describe,
     series_describe,
+    streaming_describe,
+    batch_describe,
+    save_batch_describe,
+    load_batch_describe,
     configure_ax,
+    render_figure,
+    render_figures,
 )
@@ -1,6 +1,3 @@
-import matplotlib.pyplot as plt
-
-
 def configure_ax(
     ax,
     xlabel,
@@ -19,6 +16,7 @@ def configure_ax(
     ylabel_loc_y=None,
     legend_correspondence_dict={},
     legend_kwargs={},
+    legend_entries=None,
     **kwargs,
 ):
     """axに対して設定を行う関数
@@ -60,6 +58,8 @@ def configure_ax(
             凡例のラベルを変更するための辞書
         legend_kwargs: dict
             ax.legendに渡す引数
+        legend_entries: LegendEntries
+            作図時に記録した凡例の項目 (省略した場合はaxの全てのartistから取得する)
         **kwargs:
             ax.setに渡す引数
 
@@ -78,13 +78,14 @@ def configure_ax(
         ax.tick_params(labelsize=tick_font_size)
 
     # グラフの大きさを設定(画像サイズを1とした場合の比率)
+    # pyplotの現在のfigureではなく, axが属するfigureに設定する
     if (
         graph_limit_left is not None
         and graph_limit_right is not None
         and graph_limit_bottom is not None
         and graph_limit_top is not None
     ):
-        plt.gcf().subplots_adjust(
+        ax.figure.subplots_adjust(
             left=graph_limit_left,
             right=graph_limit_right,
             bottom=graph_limit_bottom,
@@ -107,12 +108,12 @@ def configure_ax(
         ax.set_ylim(ylim)
 
     # 凡例の設定
-    set_legend(ax, legend_correspondence_dict, **legend_kwargs)
+    set_legend(ax, legend_correspondence_dict, legend_entries, **legend_kwargs)
 
     return ax
 
 
-def set_legend(ax, legend_correspondence_dict, **kwargs):
+def set_legend(ax, legend_correspondence_dict, legend_entries=None, **kwargs):
     """axに対して凡例を設定する関数
     legend_correspondence_dictを用いて凡例のラベルを変更する
     また, 凡例で同じ文字列が複数表示されないようにする
@@ -120,58 +121,48 @@ def set_legend(ax, legend_correspondence_dict, **kwargs):
     Args:
         ax: matplotlib.pyplot.Axes
         legend_correspondence_dict: dict
-            凡例のラベルを変更するための辞書
+            凡例のラベルを変更するための辞書 (辞書の値の順に凡例を並べる)
+        legend_entries: LegendEntries
+            作図時に記録した凡例の項目 (省略した場合はaxの全てのartistから取得する)
+        **kwargs:
+            ax.legendに渡す引数
 
     Returns:
         ax: matplotlib.pyplot.Axes
     """
 
     # 現在のlegendを取得し, 対応する新しいlegendを作成
-    handles, labels = ax.get_legend_handles_labels()
-    new_labels = []
-    # 新しいlegendを作成
-    if legend_correspondence_dict != {}:
-        for lb in labels:
-            new_labels.append(legend_correspondence_dict[lb])
-        if len(new_labels) == 0:
-            new_labels = labels
-        elif len(new_labels) != len(labels):
-            new_labels = labels
-            print(
-                "WARN: The number of legend correspondence input is not equal to the number of legend labels."
-            )
-            print("WARN: The legend labels are not changed.")
+    if legend_entries is None:
+        handles, labels = ax.get_legend_handles_labels()
     else:
-        new_labels = labels
-
-    # legendの順番を設定
+        handles, labels = legend_entries.handles, legend_entries.labels
     if legend_correspondence_dict != {}:
-        legend_order = list(legend_correspondence_dict.values())
+        new_labels = [legend_correspondence_dict[lb] for lb in labels]
+        # legendの順番を設定
+        legend_order = dict.fromkeys(legend_correspondence_dict.values())
     else:
-        legend_order = None
+        new_labels = labels
+        legend_order = {}
 
     # legendをorderに従って並び替え
-    if legend_order is not None:
-        for o in reversed(legend_order):
-            # new_labelsのうちoの最初のインデックスを取得
-            idx = new_labels.index(o)
-            # new_labelsとhandlesのidx番目をtmpに保存
-            lb_tmp = new_labels[idx]
-            hd_tmp = handles[idx]
-            # new_labelsとhandlesのidx番目を削除
-            new_labels.pop(idx)
-            handles.pop(idx)
-            # new_labelsとhandlesの最初にtmpを追加
-            new_labels.insert(0, lb_tmp)
-            handles.insert(0, hd_tmp)
+    # orderの各ラベルの最初の項目を先頭に移動し, 残りの項目は元の順に並べる
+    first_index = {}
+    for i, lb in enumerate(new_labels):
+        first_index.setdefault(lb, i)
+    front = []
+    for o in legend_order:
+        if o not in first_index:
+            raise ValueError(f"{o!r} is not in legend labels")
+        front.append(first_index[o])
+    moved = set(front)
+    rows = front + [i for i in range(len(new_labels)) if i not in moved]
 
     # legendを設定
     # 凡例に同じ文字列が複数表示されるのを防ぐ
-    # reversedを使って逆順にすることで, dict化した際に最初に出現したものが優先され, あとから出現する同じラベルが削除される
-    by_label = dict(zip(reversed(new_labels), reversed(handles)))
-    # reversedしなおすことで, 元の順番に戻す
-    hd = reversed(by_label.values())
-    lb = reversed(by_label.keys())
-    ax.legend(hd, lb, **kwargs)
-
+    # 同じラベルは最初に出現したartistを, 最後に出現した位置に表示する
+    by_label = {}
+    for i in rows:
+        lb = new_labels[i]
+        by_label[lb] = by_label.pop(lb, handles[i])
+    ax.legend(list(by_label.values()), list(by_label.keys()), **kwargs)
     return ax
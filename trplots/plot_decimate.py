@@ -0,0 +1,143 @@
+import numpy as np
+
+
+def decimate_indices(x, y, method="lttb", n_buckets=1000):
+    """線グラフの見た目を保つように間引いた点の番号を取得する関数
+
+    Args:
+        x: numpy.ndarray
+            * x座標 (shape: (点数,))
+            * 昇順に並んでおり, 欠損値を含まないこと
+        y: numpy.ndarray
+            * y座標 (shape: (点数,) または (系列数, 点数))
+            * 欠損値を含まないこと
+        method: str
+            * "lttb": Largest-Triangle-Three-Bucketsで区間毎に1点を選ぶ
+            * "minmax": x方向に等間隔の区間毎に最初, 最小, 最大, 最後の点を選ぶ
+        n_buckets: int
+            * 区間の数 (通常はaxの幅のピクセル数)
+
+    Returns:
+        indices: numpy.ndarray
+            * 間引いた点の番号 (昇順, yと同じ次元)
+            * 2次元の場合は全ての系列で同じ点数となる
+    """
+    if method == "lttb":
+        return lttb_indices(x, y, n_buckets + 2)
+    if method == "minmax":
+        return minmax_indices(x, y, n_buckets)
+    raise ValueError('method must be "lttb" or "minmax"')
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Bucketsで間引いた点の番号を取得する関数
+    両端の点を残し, 残りの点を点数が等しい区間に分けて, 区間毎に1つ前に選んだ点と次の区間の平均の点との三角形の面積が
+    最大となる点を選ぶ
+    2次元の場合は区間毎の計算を全ての系列についてまとめて行う
+
+    Args:
+        x: numpy.ndarray
+            * x座標 (shape: (点数,), 昇順)
+        y: numpy.ndarray
+            * y座標 (shape: (点数,) または (系列数, 点数))
+        n_out: int
+            * 間引いた後の点数 (両端の点を含む)
+
+    Returns:
+        indices: numpy.ndarray
+            * 間引いた点の番号 (shape: (n_out,) または (系列数, n_out))
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    is_1d = y.ndim == 1
+    y = np.atleast_2d(y)
+    n_series, n = y.shape
+    if n_out >= n or n_out < 3:
+        indices = np.broadcast_to(np.arange(n), (n_series, n)).copy()
+        return indices[0] if is_1d else indices
+
+    # 両端を除いた点を点数が等しいn_out - 2個の区間に分ける
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    rows = np.arange(n_series)
+    indices = np.empty((n_series, n_out), dtype=np.intp)
+    indices[:, 0] = 0
+    indices[:, -1] = n - 1
+
+    a = np.zeros(n_series, dtype=np.intp)
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 次の区間の平均の点 (最後の区間の次は右端の点)
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[:, next_lo:next_hi].mean(axis=1)
+
+        # 1つ前に選んだ点, 次の区間の平均の点と三角形の面積が最大となる点を選ぶ
+        ax = x[a]
+        ay = y[rows, a]
+        area = np.abs(
+            (ax - avg_x)[:, None] * (y[:, lo:hi] - ay[:, None])
+            - (ax[:, None] - x[lo:hi]) * (avg_y - ay)[:, None]
+        )
+        a = lo + np.argmax(area, axis=1)
+        indices[:, i + 1] = a
+
+    return indices[0] if is_1d else indices
+
+
+def minmax_indices(x, y, n_buckets):
+    """x方向に等間隔の区間毎に最初, 最小, 最大, 最後の点を選んで間引いた点の番号を取得する関数
+    区間を1ピクセルとすると, 間引く前と同じ線の上下の範囲が描画される
+    2次元の場合は全ての系列についてまとめて計算する
+
+    Args:
+        x: numpy.ndarray
+            * x座標 (shape: (点数,), 昇順)
+        y: numpy.ndarray
+            * y座標 (shape: (点数,) または (系列数, 点数))
+        n_buckets: int
+            * 区間の数
+
+    Returns:
+        indices: numpy.ndarray
+            * 間引いた点の番号 (昇順)
+            * 1次元の場合は重複を除いた番号
+            * 2次元の場合は (系列数, 4 * 点を含む区間の数) (同じ点が重複する場合がある)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    is_1d = y.ndim == 1
+    y = np.atleast_2d(y)
+    n_series, n = y.shape
+    if 4 * n_buckets >= n or n_buckets < 1:
+        indices = np.broadcast_to(np.arange(n), (n_series, n)).copy()
+        return indices[0] if is_1d else indices
+
+    # 点を含む区間の始点と終点
+    span = x[-1] - x[0]
+    if span > 0:
+        bucket_ids = np.minimum(
+            ((x - x[0]) / span * n_buckets).astype(np.intp), n_buckets - 1
+        )
+    else:
+        bucket_ids = np.zeros(n, dtype=np.intp)
+    starts = np.flatnonzero(np.diff(bucket_ids, prepend=-1))
+    ends = np.append(starts[1:], n) - 1
+    counts = ends - starts + 1
+
+    # 区間毎の最小値と最大値の位置 (同じ値が複数ある場合は最初の位置)
+    positions = np.arange(n)
+    mins = np.minimum.reduceat(y, starts, axis=1)
+    maxs = np.maximum.reduceat(y, starts, axis=1)
+    argmins = np.minimum.reduceat(
+        np.where(y == np.repeat(mins, counts, axis=1), positions, n), starts, axis=1
+    )
+    argmaxs = np.minimum.reduceat(
+        np.where(y == np.repeat(maxs, counts, axis=1), positions, n), starts, axis=1
+    )
+
+    indices = np.stack(np.broadcast_arrays(starts, argmins, argmaxs, ends), axis=-1)
+    indices = np.sort(indices, axis=-1).reshape(n_series, -1)
+    return np.unique(indices[0]) if is_1d else indices
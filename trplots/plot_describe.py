@@ -1,7 +1,16 @@
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
 import pandas as pd
+from .plot_stats import (
+    calc_series_stats,
+    GroupDescribeAccumulator,
+    _segment_quantile,
+)
 
 
-def single_describe(data: pd.DataFrame, x, y, hue=None):
+def single_describe(data: pd.DataFrame, x, y, hue=None, stats_cache=None):
     """box_mean_plotで使用したのと同じデータを与えるとその概要を返す関数
 
     Args:
@@ -17,11 +26,22 @@ def single_describe(data: pd.DataFrame, x, y, hue=None):
         hue: str
             hueの列名 (dataの列名) (省略可能)
             大分類の中での分類
+        stats_cache: StatsCache
+            * box_mean_plotで同じデータに対して計算した統計量を保持している場合は, 再計算せずに使用する
+            * 省略可能
 
     Returns:
         describe: pandas.DataFrame
     """
 
+    # 作図時に計算した統計量から概要を作成
+    if stats_cache is not None:
+        cached = stats_cache.get("box_stats", data, (x, y, hue))
+        if cached is not None:
+            describe = _box_stats_to_describe(*cached, data, x, y, hue)
+            if describe is not None:
+                return describe
+
     # データの概要を返す
     if hue is None:
         describe = data.groupby(x)[y].describe()
@@ -31,45 +51,368 @@ def single_describe(data: pd.DataFrame, x, y, hue=None):
     return describe
 
 
-def series_describe(data: pd.DataFrame):
+def streaming_describe(chunks, x, y, hue=None, compression=200):
+    """データフレームの塊を順に与えると, 全体をメモリに読み込まずにsingle_describeと同じ形式の概要を返す関数
+    データ数, 平均値, 標準偏差, 最小値, 最大値は正確な値, 四分位数はt-digestによる近似値となる
+
+    Args:
+        chunks: iterable of pandas.DataFrame
+            * x, y, hueで指定された列を持つデータフレームの塊
+            * 例: pandas.read_csv(path, chunksize=1_000_000)
+        x: str
+            x軸の列名 (dataの列名)
+            大分類
+        y: str
+            y軸の列名 (dataの列名)
+            データ
+        hue: str
+            hueの列名 (dataの列名) (省略可能)
+            大分類の中での分類
+        compression: float
+            * t-digestの圧縮率 (GroupDescribeAccumulatorを参照)
+            * グループ毎の重心の数は約compression / 2以下で, メモリ使用量はデータ数によらない
+            * 分位qの推定値の順位の誤差 (データ数に対する割合) は,
+              1つの重心が占める分位の幅 2π * sqrt(q * (1 - q)) / compression 以内
+                * 四分位数では約2.7 / compression (既定の200で約1.4%) 以内, 実際にはおおむね0.5%以内
+                * 値の誤差は分位数付近のデータの密度によって決まる
+            * データ数がcompression / π (既定値で63) 以下のグループの四分位数は正確な値となる
+
+    Returns:
+        describe: pandas.DataFrame
+    """
+    accumulator = GroupDescribeAccumulator(x, y, hue, compression)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.result()
+
+
+def series_describe(data: pd.DataFrame, x=None, compact=False, stats_cache=None):
     """line_**_plotで使用したのと同じデータを与えるとその概要を返す関数
 
     Args:
         df: pandas.DataFrame
             * index: x軸の値
             * 各列: データ
+            * SeriesStatsAccumulatorで逐次計算した結果も使用可能
+            * dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能 (numpy.memmapも可)
+        x: array-like
+            * dataがdictの場合のx軸の値 (省略した場合は0からの連番)
+        compact: bool
+            * Trueの場合はDataFrameの代わりにnumpyの構造化配列を返す
+                * 1行が1つの系列の平均値または標準偏差の概要に対応する
+                * フィールド: name (系列名), stat ("mean" または "std"), n_trials (試行数),
+                  count, mean, std, min, q25, q50, q75, max
+            * 多数のデータを繰り返し処理する場合に, DataFrameを作成しないため高速
+        stats_cache: StatsCache
+            * line_mean_sd_plotで同じデータに対して計算した統計量を保持している場合は, 再計算せずに使用する
+            * 省略可能
     Returns:
-        describe: pandas.DataFrame
+        describe: pandas.DataFrame or numpy.ndarray
     """
 
-    unique_cols = data.columns.unique()
-
-    data_ms = []
-    cond_cnt = {}
-    for i, col in enumerate(unique_cols):
-        # colを含む列のみを抽出
-        data_tmp = data[col]
-        # col列の平均値と標準偏差を新しいdfとして作成
-        data_mean_sd = pd.DataFrame(index=data.index)
-        # df_tmpの平均値と標準偏差を計算
-        if data_tmp.ndim == 1:
-            data_mean_sd[col + "_mean"] = data_tmp
-            data_mean_sd[col + "_std"] = 0
-        else:
-            data_mean_sd[col + "_mean"] = data_tmp.mean(axis=1)  # type: ignore
-            data_mean_sd[col + "_std"] = data_tmp.std(axis=1)  # type: ignore
-
-        data_ms.append(data_mean_sd)
-        if len(data_tmp.shape) == 1:
-            cond_cnt[col] = 1
-        else:
-            cond_cnt[col] = data_tmp.shape[1]
+    # 同じ名前の列毎の平均値と標準偏差を一括で計算
+    data_mean, data_sd, _, n_trials = calc_series_stats(
+        data, x=x, stats_cache=stats_cache
+    )
+    labels = [str(col) for col in data_mean.columns]
 
-    # データの概要を返す
-    describe = pd.concat(data_ms, axis=1)
-    describe = describe.describe()
-    for cond, cnt in cond_cnt.items():
-        # describeに新しくcond列を追加し, count行にcntを追加
-        describe.loc["count", cond + "_trial"] = cnt
+    # 列名毎に平均値, 標準偏差の順に並べた (列, 行)の配列の概要を一括で計算
+    values = np.empty((2 * len(labels), len(data_mean)))
+    values[0::2] = data_mean.to_numpy().T
+    values[1::2] = data_sd.to_numpy().T
+    summary = _describe_rows(values)
+
+    if compact:
+        records = np.empty(
+            len(values),
+            dtype=[
+                ("name", f"U{max(map(len, labels), default=1)}"),
+                ("stat", "U4"),
+                ("n_trials", np.int64),
+            ]
+            + [(name, np.float64) for name in _COMPACT_FIELDS],
+        )
+        records["name"] = np.repeat(labels, 2)
+        records["stat"] = np.tile(["mean", "std"], len(labels))
+        records["n_trials"] = np.repeat(n_trials.to_numpy(), 2)
+        for name, row in zip(_COMPACT_FIELDS, summary):
+            records[name] = row
+        return records
+
+    # 平均値, 標準偏差の概要の後に, count行のみに試行数を持つ列を追加
+    trial_columns = np.full((len(_DESCRIBE_INDEX), len(labels)), np.nan)
+    trial_columns[0] = n_trials.to_numpy()
+    columns = [name for col in labels for name in (col + "_mean", col + "_std")]
+    return pd.DataFrame(
+        np.concatenate((summary, trial_columns), axis=1),
+        index=_DESCRIBE_INDEX,
+        columns=columns + [col + "_trial" for col in labels],
+    )
+
+
+def batch_describe(
+    datasets,
+    kind="single",
+    x=None,
+    y=None,
+    hue=None,
+    n_jobs=None,
+    batch_size=1000,
+    path=None,
+):
+    """多数のデータセットの概要をまとめて計算し, データセット名をindexに持つ1つの表として返す関数
+    kind="single"ではbatch_size個のデータセットを結合して1度のgroupbyで計算するため, 呼び出し毎の処理が少ない
 
+    Args:
+        datasets: dict or iterable of (str, data)
+            * データセット名 -> データ (single_describe, series_describeと同じ形式)
+            * データセット名は重複しないこと
+        kind: str
+            * "single": single_describeと同じ概要 (x, yが必要, hueは省略可能)
+                * index: (dataset, x[, hue]), columns: count, mean, std, min, 25%, 50%, 75%, max
+            * "series": series_describe(compact=True)と同じ概要
+                * index: (dataset, name, stat), columns: n_trials, count, mean, std, min, 25%, 50%, 75%, max
+                * 1行が1つの系列の平均値 (stat="mean") または標準偏差 (stat="std") の概要
+        x: str or array-like
+            * kind="single": x軸の列名
+            * kind="series": dataがdictの場合のx軸の値 (省略可能)
+        y: str
+            * kind="single"の場合のy軸の列名
+        hue: str
+            * kind="single"の場合のhueの列名 (省略可能)
+        n_jobs: int
+            * batch_size個毎のデータセットを並列に計算するプロセス数
+            * 省略した場合は並列化しない
+        batch_size: int
+            * 1度にまとめて計算するデータセットの数
+        path: str
+            * 指定した場合は結果をsave_batch_describeで.npzファイルに保存する
+
+    Returns:
+        describe: pandas.DataFrame
+    """
+    if kind not in ("single", "series"):
+        raise ValueError('kind must be "single" or "series"')
+    if kind == "single" and (x is None or y is None):
+        raise ValueError('x and y must be specified when kind is "single"')
+
+    items = list(datasets.items() if isinstance(datasets, Mapping) else datasets)
+    if len({name for name, _ in items}) != len(items):
+        raise ValueError("the names of datasets must be unique")
+    batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+    describe_batch = partial(_describe_batch, kind=kind, x=x, y=y, hue=hue)
+    if n_jobs is not None and n_jobs > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(describe_batch, batches))
+    else:
+        results = [describe_batch(batch) for batch in batches]
+
+    describe = pd.concat(results) if results else describe_batch([])
+    if path is not None:
+        save_batch_describe(describe, path)
     return describe
+
+
+def _describe_batch(items, kind, x, y, hue):
+    """batch_describeの1つのバッチ ((データセット名, データ)のリスト) の概要を計算する関数"""
+    names = pd.Index([name for name, _ in items])
+    if kind == "series":
+        records = [series_describe(data, x=x, compact=True) for _, data in items]
+        record_counts = [len(r) for r in records]
+        # 系列名の文字列長が異なる構造化配列も結合できる
+        records = np.concatenate(records or [series_describe({}, compact=True)])
+        index = pd.MultiIndex.from_arrays(
+            [names.repeat(record_counts), records["name"], records["stat"]],
+            names=["dataset", "name", "stat"],
+        )
+        values = {"n_trials": records["n_trials"]}
+        for label, field in zip(_DESCRIBE_INDEX, _COMPACT_FIELDS):
+            values[label] = records[field]
+        return pd.DataFrame(values, index=index)
+
+    # 全てのデータセットを結合し, データセット名を最初のキーとして1度に計算
+    keys = [x] if hue is None else [x, hue]
+    frames = [data[keys + [y]] for _, data in items]
+    if frames:
+        combined = pd.concat(frames, ignore_index=True)
+    else:
+        combined = pd.DataFrame({col: [] for col in keys + [y]}, dtype=np.float64)
+    dataset_codes = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+    return _grouped_describe(combined, keys, y, dataset_codes, names)
+
+
+def _grouped_describe(data, keys, y, dataset_codes, dataset_names):
+    """(データセット, keys)毎にgroupby(...).describe()と同じ統計量を一括で計算する関数
+    データを1度だけ (グループ, 値)の順に並び替え, 区間毎の集約で全てのグループを同時に計算する
+    """
+    # キー毎のコード (groupbyと同じく値の昇順, 欠損値は除外)
+    codes = [dataset_codes]
+    uniques = [dataset_names]
+    for key in keys:
+        key_codes, key_uniques = pd.factorize(data[key], sort=True)
+        codes.append(key_codes)
+        uniques.append(key_uniques)
+    group_codes = np.zeros(len(data), dtype=np.int64)
+    for key_codes, key_uniques in zip(codes, uniques):
+        group_codes = group_codes * len(key_uniques) + key_codes
+    has_key = np.all([key_codes >= 0 for key_codes in codes], axis=0)
+    group_codes = group_codes[has_key]
+    values = data[y].to_numpy(dtype=np.float64)[has_key]
+
+    # データが存在するグループ (yが全て欠損値のグループも含む) を連番に変換
+    present, group_ids = np.unique(group_codes, return_inverse=True)
+    n_groups = len(present)
+    is_valid = ~np.isnan(values)
+    group_ids, values = group_ids[is_valid], values[is_valid]
+    order = np.lexsort((values, group_ids))
+    sorted_values = values[order]
+    counts = np.bincount(group_ids, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    summary = np.full((len(_DESCRIBE_INDEX), n_groups), np.nan)
+    summary[0] = counts
+    has_data = counts > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(group_ids, weights=values, minlength=n_groups) / counts
+        deviation = values - mean[group_ids]
+        std = np.sqrt(
+            np.bincount(group_ids, weights=deviation * deviation, minlength=n_groups)
+            / (counts - 1)
+        )
+    summary[1] = mean
+    summary[2] = np.where(counts > 1, std, np.nan)
+    summary[3, has_data] = sorted_values[starts[has_data]]
+    for row, q in zip((4, 5, 6), (0.25, 0.5, 0.75)):
+        summary[row] = _segment_quantile(sorted_values, starts, counts, q)
+    summary[7, has_data] = sorted_values[starts[has_data] + counts[has_data] - 1]
+
+    # グループのコードを各キーのラベルに戻す
+    levels = []
+    for key_uniques in reversed(uniques):
+        present, level_codes = np.divmod(present, len(key_uniques))
+        levels.append(pd.Index(key_uniques).take(level_codes))
+    index = pd.MultiIndex.from_arrays(levels[::-1], names=["dataset"] + keys)
+    return pd.DataFrame(summary.T, index=index, columns=_DESCRIBE_INDEX)
+
+
+def save_batch_describe(describe, path):
+    """batch_describeの結果を1つの.npzファイルに保存する関数
+    indexの各階層と値の2次元配列をそのまま保存するため, 多数のCSVファイルより小さく高速に読み書きできる
+
+    Args:
+        describe: pandas.DataFrame
+            batch_describeの結果
+        path: str
+            保存先のパス (.npz)
+    """
+    arrays = {
+        "index_names": np.array([str(name) for name in describe.index.names]),
+        "columns": np.array([str(col) for col in describe.columns]),
+        "values": describe.to_numpy(dtype=np.float64),
+    }
+    for i in range(describe.index.nlevels):
+        level = np.asarray(describe.index.get_level_values(i))
+        # 文字列等は固定長の文字列配列として保存 (読み込み時にpickleを使用しない)
+        if level.dtype == object or level.dtype.kind == "U":
+            level = level.astype(str)
+        arrays[f"index_{i}"] = level
+    np.savez_compressed(path, **arrays)
+
+
+def load_batch_describe(path):
+    """save_batch_describeで保存した結果を読み込む関数
+
+    Args:
+        path: str
+            .npzファイルのパス
+
+    Returns:
+        describe: pandas.DataFrame
+            * 文字列以外のラベル (数値等) は保存時の型, それ以外のラベルはstr
+    """
+    with np.load(path) as npz:
+        names = npz["index_names"].tolist()
+        levels = [npz[f"index_{i}"] for i in range(len(names))]
+        index = pd.MultiIndex.from_arrays(levels, names=names)
+        return pd.DataFrame(npz["values"], index=index, columns=npz["columns"].tolist())
+
+
+def _box_stats_to_describe(stats, label_values, data, x, y, hue=None):
+    """box_mean_plotで計算した各箱の統計量からsingle_describeと同じ概要を作成する関数
+    strに変換したラベルによるグループとgroupbyのグループが一致しない場合 (欠損値, カテゴリ型,
+    strに変換すると同じになる値) はNoneを返す
+    """
+    keys = [x] if hue is None else [x, hue]
+    if any(label_values[key] is None for key in keys):
+        return None
+    # yが欠損値の行を含む場合 (データ数0のグループがgroupbyの結果にのみ含まれる)
+    if stats["count"].sum() != len(data):
+        return None
+
+    # ラベルを元の値に戻し, groupbyと同じく元の値の順に並べる
+    if hue is None:
+        index = pd.Index([label_values[x][lb] for lb in stats.index], name=x)
+    else:
+        index = pd.MultiIndex.from_arrays(
+            [
+                [label_values[key][lb] for lb in stats.index.get_level_values(i)]
+                for i, key in enumerate(keys)
+            ],
+            names=keys,
+        )
+    describe = pd.DataFrame(
+        {
+            "count": stats["count"].to_numpy(dtype=np.float64),
+            "mean": stats["mean_all"].to_numpy(),
+            "std": stats["std"].to_numpy(),
+            "min": stats["min"].to_numpy(),
+            "25%": stats["q1"].to_numpy(),
+            "50%": stats["median"].to_numpy(),
+            "75%": stats["q3"].to_numpy(),
+            "max": stats["max"].to_numpy(),
+        },
+        index=index,
+    )
+    return describe.sort_index()
+
+
+_DESCRIBE_INDEX = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+_COMPACT_FIELDS = ["count", "mean", "std", "min", "q25", "q50", "q75", "max"]
+
+
+def _describe_rows(values):
+    """(列, 行)の配列の列毎にpandas.DataFrame.describeと同じ統計量を一括で計算する関数
+
+    Args:
+        values: numpy.ndarray
+            * shape: (列数, 行数), 欠損値は除いて計算
+
+    Returns:
+        summary: numpy.ndarray
+            * shape: (8, 列数)
+            * 各行: count, mean, std, min, 25%, 50%, 75%, max
+    """
+    summary = np.full((len(_DESCRIBE_INDEX), len(values)), np.nan)
+    is_valid = ~np.isnan(values)
+    count = is_valid.sum(axis=1)
+    summary[0] = count
+    has_data = count > 0
+    if not has_data.any():
+        return summary
+
+    valid_values = values[has_data]
+    valid_count = count[has_data]
+    mean = np.where(is_valid[has_data], valid_values, 0.0).sum(axis=1) / valid_count
+    deviation = np.where(is_valid[has_data], valid_values - mean[:, None], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 不偏標準偏差 (データ数が1の場合はnan)
+        std = np.sqrt((deviation * deviation).sum(axis=1) / (valid_count - 1))
+    summary[1, has_data] = mean
+    summary[2, has_data] = np.where(valid_count > 1, std, np.nan)
+    # min, 25%, 50%, 75%, maxを1度の部分ソートで計算
+    if is_valid[has_data].all():
+        quantiles = np.percentile(valid_values, [0, 25, 50, 75, 100], axis=1)
+    else:
+        quantiles = np.nanpercentile(valid_values, [0, 25, 50, 75, 100], axis=1)
+    summary[3:, has_data] = quantiles
+    return summary
@@ -0,0 +1,332 @@
+import numpy as np
+
+
+class BoxLayout:
+    """箱ひげ図の各箱の配置をまとめたクラス
+    箱ひげ図の作成時に1度だけ作成し, 平均値, jitter, ブラケットの位置の計算に使用する
+    作成後はaxのartistを参照せずに各箱の中心のx座標を取得できる
+    """
+
+    def __init__(self, xtick_labels, hue_labels, box_width):
+        """
+        Args:
+            xtick_labels: list of str
+                x軸のラベル (左から順)
+            hue_labels: list of str
+                * hueのラベル (同じx軸のラベルの中で左から順)
+                * hueが存在しない場合はNoneまたは空のリスト
+            box_width: float
+                箱ひげ図の幅
+        """
+        self._xtick_labels = list(xtick_labels)
+        self._has_hue = bool(hue_labels)
+        # hueが存在しない場合は空白のラベルを1つ持つ
+        self._hue_labels = list(hue_labels) if self._has_hue else [""]
+        self._box_width = box_width
+        self._xtick_index = {lb: i for i, lb in enumerate(self._xtick_labels)}
+        self._hue_index = {lb: j for j, lb in enumerate(self._hue_labels)}
+
+        # 全ての箱の中心のx座標を計算 (get_boxcenter_xと同じ位置)
+        hue_len = len(self._hue_labels)
+        hue_offsets = box_width * (np.arange(hue_len) - (hue_len - 1) / 2)
+        self._centers = np.arange(len(self._xtick_labels))[:, None] + hue_offsets
+
+    def get_center(self, xtick_label, hue_label=""):
+        """ラベルで指定した箱の中心のx座標を取得する関数
+
+        Args:
+            xtick_label: str
+                x軸のラベル
+            hue_label: str
+                * hueのラベル
+                * hueが存在しない場合は空白
+
+        Returns:
+            x_cood: float
+        """
+        return self._centers[self.get_index(xtick_label, hue_label)]
+
+    def get_index(self, xtick_label, hue_label=""):
+        """ラベルで指定した箱の(x軸の番号, hueの番号)を取得する関数
+        存在しないラベルを指定した場合はValueErrorを出力
+
+        Args:
+            xtick_label: str
+                x軸のラベル
+            hue_label: str
+                * hueのラベル
+                * hueが存在しない場合は空白
+
+        Returns:
+            (xtick_id, hue_id): (int, int)
+        """
+        if xtick_label not in self._xtick_index:
+            raise ValueError("the label of brackets is not in xtick_labels")
+        if not self._has_hue and hue_label in ("", None):
+            hue_label = ""
+        if hue_label not in self._hue_index:
+            raise ValueError("the label of brackets is not in legend_labels")
+        return self._xtick_index[xtick_label], self._hue_index[hue_label]
+
+    @property
+    def xtick_labels(self):
+        return self._xtick_labels
+
+    @property
+    def hue_labels(self):
+        return self._hue_labels
+
+    @property
+    def has_hue(self):
+        return self._has_hue
+
+    @property
+    def box_width(self):
+        return self._box_width
+
+    @property
+    def centers(self):
+        """全ての箱の中心のx座標 (shape: (x軸のラベル数, hueのラベル数))"""
+        return self._centers
+
+
+class BracketLevelTree:
+    """ブラケットの段 (高さ方向の位置) の使用状況を管理するセグメント木
+    x方向の区間毎に, 使用済みの段をビット列 (int) として保持する
+    区間への段の追加と, 区間内で使用済みの段の取得をO(log n)で行う
+    """
+
+    def __init__(self, n_cells):
+        """
+        Args:
+            n_cells: int
+                x方向の区間の数
+        """
+        self._n = max(1, n_cells)
+        # 各ノードの区間全体に追加された段
+        self._tag = [0] * (4 * self._n)
+        # 各ノードの区間内のいずれかに追加された段
+        self._agg = [0] * (4 * self._n)
+
+    def add(self, left, right, level):
+        """区間[left, right]に段levelを追加する関数
+
+        Args:
+            left: int
+                区間の左端 (0始まり)
+            right: int
+                区間の右端 (rightを含む)
+            level: int
+                追加する段
+        """
+        if left > right:
+            return
+        self._add(1, 0, self._n - 1, left, right, 1 << level)
+
+    def query(self, left, right):
+        """区間[left, right]のいずれかで使用済みの段をビット列で取得する関数
+
+        Args:
+            left: int
+                区間の左端 (0始まり)
+            right: int
+                区間の右端 (rightを含む)
+
+        Returns:
+            levels: int
+                使用済みの段のビット列 (k番目のビットが1の場合, 段kは使用済み)
+        """
+        if left > right:
+            return 0
+        return self._query(1, 0, self._n - 1, left, right)
+
+    def _add(self, node, lo, hi, left, right, bit):
+        self._agg[node] |= bit
+        if left <= lo and hi <= right:
+            self._tag[node] |= bit
+            return
+        mid = (lo + hi) // 2
+        if left <= mid:
+            self._add(2 * node, lo, mid, left, right, bit)
+        if right > mid:
+            self._add(2 * node + 1, mid + 1, hi, left, right, bit)
+
+    def _query(self, node, lo, hi, left, right):
+        if left <= lo and hi <= right:
+            return self._agg[node]
+        levels = self._tag[node]
+        mid = (lo + hi) // 2
+        if left <= mid:
+            levels |= self._query(2 * node, lo, mid, left, right)
+        if right > mid:
+            levels |= self._query(2 * node + 1, mid + 1, hi, left, right)
+        return levels
+
+
+class BracketPlan:
+    """箱の配置に対して計算済みのブラケットの配置をまとめたクラス
+    ブラケットのx座標と段はグラフのy軸の範囲に依存しないため, 1度計算すれば同じ配置の箱ひげ図に繰り返し使用できる
+    適用時はy軸の範囲に合わせてy座標を計算するのみ
+    """
+
+    def __init__(self, x1, x2, levels, marks, h_ratio, hspace_ratio, layout):
+        """
+        Args:
+            x1: array-like of float
+                ブラケットの左端のx座標 (描画順)
+            x2: array-like of float
+                ブラケットの右端のx座標 (描画順)
+            levels: array-like of int
+                ブラケットの段
+            marks: list of str
+                ブラケットの中に表示する文字列
+            h_ratio: float
+                ブラケットの高さの(グラフエリア高さに対する)比率
+            hspace_ratio: float
+                ブラケットの高さ間隔の(グラフエリア高さに対する)比率
+            layout: BoxLayout
+                ブラケットの計算に使用した箱の配置
+        """
+        self._x1 = np.asarray(x1, dtype=np.float64)
+        self._x2 = np.asarray(x2, dtype=np.float64)
+        self._levels = np.asarray(levels, dtype=np.int64)
+        self._marks = list(marks)
+        self._h_ratio = h_ratio
+        self._hspace_ratio = hspace_ratio
+        self._xtick_labels = list(layout.xtick_labels)
+        self._hue_labels = list(layout.hue_labels)
+
+    def to_positions(self, base_y, graph_height):
+        """y軸の範囲に合わせてブラケットの位置情報を計算する関数
+
+        Args:
+            base_y: float
+                ブラケットの基準位置
+            graph_height: float
+                グラフエリアの高さ
+
+        Returns:
+            brackets_pos_list: list of dict
+                * ブラケットの位置情報 (plot_bracketsの引数と同じ形式)
+        """
+        bracket_height = self._h_ratio * graph_height
+        y_bottom = base_y + self._levels * (self._hspace_ratio * graph_height)
+        return [
+            {
+                "x1": x1,
+                "x2": x2,
+                "mark": mark,
+                "y_bottom": yb,
+                "y_bar": yb + bracket_height,
+            }
+            for x1, x2, mark, yb in zip(
+                self._x1.tolist(), self._x2.tolist(), self._marks, y_bottom.tolist()
+            )
+        ]
+
+    def is_compatible(self, layout):
+        """箱の配置 (ラベルの並び) が計算に使用したものと同じかを判定する関数
+
+        Args:
+            layout: BoxLayout
+
+        Returns:
+            is_compatible: bool
+        """
+        return (
+            list(layout.xtick_labels) == self._xtick_labels
+            and list(layout.hue_labels) == self._hue_labels
+        )
+
+    def __len__(self):
+        return len(self._marks)
+
+    @property
+    def x1(self):
+        return self._x1
+
+    @property
+    def x2(self):
+        return self._x2
+
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def marks(self):
+        return self._marks
+
+    @property
+    def h_ratio(self):
+        return self._h_ratio
+
+    @property
+    def hspace_ratio(self):
+        return self._hspace_ratio
+
+
+class LegendEntries:
+    """凡例の項目 (artist, ラベル) を作図の順に記録するクラス
+    作図関数は凡例を作成せずに項目を追加し, 凡例は最後に1度だけ作成する
+    凡例の作成時にaxの全てのartistを走査しないため, 凡例の作成は項目の数に比例する
+    """
+
+    def __init__(self):
+        self._handles = []
+        self._labels = []
+        self._title = None
+
+    def add(self, handle, label):
+        """凡例の項目を1つ追加する関数
+        同じラベルを複数回追加した場合, 凡例の作成時には最初のartistを最後の位置に表示する
+
+        Args:
+            handle: matplotlib.artist.Artist
+                凡例に表示するartist
+            label: str
+                凡例のラベル
+        """
+        self._handles.append(handle)
+        self._labels.append(label)
+
+    def extend(self, handles, labels):
+        """凡例の項目をまとめて追加する関数
+
+        Args:
+            handles: list of matplotlib.artist.Artist
+                凡例に表示するartist
+            labels: list of str
+                凡例のラベル (handlesと同じ順)
+        """
+        handles = list(handles)
+        labels = list(labels)
+        if len(handles) != len(labels):
+            raise ValueError("handles and labels must have the same length")
+        self._handles.extend(handles)
+        self._labels.extend(labels)
+
+    def set_title(self, title):
+        """凡例のタイトルを設定する関数 (Noneの場合はタイトルなし)"""
+        self._title = title
+
+    def clear(self):
+        """全ての項目とタイトルを削除する関数"""
+        self._handles = []
+        self._labels = []
+        self._title = None
+
+    def __len__(self):
+        return len(self._labels)
+
+    @property
+    def handles(self):
+        return self._handles
+
+    @property
+    def labels(self):
+        return self._labels
+
+    @property
+    def title(self):
+        return self._title
@@ -0,0 +1,267 @@
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from .trend_plots import TrendPlots
+
+# 図の種類とTrendPlotsのメソッドの対応
+_PLOT_METHODS = {
+    "box_mean_plot": "add_box_mean_plot",
+    "box_stats_plot": "add_box_stats_plot",
+    "line_mean_sd_plot": "add_line_mean_sd_plot",
+    "line_group_coloring_plot": "add_line_group_coloring_plot",
+}
+_SPEC_KEYS = {
+    "path",
+    "plot",
+    "data",
+    "plot_args",
+    "brackets",
+    "bracket_args",
+    "auto_brackets",
+    "configure_args",
+    "figsize",
+    "savefig_args",
+    "read_args",
+}
+# 1つのプロセスで保持する読み込み済みのファイルの数
+_DATA_CACHE_SIZE = 8
+
+# 並列処理のプロセス毎の状態 (_init_render_workerで設定)
+_worker_state = {"datasets": None, "cache": None}
+
+
+def render_figure(spec, datasets=None):
+    """1つの図の仕様からTrendPlotsで図を作成し, ファイルに保存する関数
+    pyplotを使用せずにFigureとAggのcanvasを作成し, 保存後に図を破棄する
+
+    Args:
+        spec: dict
+            * 図の仕様 (render_figuresを参照)
+        datasets: dict
+            * データ名 -> データ (spec["data"]にデータ名を指定する場合に使用)
+            * 省略可能
+
+    Returns:
+        path: str
+            保存したファイルのパス
+    """
+    return _render_spec(spec, datasets, None)
+
+
+def render_figures(specs, datasets=None, n_jobs=None, chunk_size=16, warm_up=True):
+    """多数の図の仕様からTrendPlotsで図を作成し, それぞれファイルに保存する関数
+    n_jobsを指定した場合はAggのcanvasを使用するプロセスで並列に作成する
+    1つの図の作成に失敗しても残りの図の作成は続け, 図毎の結果を返す
+
+    Args:
+        specs: list of dict
+            * 図の仕様のリスト. 各仕様は以下のkeyを持つ
+                * "path": 保存先のファイルのパス
+                * "plot": 図の種類 ("box_mean_plot", "box_stats_plot",
+                  "line_mean_sd_plot", "line_group_coloring_plot")
+                * "data": データ (datasetsのデータ名, ファイルのパス, またはデータそのもの)
+                    * ファイルは拡張子で読み込む (.csv, .pkl, .parquet: DataFrame, .npz: dict)
+                * "plot_args": TrendPlots.add_*に渡すdata以外の引数 (省略可能)
+                * "brackets": TrendPlots.add_bracketsに渡すブラケットのリスト (省略可能)
+                * "bracket_args": add_bracketsに渡すその他の引数 (h_ratio, fs等) (省略可能)
+                * "auto_brackets": TrendPlots.add_auto_bracketsに渡すdata以外の引数 (省略可能)
+                    * x, y, hueを省略した場合はplot_argsと同じ列を使用する
+                * "configure_args": TrendPlots.configure_axに渡す引数 (xlabel, ylabel等) (省略可能)
+                * "figsize": 図の大きさ (省略した場合はmatplotlibの既定値)
+                * "savefig_args": Figure.savefigに渡す引数 (dpi等) (省略可能)
+                * "read_args": ファイルの読み込み関数に渡す引数 (省略可能)
+        datasets: dict
+            * データ名 -> データ
+            * 並列に作成する場合は各プロセスの起動時に1度だけ渡す
+            * 省略可能
+        n_jobs: int
+            * 並列に作成するプロセス数
+            * 省略した場合は並列化しない
+        chunk_size: int
+            * 1度にプロセスに渡す仕様の数
+        warm_up: bool
+            * Trueの場合は各プロセスの起動時に小さな図を1度作成し, seabornやフォントの読み込みを済ませる
+
+    Returns:
+        report: pandas.DataFrame
+            * index: 仕様の番号, columns: path, plot, status ("ok" または "error"),
+              error (失敗した場合の例外), seconds (図の作成と保存の時間), pid (作成したプロセス)
+            * report.attrsに全体の結果を持つ
+                * "n_figures": 仕様の数, "n_failed": 失敗した数,
+                  "elapsed": 全体の時間 (秒), "throughput": 1秒あたりの作成数
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    specs = list(specs)
+
+    start = time.perf_counter()
+    if n_jobs is not None and n_jobs > 1 and len(specs) > 1:
+        results = []
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_init_render_worker,
+                initargs=(datasets, warm_up),
+            ) as executor:
+                for result in executor.map(
+                    _render_in_worker, specs, chunksize=chunk_size
+                ):
+                    results.append(result)
+        except BrokenProcessPool as e:
+            # プロセスが異常終了した場合は残りの仕様を失敗として扱う
+            error = f"{type(e).__name__}: {e}"
+            results.extend(
+                _failed_result(spec, error) for spec in specs[len(results) :]
+            )
+    else:
+        cache = OrderedDict()
+        results = [_render_safely(spec, datasets, cache) for spec in specs]
+    elapsed = time.perf_counter() - start
+
+    report = pd.DataFrame(
+        results, columns=["path", "plot", "status", "error", "seconds", "pid"]
+    )
+    report.index.name = "spec"
+    n_failed = int((report["status"] != "ok").sum())
+    report.attrs = {
+        "n_figures": len(specs),
+        "n_failed": n_failed,
+        "elapsed": elapsed,
+        "throughput": len(specs) / elapsed if elapsed > 0 else np.nan,
+    }
+    return report
+
+
+def _init_render_worker(datasets, warm_up):
+    """並列処理の各プロセスの起動時にAggのbackendとデータを設定する関数"""
+    matplotlib.use("Agg")
+    _worker_state["datasets"] = datasets
+    _worker_state["cache"] = OrderedDict()
+    if warm_up:
+        _warm_up()
+
+
+def _warm_up():
+    """seaborn, 統計量の計算, フォントの読み込みを済ませるために小さな図を1度作成する関数"""
+    fig = Figure(figsize=(1, 1))
+    canvas = FigureCanvasAgg(fig)
+    try:
+        data = pd.DataFrame({"x": ["a", "a", "b", "b"], "y": [0.0, 1.0, 2.0, 3.0]})
+        trp = TrendPlots(fig.subplots())
+        trp.add_box_mean_plot(data, "x", "y")
+        trp.configure_ax(xlabel="x", ylabel="y")
+        canvas.draw()
+    finally:
+        fig.clear()
+
+
+def _render_in_worker(spec):
+    return _render_safely(spec, _worker_state["datasets"], _worker_state["cache"])
+
+
+def _render_safely(spec, datasets, cache):
+    """1つの仕様から図を作成し, 例外を含めた結果を返す関数"""
+    start = time.perf_counter()
+    try:
+        _render_spec(spec, datasets, cache)
+    except Exception as e:
+        return _failed_result(spec, f"{type(e).__name__}: {e}", start)
+    return (
+        spec["path"],
+        spec["plot"],
+        "ok",
+        None,
+        time.perf_counter() - start,
+        os.getpid(),
+    )
+
+
+def _failed_result(spec, error, start=None):
+    seconds = np.nan if start is None else time.perf_counter() - start
+    pid = None if start is None else os.getpid()
+    if not isinstance(spec, dict):
+        return (None, None, "error", error, seconds, pid)
+    return (spec.get("path"), spec.get("plot"), "error", error, seconds, pid)
+
+
+def _render_spec(spec, datasets, cache):
+    """1つの仕様から図を作成して保存する関数 (cacheは読み込み済みのファイル)"""
+    if not isinstance(spec, dict):
+        raise ValueError("spec must be a dict")
+    unknown_keys = set(spec) - _SPEC_KEYS
+    if unknown_keys:
+        raise ValueError(f"unknown keys in spec: {sorted(unknown_keys)}")
+    for key in ("path", "plot", "data"):
+        if key not in spec:
+            raise ValueError(f"spec must have {key!r}")
+    if spec["plot"] not in _PLOT_METHODS:
+        raise ValueError(f"plot must be one of {list(_PLOT_METHODS)}")
+
+    data = _resolve_data(spec["data"], datasets, spec.get("read_args", {}), cache)
+    plot_args = spec.get("plot_args", {})
+
+    fig = Figure(figsize=spec.get("figsize"))
+    FigureCanvasAgg(fig)
+    try:
+        trp = TrendPlots(fig.subplots())
+        getattr(trp, _PLOT_METHODS[spec["plot"]])(data, **plot_args)
+        if spec.get("brackets"):
+            trp.add_brackets(spec["brackets"], **spec.get("bracket_args", {}))
+        if "auto_brackets" in spec:
+            auto_args = {
+                key: plot_args[key]
+                for key in ("x", "y", "hue")
+                if key in plot_args and key not in spec["auto_brackets"]
+            }
+            auto_args.update(spec["auto_brackets"])
+            trp.add_auto_brackets(data, **auto_args)
+        if "configure_args" in spec:
+            trp.configure_ax(**spec["configure_args"])
+        fig.savefig(spec["path"], **spec.get("savefig_args", {}))
+    finally:
+        # 図のartistへの参照を切り, 保存後すぐにメモリを解放する
+        fig.clear()
+    return spec["path"]
+
+
+def _resolve_data(ref, datasets, read_args, cache):
+    """仕様のデータ (データ名, ファイルのパス, データそのもの) からデータを取得する関数"""
+    if not isinstance(ref, (str, os.PathLike)):
+        return ref
+    if isinstance(ref, str) and datasets is not None and ref in datasets:
+        return datasets[ref]
+    if cache is None:
+        return _read_data(ref, read_args)
+
+    key = (os.fspath(ref), repr(sorted(read_args.items())))
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    data = _read_data(ref, read_args)
+    cache[key] = data
+    while len(cache) > _DATA_CACHE_SIZE:
+        cache.popitem(last=False)
+    return data
+
+
+def _read_data(path, read_args):
+    """拡張子に応じてファイルを読み込む関数"""
+    suffix = os.path.splitext(os.fspath(path))[1].lower()
+    if suffix == ".csv":
+        return pd.read_csv(path, **read_args)
+    if suffix in (".pkl", ".pickle"):
+        return pd.read_pickle(path, **read_args)
+    if suffix == ".parquet":
+        return pd.read_parquet(path, **read_args)
+    if suffix == ".npz":
+        # 系列名 -> 2次元配列 (試行数, 点数) のdictとして読み込む
+        with np.load(path, **read_args) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+    raise ValueError(f"unsupported data file: {path}")
@@ -0,0 +1,1538 @@
+import itertools
+import math
+import threading
+import warnings
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+def calc_box_stats(data: pd.DataFrame, x, y, hue=None, whis=1.5):
+    """箱ひげ図の各箱について, 四分位数と外れ値を除いた平均値をまとめて計算する関数
+    データを1度だけ並び替え, 全ての箱の統計量を区間毎の集約で一括計算する
+
+    Args:
+        data: pandas.DataFrame
+            * x, y, hueで指定された列を持つデータフレーム
+                * hueは省略可能
+        x: str
+            x軸の列名 (dataの列名)
+            大分類
+        y: str
+            y軸の列名 (dataの列名)
+            データ
+        hue: str
+            hueの列名 (dataの列名) (省略可能)
+            大分類の中での分類
+        whis: float
+            外れ値の判定に使用する四分位範囲の倍率
+
+    Returns:
+        stats: pandas.DataFrame
+            * index: xのラベル (hueを指定した場合は(xのラベル, hueのラベル))
+                * ラベルはstrに変換した値
+                * データが存在しない組み合わせは含まない
+            * columns
+                * count: データ数
+                * q1: 第1四分位数
+                * median: 中央値
+                * q3: 第3四分位数
+                * iqr: 四分位範囲
+                * lower_bound: 外れ値判定の下限
+                * upper_bound: 外れ値判定の上限
+                * whislo: ひげの下端 (外れ値を除いた最小値)
+                * whishi: ひげの上端 (外れ値を除いた最大値)
+                * mean: 外れ値を除いた平均値
+                * mean_all: 外れ値を含む全てのデータの平均値
+                * std: 外れ値を含む全てのデータの標準偏差 (不偏標準偏差)
+                * min: 最小値
+                * max: 最大値
+    """
+    keys = [x] if hue is None else [x, hue]
+    group_codes, values, uniques = _group_codes(data, keys, y)
+    n_groups = int(np.prod([len(u) for u in uniques]))
+
+    # グループコード, 値の順に1度だけ並び替える
+    sort_idx = np.lexsort((values, group_codes))
+    sorted_values = values[sort_idx]
+    counts = np.bincount(group_codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # 区間毎に四分位数を計算 (pandas.Series.quantileと同じ線形補間)
+    q1 = _segment_quantile(sorted_values, starts, counts, 0.25)
+    median = _segment_quantile(sorted_values, starts, counts, 0.5)
+    q3 = _segment_quantile(sorted_values, starts, counts, 0.75)
+    iqr = q3 - q1
+    lower_bound = q1 - whis * iqr
+    upper_bound = q3 + whis * iqr
+
+    # 四分位範囲から外れていないデータのみで平均値を計算
+    on_bound = (values >= lower_bound[group_codes]) & (
+        values <= upper_bound[group_codes]
+    )
+    on_bound_sum = np.bincount(
+        group_codes, weights=np.where(on_bound, values, 0.0), minlength=n_groups
+    )
+    on_bound_cnt = np.bincount(group_codes[on_bound], minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = on_bound_sum / on_bound_cnt
+    mean[on_bound_cnt == 0] = np.nan
+
+    # 外れ値を含む全てのデータの平均値と標準偏差 (single_describeと同じ値)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_all = np.bincount(group_codes, weights=values, minlength=n_groups) / counts
+        deviation = values - mean_all[group_codes]
+        std = np.sqrt(
+            np.bincount(group_codes, weights=deviation * deviation, minlength=n_groups)
+            / (counts - 1)
+        )
+    std[counts < 2] = np.nan
+
+    # ひげの端 (四分位範囲から外れていないデータの最小値と最大値) を計算
+    # 区間毎に並び替え済みのため, 区間毎のreduceatで求められる
+    on_bound_sorted = on_bound[sort_idx]
+    has_data = counts > 0
+    whislo = np.full(n_groups, np.nan)
+    whishi = np.full(n_groups, np.nan)
+    data_min = np.full(n_groups, np.nan)
+    data_max = np.full(n_groups, np.nan)
+    if has_data.any():
+        data_min[has_data] = sorted_values[starts[has_data]]
+        data_max[has_data] = sorted_values[starts[has_data] + counts[has_data] - 1]
+        whislo[has_data] = np.minimum.reduceat(
+            np.where(on_bound_sorted, sorted_values, np.inf), starts[has_data]
+        )
+        whishi[has_data] = np.maximum.reduceat(
+            np.where(on_bound_sorted, sorted_values, -np.inf), starts[has_data]
+        )
+
+    if hue is None:
+        index = pd.Index(uniques[0], name=x)
+    else:
+        index = pd.MultiIndex.from_product(uniques, names=keys)
+    stats = pd.DataFrame(
+        {
+            "count": counts,
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "iqr": iqr,
+            "lower_bound": lower_bound,
+            "upper_bound": upper_bound,
+            "whislo": whislo,
+            "whishi": whishi,
+            "mean": mean,
+            "mean_all": mean_all,
+            "std": std,
+            "min": data_min,
+            "max": data_max,
+        },
+        index=index,
+    )
+
+    # データが存在しない組み合わせを除外
+    return stats[stats["count"] > 0]
+
+
+def _group_codes(data, keys, y):
+    """グループ化に使用する列を整数コードに変換し, 全ての列の組み合わせを1つのグループコードにまとめる関数
+    グループ列またはデータ列が欠損している行は除外する
+
+    Args:
+        data: pandas.DataFrame
+            keys, yで指定された列を持つデータフレーム
+        keys: list of str
+            グループ化に使用する列名のリスト
+        y: str
+            データの列名
+
+    Returns:
+        group_codes: numpy.ndarray
+            各行のグループコード (keysの各列のコードを辞書順にまとめたもの)
+        values: numpy.ndarray
+            各行のデータ (float64)
+        uniques: list of list of str
+            keysの各列のラベル (strに変換した値, 出現順)
+    """
+    codes = []
+    uniques = []
+    for key in keys:
+        key_codes, key_uniques = pd.factorize(data[key])
+        codes.append(key_codes)
+        uniques.append([str(u) for u in key_uniques])
+    values = data[y].to_numpy(dtype=np.float64)
+
+    # 全ての列の組み合わせを1つのグループコードにまとめる
+    group_codes = codes[0].astype(np.intp)
+    for key_codes, key_uniques in zip(codes[1:], uniques[1:]):
+        group_codes = group_codes * len(key_uniques) + key_codes
+
+    # 欠損値 (グループ列, データ列) を除外
+    valid = ~np.isnan(values)
+    for key_codes in codes:
+        valid &= key_codes >= 0
+    return group_codes[valid], values[valid], uniques
+
+
+def _segment_quantile(sorted_values, starts, counts, q):
+    """区間毎に並び替え済みの配列から, 各区間の分位数を計算する関数
+
+    Args:
+        sorted_values: numpy.ndarray
+            区間毎に昇順に並び替えた値
+        starts: numpy.ndarray
+            各区間の開始位置
+        counts: numpy.ndarray
+            各区間の要素数
+        q: float
+            分位 (0~1)
+
+    Returns:
+        quantile: numpy.ndarray
+            各区間の分位数 (要素数0の区間はnan)
+    """
+    quantile = np.full(len(counts), np.nan)
+    has_data = counts > 0
+    pos = q * (counts[has_data] - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, counts[has_data] - 1)
+    v_lo = sorted_values[starts[has_data] + lo]
+    v_hi = sorted_values[starts[has_data] + hi]
+    quantile[has_data] = v_lo + (v_hi - v_lo) * (pos - lo)
+    return quantile
+
+
+def pairwise_tests(
+    data: pd.DataFrame,
+    x,
+    y,
+    hue=None,
+    pairs=None,
+    test="welch",
+    correction="holm",
+    n_permutations=10000,
+    seed=0,
+):
+    """箱ひげ図の箱同士の2群の検定をまとめて行う関数
+    データを1度だけグループ化し, Welchのt検定とMann-WhitneyのU検定は全ての組み合わせの検定統計量を
+    配列演算で一括計算する (並べ替え検定は組み合わせ毎に計算する, scipyは使用しない)
+
+    Args:
+        data: pandas.DataFrame
+            * x, y, hueで指定された列を持つデータフレーム
+                * hueは省略可能
+        x: str
+            x軸の列名 (dataの列名)
+            大分類
+        y: str
+            y軸の列名 (dataの列名)
+            データ
+        hue: str
+            hueの列名 (dataの列名) (省略可能)
+            大分類の中での分類
+        pairs: list of tuple([str, str], [str, str])
+            * 検定する箱の組み合わせのリスト (add_brackets_for_boxplotのブラケットの要素1, 2と同じ形式)
+            * hueが存在しない場合はhueのラベル名は空白
+            * 省略した場合は全ての箱の組み合わせ
+        test: str
+            * "welch": Welchのt検定
+            * "mannwhitney": Mann-WhitneyのU検定 (順位和検定, 正規近似, 連続性補正と同順位補正あり)
+            * "permutation": 平均値の差の並べ替え検定
+        correction: str
+            * 多重比較の補正方法 (adjust_p_valuesを参照)
+            * "bonferroni", "holm", "fdr_bh", None (補正なし)
+        n_permutations: int
+            * test="permutation"の場合の並べ替えの回数
+        seed: int
+            * test="permutation"の場合の乱数のシード
+
+    Returns:
+        results: pandas.DataFrame
+            * 1行が1つの組み合わせに対応する (pairsの順)
+            * columns
+                * group1, group2: 箱のラベル ([xのラベル, hueのラベル])
+                * n1, n2: データ数
+                * statistic: 検定統計量 (t値, U値, 平均値の差)
+                * p: p値
+                * p_adj: 多重比較の補正後のp値
+    """
+    keys = [x] if hue is None else [x, hue]
+    group_codes, values, uniques = _group_codes(data, keys, y)
+    hue_uniques = uniques[1] if hue is not None else [""]
+    n_groups = len(uniques[0]) * len(hue_uniques)
+
+    # 箱のラベルとグループコードの対応
+    box_labels = [
+        [x_label, h_label] for x_label in uniques[0] for h_label in hue_uniques
+    ]
+    box_index = {tuple(lb): i for i, lb in enumerate(box_labels)}
+    if pairs is None:
+        counts = np.bincount(group_codes, minlength=n_groups)
+        existing = np.flatnonzero(counts > 0)
+        pairs = [
+            (box_labels[i], box_labels[j])
+            for k, i in enumerate(existing)
+            for j in existing[k + 1 :]
+        ]
+    pair_i = []
+    pair_j = []
+    for p in pairs:
+        for label in p[:2]:
+            if (label[0], label[1]) not in box_index:
+                raise ValueError("the label of pairs is not in data")
+        pair_i.append(box_index[(p[0][0], p[0][1])])
+        pair_j.append(box_index[(p[1][0], p[1][1])])
+    pair_i = np.asarray(pair_i, dtype=np.intp)
+    pair_j = np.asarray(pair_j, dtype=np.intp)
+
+    # グループコード, 値の順に1度だけ並び替える
+    sort_idx = np.lexsort((values, group_codes))
+    sorted_values = values[sort_idx]
+    counts = np.bincount(group_codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    if test == "welch":
+        statistic, p_values = _welch_t_test(
+            sorted_values, group_codes[sort_idx], counts, pair_i, pair_j
+        )
+    elif test == "mannwhitney":
+        statistic, p_values = _mann_whitney_u_test(
+            sorted_values, starts, counts, pair_i, pair_j
+        )
+    elif test == "permutation":
+        statistic, p_values = _permutation_test(
+            sorted_values, starts, counts, pair_i, pair_j, n_permutations, seed
+        )
+    else:
+        raise ValueError('test must be "welch", "mannwhitney" or "permutation"')
+
+    return pd.DataFrame(
+        {
+            "group1": [list(p[0][:2]) for p in pairs],
+            "group2": [list(p[1][:2]) for p in pairs],
+            "n1": counts[pair_i],
+            "n2": counts[pair_j],
+            "statistic": statistic,
+            "p": p_values,
+            "p_adj": adjust_p_values(p_values, correction),
+        }
+    )
+
+
+def adjust_p_values(p_values, correction="holm"):
+    """多重比較の補正を行う関数
+
+    Args:
+        p_values: array-like
+            補正前のp値 (nanは補正の対象外)
+        correction: str
+            * "bonferroni": Bonferroni法
+            * "holm": Holm法
+            * "fdr_bh": Benjamini-Hochberg法 (偽発見率)
+            * None: 補正なし
+
+    Returns:
+        p_adj: numpy.ndarray
+            補正後のp値
+    """
+    p_values = np.asarray(p_values, dtype=np.float64)
+    p_adj = np.full(p_values.shape, np.nan)
+    valid = ~np.isnan(p_values)
+    p = p_values[valid]
+    m = len(p)
+    if correction is None:
+        adjusted = p
+    elif correction == "bonferroni":
+        adjusted = p * m
+    elif correction == "holm":
+        order = np.argsort(p)
+        stepped = np.maximum.accumulate(p[order] * (m - np.arange(m)))
+        adjusted = np.empty(m)
+        adjusted[order] = stepped
+    elif correction == "fdr_bh":
+        order = np.argsort(p)[::-1]
+        stepped = np.minimum.accumulate(p[order] * m / (m - np.arange(m)))
+        adjusted = np.empty(m)
+        adjusted[order] = stepped
+    else:
+        raise ValueError('correction must be "bonferroni", "holm", "fdr_bh" or None')
+    p_adj[valid] = np.minimum(adjusted, 1.0)
+    return p_adj
+
+
+def p_to_mark(
+    p_values, thresholds=((0.001, "***"), (0.01, "**"), (0.05, "*")), ns_mark=None
+):
+    """p値を有意差マークに変換する関数
+
+    Args:
+        p_values: array-like
+            p値
+        thresholds: list of tuple(float, str)
+            * (閾値, マーク)のリスト
+            * p値が閾値未満となる最も小さい閾値のマークを使用する
+        ns_mark: str
+            * 有意差がない場合のマーク
+            * 省略した場合はNone
+
+    Returns:
+        marks: list
+            有意差マークのリスト
+    """
+    p_values = np.asarray(p_values, dtype=np.float64)
+    thresholds = sorted(thresholds)
+    limits = np.array([t[0] for t in thresholds])
+    mark_list = [t[1] for t in thresholds] + [ns_mark]
+    # p値未満とならない閾値の数 = 使用するマークの番号
+    mark_ids = np.searchsorted(limits, p_values, side="right")
+    mark_ids[np.isnan(p_values)] = len(thresholds)
+    return [mark_list[i] for i in mark_ids]
+
+
+def _welch_t_test(sorted_values, sorted_codes, counts, pair_i, pair_j):
+    """全ての組み合わせのWelchのt検定を一括で行う関数"""
+    n_groups = len(counts)
+    sums = np.bincount(sorted_codes, weights=sorted_values, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        deviation = sorted_values - means[sorted_codes]
+        ss = np.bincount(sorted_codes, weights=deviation**2, minlength=n_groups)
+        variances = ss / (counts - 1)
+
+        n1 = counts[pair_i]
+        n2 = counts[pair_j]
+        se1 = variances[pair_i] / n1
+        se2 = variances[pair_j] / n2
+        t = (means[pair_i] - means[pair_j]) / np.sqrt(se1 + se2)
+        df = (se1 + se2) ** 2 / (se1**2 / (n1 - 1) + se2**2 / (n2 - 1))
+        # 両側検定のp値: I_{df / (df + t^2)}(df / 2, 1 / 2)
+        p_values = _betainc(df / 2, np.full(df.shape, 0.5), df / (df + t**2))
+    p_values[(n1 < 2) | (n2 < 2)] = np.nan
+    return t, p_values
+
+
+def _mann_whitney_u_test(sorted_values, starts, counts, pair_i, pair_j):
+    """全ての組み合わせのMann-WhitneyのU検定を一括で行う関数
+    各グループについて全データの順位 (そのグループ内で何個の値より大きいか) を二分探索で求め,
+    区間毎の和としてU値と同順位の補正項を全ての組み合わせについて計算する
+    """
+    n_groups = len(counts)
+    has_data = counts > 0
+    seg_starts = starts[has_data]
+
+    # 各値の所属グループ内での同じ値の数
+    own_eq = np.empty(len(sorted_values))
+    for g in np.flatnonzero(has_data):
+        seg = sorted_values[starts[g] : starts[g] + counts[g]]
+        own_eq[starts[g] : starts[g] + counts[g]] = np.searchsorted(
+            seg, seg, side="right"
+        ) - np.searchsorted(seg, seg, side="left")
+
+    # less[i, j]: グループiの値のうちグループjの値より大きい数 (同じ値は0.5として数える)
+    # ties[i, j]: グループiの各値について (グループi内の同じ値の数) * (グループj内の同じ値の数) の和
+    less = np.zeros((n_groups, n_groups))
+    ties = np.zeros((n_groups, n_groups))
+    for g in np.flatnonzero(has_data):
+        seg = sorted_values[starts[g] : starts[g] + counts[g]]
+        lo = np.searchsorted(seg, sorted_values, side="left")
+        hi = np.searchsorted(seg, sorted_values, side="right")
+        less[has_data, g] = np.add.reduceat(lo + 0.5 * (hi - lo), seg_starts)
+        ties[has_data, g] = np.add.reduceat(own_eq * (hi - lo), seg_starts)
+    cube = np.zeros(n_groups)
+    cube[has_data] = np.add.reduceat(own_eq**2, seg_starts)
+
+    n1 = counts[pair_i].astype(np.float64)
+    n2 = counts[pair_j].astype(np.float64)
+    n = n1 + n2
+    u = less[pair_i, pair_j]
+    # 2群を合わせた同順位の補正項 sum(t^3 - t)
+    tie_term = (
+        cube[pair_i]
+        + cube[pair_j]
+        + 3 * ties[pair_i, pair_j]
+        + 3 * ties[pair_j, pair_i]
+        - n
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = np.maximum(np.abs(u - n1 * n2 / 2) - 0.5, 0) / sigma
+    p_values = np.minimum(_erfc(z / np.sqrt(2)), 1.0)
+    p_values[(n1 < 1) | (n2 < 1)] = np.nan
+    return u, p_values
+
+
+def _permutation_test(
+    sorted_values, starts, counts, pair_i, pair_j, n_permutations, seed
+):
+    """組み合わせ毎に平均値の差の並べ替え検定を行う関数
+    組み合わせのループはPythonで行い, 各組み合わせの並べ替えは一定の数毎に配列として生成して
+    平均値の差をまとめて計算する
+    (全ての組み合わせを1つの配列に並べると, データ数の違いによる埋め草と値の取り出しの分だけ遅くなるため)
+    """
+    rng = np.random.default_rng(seed)
+    statistic = np.full(len(pair_i), np.nan)
+    p_values = np.full(len(pair_i), np.nan)
+    for k, (i, j) in enumerate(zip(pair_i, pair_j)):
+        n1 = counts[i]
+        n2 = counts[j]
+        if n1 < 1 or n2 < 1:
+            continue
+        pooled = np.concatenate(
+            (
+                sorted_values[starts[i] : starts[i] + n1],
+                sorted_values[starts[j] : starts[j] + n2],
+            )
+        )
+        observed = pooled[:n1].mean() - pooled[n1:].mean()
+        total = pooled.sum()
+        # 並べ替え毎に, 1群目に割り当てる値を乱数の順位で選ぶ
+        n_extreme = 0
+        chunk = max(1, 2**22 // len(pooled))
+        for done in range(0, n_permutations, chunk):
+            size = min(chunk, n_permutations - done)
+            perm = np.argsort(rng.random((size, len(pooled))), axis=1)[:, :n1]
+            sum1 = pooled[perm].sum(axis=1)
+            diff = sum1 / n1 - (total - sum1) / n2
+            n_extreme += np.count_nonzero(
+                np.abs(diff) >= np.abs(observed) * (1 - 1e-12)
+            )
+        statistic[k] = observed
+        p_values[k] = (n_extreme + 1) / (n_permutations + 1)
+    return statistic, p_values
+
+
+def _erfc(x):
+    """相補誤差関数 (配列の要素毎にmath.erfcを呼び出す, 要素数は組み合わせの数)"""
+    return np.vectorize(math.erfc, otypes=[np.float64])(x)
+
+
+def _betainc(a, b, x, n_iter=200):
+    """正則化不完全ベータ関数 I_x(a, b) を連分数展開で計算する関数 (配列に対応)"""
+    a, b, x = np.broadcast_arrays(
+        np.asarray(a, dtype=np.float64),
+        np.asarray(b, dtype=np.float64),
+        np.asarray(x, dtype=np.float64),
+    )
+    # 連分数が速く収束するように, x > (a + 1) / (a + b + 2) の場合は I_x(a, b) = 1 - I_{1-x}(b, a) を使用
+    swap = x > (a + 1) / (a + b + 2)
+    a, b, x = np.where(swap, b, a), np.where(swap, a, b), np.where(swap, 1 - x, x)
+
+    # 対数ガンマ関数は要素毎にmath.lgammaを呼び出す (要素数は組み合わせの数)
+    lgamma = np.vectorize(math.lgamma, otypes=[np.float64])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_front = (
+            lgamma(a + b) - lgamma(a) - lgamma(b) + a * np.log(x) + b * np.log1p(-x)
+        )
+        front = np.exp(log_front) / a
+
+        # Lentz法による連分数の計算
+        tiny = 1e-300
+        c = np.ones_like(x)
+        d = 1 - (a + b) * x / (a + 1)
+        d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+        f = d.copy()
+        for m in range(1, n_iter + 1):
+            for numerator in (
+                m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+            ):
+                d = 1 + numerator * d
+                d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+                c = 1 + numerator / c
+                c = np.where(np.abs(c) < tiny, tiny, c)
+                f *= c * d
+        result = front * f
+    result = np.where(x <= 0, 0.0, np.where(x >= 1, 1.0, result))
+    return np.where(swap, 1 - result, result)
+
+
+def calc_series_stats(data: pd.DataFrame, chunk_size=None, x=None, stats_cache=None):
+    """同じ名前の列 (試行) をまとめて, 行毎の平均値, 標準偏差, データ数を一括で計算する関数
+    列名を1度だけ番号に変換し, 同じ名前の列が隣り合うように並べた2次元配列に対して区間毎の和を計算する
+    (列名毎にdata[col]で抽出しないため, 列名の種類が多い場合でも高速)
+
+    Args:
+        data: pandas.DataFrame or SeriesStatsAccumulator
+            * index: x軸の値
+            * 各列: データ
+                * 列名が同じ列を1つの系列 (各列は試行) として扱う
+            * SeriesStatsAccumulatorの場合は逐次計算した結果を返す
+            * dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能
+                * numpy.ndarray, numpy.memmap等の配列をコピーせずに区間毎に読み出して計算する
+        chunk_size: int
+            * 1度に計算する行数 (省略した場合は一時配列が約32MBとなる行数)
+        x: array-like
+            * dataがdictの場合のx軸の値 (全ての系列で共通, 省略した場合は0からの連番)
+        stats_cache: StatsCache
+            * 指定した場合は同じデータに対する計算結果を再利用する (省略可能)
+
+    Returns:
+        mean: pandas.DataFrame
+            * 行毎の平均値 (index: dataのindex, columns: 列名 (出現順))
+            * 欠損値は除いて計算
+        std: pandas.DataFrame
+            * 行毎の標準偏差 (不偏標準偏差)
+            * 列が1つのみの系列は0
+        count: pandas.DataFrame
+            * 行毎の欠損値でないデータ数
+        n_trials: pandas.Series
+            * 系列毎の列数 (試行数)
+    """
+    if isinstance(data, SeriesStatsAccumulator):
+        return data.result()
+    if stats_cache is not None:
+        return stats_cache.get_or_compute(
+            "series_stats", data, x, lambda: calc_series_stats(data, chunk_size, x)
+        )
+
+    moments = _calc_series_moments(data, chunk_size, x)
+    return _moments_to_series_stats(*moments)
+
+
+def _calc_series_moments(data, chunk_size=None, x=None):
+    """同じ名前の列毎に, 行毎のデータ数, 平均値, 偏差平方和を計算する関数
+
+    Returns:
+        index: pandas.Index
+            x軸の値
+        labels: pandas.Index
+            列名 (出現順)
+        count: numpy.ndarray
+            行毎の欠損値でないデータ数 (shape: (列名の数, 行数))
+        mean: numpy.ndarray
+            行毎の平均値 (shape: (列名の数, 行数))
+        m2: numpy.ndarray
+            行毎の偏差平方和 (shape: (列名の数, 行数))
+        n_trials: numpy.ndarray
+            列名毎の列数
+    """
+    if isinstance(data, Mapping):
+        return _calc_array_moments(data, chunk_size, x)
+
+    codes, labels = pd.factorize(data.columns)
+    n_groups = len(labels)
+    n_rows = len(data)
+
+    # 同じ名前の列が隣り合うように並べる
+    col_order = np.argsort(codes, kind="stable")
+    n_trials = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(n_trials)[:-1]))
+
+    count = np.empty((n_groups, n_rows), dtype=np.int64)
+    mean = np.empty((n_groups, n_rows))
+    m2 = np.empty((n_groups, n_rows))
+    # (列, 行)の配列として扱う (DataFrameの値は列毎に連続しているため転置はコピーを伴わない)
+    values = data.to_numpy(dtype=np.float64, na_value=np.nan).T
+    if chunk_size is None:
+        chunk_size = max(1, 2**22 // max(1, values.shape[0]))
+
+    for lo in range(0, n_rows if n_groups else 0, chunk_size):
+        hi = min(lo + chunk_size, n_rows)
+        block = values[col_order, lo:hi]
+        is_valid = ~np.isnan(block)
+        has_nan = not is_valid.all()
+        if has_nan:
+            block = np.where(is_valid, block, 0.0)
+            block_count = np.add.reduceat(is_valid, starts, axis=0)
+        else:
+            block_count = np.broadcast_to(n_trials[:, None], (n_groups, hi - lo))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            block_mean = np.add.reduceat(block, starts, axis=0) / block_count
+            block -= np.repeat(block_mean, n_trials, axis=0)
+        if has_nan:
+            block[~is_valid] = 0.0
+        count[:, lo:hi] = block_count
+        mean[:, lo:hi] = block_mean
+        m2[:, lo:hi] = np.add.reduceat(block * block, starts, axis=0)
+
+    return data.index, labels, count, mean, m2, n_trials
+
+
+def _calc_array_moments(arrays, chunk_size=None, x=None):
+    """系列名 -> 2次元配列 (試行数, 点数) のdictから, 系列毎に点毎のデータ数, 平均値, 偏差平方和を計算する関数
+    配列は点の区間毎に読み出して計算するため, numpy.memmapの場合も全体をメモリに読み込まない
+    """
+    index, labels, trials = _series_arrays(arrays, x)
+    n_rows = len(index)
+
+    n_groups = len(trials)
+    n_trials = np.array([a.shape[0] for a in trials], dtype=np.int64)
+    count = np.empty((n_groups, n_rows), dtype=np.int64)
+    mean = np.empty((n_groups, n_rows))
+    m2 = np.empty((n_groups, n_rows))
+    for g, a in enumerate(trials):
+        step = chunk_size or max(1, 2**22 // max(1, a.shape[0]))
+        for lo in range(0, n_rows, step):
+            hi = min(lo + step, n_rows)
+            block = np.array(a[:, lo:hi], dtype=np.float64)
+            is_valid = ~np.isnan(block)
+            block_count = is_valid.sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                block_mean = np.where(is_valid, block, 0.0).sum(axis=0) / block_count
+            block -= block_mean
+            block[~is_valid] = 0.0
+            count[g, lo:hi] = block_count
+            mean[g, lo:hi] = block_mean
+            m2[g, lo:hi] = (block * block).sum(axis=0)
+
+    return index, labels, count, mean, m2, n_trials
+
+
+def _series_arrays(arrays, x=None):
+    """系列名 -> 2次元配列 (試行数, 点数) のdictを検証し, (x軸の値, 系列名, 配列のリスト)を取得する関数"""
+    labels = pd.Index(list(arrays.keys()))
+    trials = [np.atleast_2d(a) for a in arrays.values()]
+    for a in trials:
+        if a.ndim != 2:
+            raise ValueError("each array must be 2-D (trials, points)")
+    n_points = {a.shape[1] for a in trials}
+    if len(n_points) > 1:
+        raise ValueError("all arrays must have the same number of points")
+    n_rows = n_points.pop() if n_points else (0 if x is None else len(x))
+    if x is None:
+        index = pd.RangeIndex(n_rows)
+    else:
+        index = pd.Index(x)
+        if len(index) != n_rows:
+            raise ValueError("the length of x must be the same as the number of points")
+    return index, labels, trials
+
+
+def _moments_to_series_stats(index, labels, count, mean, m2, n_trials):
+    """データ数, 平均値, 偏差平方和からcalc_series_statsの戻り値を作成する関数"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(m2 / (count - 1))
+    # 列が1つのみの系列の標準偏差は0とする
+    std[np.asarray(n_trials) == 1] = 0
+    # 全ての試行が欠損値の点の標準偏差は欠損値とする
+    std[count == 0] = np.nan
+
+    return (
+        pd.DataFrame(mean.T, index=index, columns=labels),
+        pd.DataFrame(std.T, index=index, columns=labels),
+        pd.DataFrame(count.T, index=index, columns=labels),
+        pd.Series(n_trials, index=labels),
+    )
+
+
+def calc_series_band(
+    data: pd.DataFrame,
+    band="sd",
+    x=None,
+    percentiles=(25, 75),
+    ci=95,
+    n_boot=1000,
+    seed=0,
+    n_jobs=None,
+    chunk_size=None,
+    stats_cache=None,
+):
+    """同じ名前の列 (試行) をまとめて, 行毎の中心の値と網掛けの下端, 上端を計算する関数
+    試行 × 点の2次元配列に対して点の区間毎にまとめて計算する
+
+    Args:
+        data: pandas.DataFrame
+            * calc_series_statsと同じ形式
+            * SeriesStatsAccumulatorはband="sd", "sem"の場合のみ使用可能
+        band: str
+            * "sd": 平均値 ± 標準偏差
+            * "sem": 平均値 ± 標準誤差 (標準偏差 / sqrt(データ数))
+            * "percentile": 中央値とpercentilesの範囲 (既定は四分位範囲)
+            * "bootstrap": 平均値と, 試行を復元抽出した平均値のci%信頼区間 (パーセンタイル法)
+        x: array-like
+            * dataがdictの場合のx軸の値
+        percentiles: (float, float)
+            * band="percentile"の場合の下端と上端のパーセンタイル
+        ci: float
+            * band="bootstrap"の場合の信頼区間の幅 (%)
+        n_boot: int
+            * band="bootstrap"の場合の復元抽出の回数
+        seed: int
+            * band="bootstrap"の場合の乱数のシード (同じシードでは常に同じ結果)
+        n_jobs: int
+            * band="bootstrap"の場合に点の区間毎の計算を並列に行うプロセス数
+            * 省略した場合は並列化しない (結果はn_jobsによらず同じ)
+        chunk_size: int
+            * 1度に計算する点数 (省略した場合は一時配列が約32MBとなる点数)
+        stats_cache: StatsCache
+            * band="sd", "sem"の場合にcalc_series_statsの結果を再利用する (省略可能)
+
+    Returns:
+        center: pandas.DataFrame
+            * 行毎の中心の値 (band="percentile"の場合は中央値, それ以外は平均値)
+        lower: pandas.DataFrame
+            * 網掛けの下端
+        upper: pandas.DataFrame
+            * 網掛けの上端
+    """
+    if band in ("sd", "sem"):
+        mean, std, count, _ = calc_series_stats(data, chunk_size, x, stats_cache)
+        if band == "sem":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                std = std / np.sqrt(count)
+        return mean, mean - std, mean + std
+    if band not in ("percentile", "bootstrap"):
+        raise ValueError('band must be "sd", "sem", "percentile" or "bootstrap"')
+    if isinstance(data, SeriesStatsAccumulator):
+        raise ValueError(
+            "SeriesStatsAccumulator can only be used with band='sd' or 'sem'"
+        )
+
+    if isinstance(data, Mapping):
+        index, labels, trials = _series_arrays(data, x)
+    else:
+        index = data.index
+        codes, labels = pd.factorize(data.columns)
+        # (列, 行)の配列として扱う (DataFrameの値は列毎に連続しているため転置はコピーを伴わない)
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan).T
+        trials = [values[codes == g] for g in range(len(labels))]
+
+    n_rows = len(index)
+    center = np.empty((len(labels), n_rows))
+    lower = np.empty((len(labels), n_rows))
+    upper = np.empty((len(labels), n_rows))
+    if band == "percentile":
+        q = [percentiles[0], 50, percentiles[1]]
+        for g, a in enumerate(trials):
+            step = chunk_size or max(1, 2**22 // max(1, a.shape[0]))
+            for lo in range(0, n_rows, step):
+                hi = min(lo + step, n_rows)
+                lower[g, lo:hi], center[g, lo:hi], upper[g, lo:hi] = _percentile_block(
+                    np.asarray(a[:, lo:hi], dtype=np.float64), q
+                )
+    else:
+        q = [(100 - ci) / 2, 100 - (100 - ci) / 2]
+        rng = np.random.default_rng(seed)
+        executor = None
+        if n_jobs is not None and n_jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=n_jobs)
+        try:
+            for g, a in enumerate(trials):
+                n_trials = a.shape[0]
+                # 復元抽出の結果を試行毎の抽出回数 (n_boot, 試行数) として表す (全ての点で共通)
+                weights = rng.multinomial(
+                    n_trials, np.full(n_trials, 1 / n_trials), size=n_boot
+                ).astype(np.float64)
+                step = chunk_size or max(1, 2**22 // max(1, n_boot, n_trials))
+                slices = [
+                    slice(lo, min(lo + step, n_rows)) for lo in range(0, n_rows, step)
+                ]
+                blocks = (np.asarray(a[:, sl], dtype=np.float64) for sl in slices)
+                if executor is None:
+                    results = (_bootstrap_block(b, weights, q) for b in blocks)
+                else:
+                    results = executor.map(
+                        _bootstrap_block,
+                        blocks,
+                        itertools.repeat(weights),
+                        itertools.repeat(q),
+                    )
+                for sl, (block_mean, block_lower, block_upper) in zip(slices, results):
+                    center[g, sl] = block_mean
+                    lower[g, sl] = block_lower
+                    upper[g, sl] = block_upper
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    return (
+        pd.DataFrame(center.T, index=index, columns=labels),
+        pd.DataFrame(lower.T, index=index, columns=labels),
+        pd.DataFrame(upper.T, index=index, columns=labels),
+    )
+
+
+def _percentile_block(block, q, axis=0):
+    """(試行数, 点数)の配列の点毎のパーセンタイルを1度の部分ソートで計算する関数"""
+    if not np.isnan(block).any():
+        return np.percentile(block, q, axis=axis)
+    with warnings.catch_warnings():
+        # 全ての試行が欠損値の点はnanとする
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanpercentile(block, q, axis=axis)
+
+
+def _bootstrap_block(block, weights, q):
+    """(試行数, 点数)の配列に対して, 抽出回数の行列との積で全ての復元抽出の平均値をまとめて計算し,
+    (平均値, 信頼区間の下端, 上端)を返す関数
+    """
+    is_valid = ~np.isnan(block)
+    n_trials = block.shape[0]
+    # (点数, 復元抽出の回数)の配列として, 点毎のパーセンタイルを連続したメモリ上で計算する
+    if is_valid.all():
+        mean = block.mean(axis=0)
+        boot_means = block.T @ weights.T / n_trials
+    else:
+        filled = np.where(is_valid, block, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = filled.sum(axis=0) / is_valid.sum(axis=0)
+            boot_means = (filled.T @ weights.T) / (is_valid.T @ weights.T)
+    lower, upper = _percentile_block(boot_means, q, axis=1)
+    return mean, lower, upper
+
+
+class SeriesStatsAccumulator:
+    """同じ名前の列 (試行) の行毎の平均値と標準偏差を, 試行の塊毎に逐次計算するクラス
+    列名毎に行毎のデータ数, 平均値, 偏差平方和 (float64の配列) のみを保持し, 塊をWelford法 (Chanの並列版) で統合する
+    メモリ使用量は試行数によらず (列名の数 × 行数) に比例する
+    line_mean_sd_plot, series_describeにデータフレームの代わりに渡すことができる
+    """
+
+    def __init__(self):
+        self._index = None
+        self._labels = []
+        self._label_ids = {}
+        self._count = None
+        self._mean = None
+        self._m2 = None
+        self._n_trials = np.zeros(0, dtype=np.int64)
+
+    def update(self, data: pd.DataFrame, chunk_size=None, x=None):
+        """試行の塊を追加する関数
+
+        Args:
+            data: pandas.DataFrame
+                * index: x軸の値 (全ての塊で同じ)
+                * 各列: データ (列名が同じ列を1つの系列の試行として扱う)
+                * dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能
+            chunk_size: int
+                * calc_series_statsと同じ
+            x: array-like
+                * dataがdictの場合のx軸の値 (calc_series_statsと同じ)
+
+        Returns:
+            self: SeriesStatsAccumulator
+        """
+        index, labels, count, mean, m2, n_trials = _calc_series_moments(
+            data, chunk_size, x
+        )
+        self._merge_moments(index, list(labels), count, mean, m2, n_trials)
+        return self
+
+    def merge(self, other):
+        """別のSeriesStatsAccumulatorの結果を統合する関数
+
+        Args:
+            other: SeriesStatsAccumulator
+                * x軸の値が同じもの
+
+        Returns:
+            self: SeriesStatsAccumulator
+        """
+        if other._index is not None:
+            self._merge_moments(
+                other._index,
+                other._labels,
+                other._count,
+                other._mean,
+                other._m2,
+                other._n_trials,
+            )
+        return self
+
+    def result(self):
+        """現在までの結果を取得する関数
+
+        Returns:
+            calc_series_statsの戻り値と同じ (mean, std, count, n_trials)
+        """
+        if self._index is None:
+            raise ValueError("no data has been added to the accumulator")
+        return _moments_to_series_stats(
+            self._index,
+            pd.Index(self._labels),
+            self._count,
+            self._mean,
+            self._m2,
+            self._n_trials,
+        )
+
+    def _merge_moments(self, index, labels, count, mean, m2, n_trials):
+        # 最初の塊でx軸の値と配列を作成
+        if self._index is None:
+            self._index = index
+            n_rows = len(index)
+            self._count = np.zeros((0, n_rows), dtype=np.int64)
+            self._mean = np.zeros((0, n_rows))
+            self._m2 = np.zeros((0, n_rows))
+        elif not index.equals(self._index):
+            raise ValueError("the index of data must be the same for all chunks")
+
+        # 新しい列名の配列を追加
+        new_labels = [lb for lb in labels if lb not in self._label_ids]
+        if new_labels:
+            n_new = len(new_labels)
+            n_rows = self._count.shape[1]
+            for lb in new_labels:
+                self._label_ids[lb] = len(self._labels)
+                self._labels.append(lb)
+            self._count = np.vstack(
+                (self._count, np.zeros((n_new, n_rows), dtype=np.int64))
+            )
+            self._mean = np.vstack((self._mean, np.zeros((n_new, n_rows))))
+            self._m2 = np.vstack((self._m2, np.zeros((n_new, n_rows))))
+            self._n_trials = np.append(self._n_trials, np.zeros(n_new, np.int64))
+
+        # 列名毎の統計量を統合 (Chanの並列アルゴリズム)
+        ids = np.array([self._label_ids[lb] for lb in labels], dtype=np.intp)
+        count_a = self._count[ids]
+        count_b = count
+        total = count_a + count_b
+        mean_a = np.where(count_a > 0, self._mean[ids], 0.0)
+        mean_b = np.where(count_b > 0, mean, 0.0)
+        delta = mean_b - mean_a
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(total > 0, count_b / total, 0.0)
+            self._mean[ids] = np.where(total > 0, mean_a + delta * ratio, np.nan)
+        self._m2[ids] = (
+            np.where(count_a > 0, self._m2[ids], 0.0)
+            + np.where(count_b > 0, m2, 0.0)
+            + delta * delta * count_a * ratio
+        )
+        self._count[ids] = total
+        self._n_trials[ids] += n_trials
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def columns(self):
+        """列名 (追加された順)"""
+        return pd.Index(self._labels)
+
+    @property
+    def n_trials(self):
+        return pd.Series(self._n_trials, index=pd.Index(self._labels))
+
+
+class GroupDescribeAccumulator:
+    """データフレームの塊毎に, グループ毎の概要 (single_describeと同じ統計量) を逐次計算するクラス
+    データ数, 平均値, 標準偏差, 最小値, 最大値は正確に, 四分位数はt-digest (重心の列) で近似して計算する
+    グループ毎の重心の数はcompressionに比例する数で抑えられるため, メモリ使用量はデータ数によらない
+    全てのグループの重心を1度に並び替え, 分位に応じた区間毎にまとめて圧縮する
+    """
+
+    def __init__(self, x, y, hue=None, compression=200):
+        """
+        Args:
+            x: str
+                x軸の列名 (大分類)
+            y: str
+                データの列名
+            hue: str
+                hueの列名 (省略可能)
+            compression: float
+                * t-digestの圧縮率 (大きいほど正確で, 重心の数が増える)
+                * グループ毎の重心の数は約compression / 2以下
+                * 分位qの推定値の順位の誤差 (データ数に対する割合) は 2π * sqrt(q * (1 - q)) / compression 以内
+                * データ数がcompression / π以下のグループの四分位数は正確な値となる
+        """
+        self._x = x
+        self._y = y
+        self._hue = hue
+        self._keys = [x] if hue is None else [x, hue]
+        self._compression = compression
+        # グループ (元の値の組) -> グループ番号
+        self._group_ids = {}
+        self._group_labels = []
+        self._count = np.zeros(0, dtype=np.int64)
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._min = np.zeros(0)
+        self._max = np.zeros(0)
+        # 全てのグループの重心 (グループ番号, 重心の値の順)
+        self._c_group = np.zeros(0, dtype=np.intp)
+        self._c_mean = np.zeros(0)
+        self._c_weight = np.zeros(0)
+
+    def update(self, data: pd.DataFrame):
+        """データフレームの塊を追加する関数
+
+        Args:
+            data: pandas.DataFrame
+                x, y, hueで指定された列を持つデータフレーム
+
+        Returns:
+            self: GroupDescribeAccumulator
+        """
+        # 塊の中のグループを全体のグループ番号に変換 (x, hueが欠損値の行はgroupbyと同じく除外)
+        codes = []
+        uniques = []
+        for key in self._keys:
+            key_codes, key_uniques = pd.factorize(data[key])
+            codes.append(key_codes)
+            uniques.append(key_uniques)
+        local_codes = codes[0].astype(np.intp)
+        for key_codes, key_uniques in zip(codes[1:], uniques[1:]):
+            local_codes = local_codes * len(key_uniques) + key_codes
+        has_key = np.all([key_codes >= 0 for key_codes in codes], axis=0)
+        local_codes = local_codes[has_key]
+
+        present = np.unique(local_codes)
+        local_to_global = np.empty(len(present), dtype=np.intp)
+        for i, code in enumerate(present.tolist()):
+            label = []
+            for key_uniques in reversed(uniques):
+                code, j = divmod(code, len(key_uniques))
+                label.append(key_uniques[j])
+            local_to_global[i] = self._group_id(tuple(reversed(label)))
+        group_ids = local_to_global[np.searchsorted(present, local_codes)]
+
+        # yが欠損値の行はグループの登録のみ行う
+        values = data[self._y].to_numpy(dtype=np.float64)[has_key]
+        is_valid = ~np.isnan(values)
+        group_ids, values = group_ids[is_valid], values[is_valid]
+
+        # 塊の統計量を計算して統合
+        n_groups = len(self._group_labels)
+        order = np.lexsort((values, group_ids))
+        group_ids, values = group_ids[order], values[order]
+        count = np.bincount(group_ids, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.bincount(group_ids, weights=values, minlength=n_groups) / count
+        deviation = values - mean[group_ids]
+        m2 = np.bincount(group_ids, weights=deviation * deviation, minlength=n_groups)
+        data_min = np.full(n_groups, np.nan)
+        data_max = np.full(n_groups, np.nan)
+        has_data = count > 0
+        starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+        data_min[has_data] = values[starts[has_data]]
+        data_max[has_data] = values[starts[has_data] + count[has_data] - 1]
+        self._merge_state(
+            count,
+            mean,
+            m2,
+            data_min,
+            data_max,
+            group_ids,
+            values,
+            np.ones(len(values)),
+        )
+        return self
+
+    def merge(self, other):
+        """別のGroupDescribeAccumulatorの結果を統合する関数 (並列に計算した結果の統合に使用)
+
+        Args:
+            other: GroupDescribeAccumulator
+                x, y, hueが同じもの
+
+        Returns:
+            self: GroupDescribeAccumulator
+        """
+        if other._keys != self._keys or other._y != self._y:
+            raise ValueError("x, y and hue must be the same to merge")
+        other_to_self = np.array(
+            [self._group_id(label) for label in other._group_labels], dtype=np.intp
+        )
+        n_groups = len(self._group_labels)
+
+        def reorder(values, fill):
+            result = np.full(n_groups, fill, dtype=values.dtype)
+            result[other_to_self] = values
+            return result
+
+        self._merge_state(
+            reorder(other._count, 0),
+            reorder(other._mean, np.nan),
+            reorder(other._m2, 0.0),
+            reorder(other._min, np.nan),
+            reorder(other._max, np.nan),
+            other_to_self[other._c_group],
+            other._c_mean,
+            other._c_weight,
+        )
+        return self
+
+    def result(self):
+        """現在までの結果を取得する関数
+
+        Returns:
+            describe: pandas.DataFrame
+                * single_describeと同じ形式 (index: グループ, columns: count, mean, std, min, 25%, 50%, 75%, max)
+                * 25%, 50%, 75%はt-digestによる近似値
+        """
+        n_groups = len(self._group_labels)
+        quantiles = np.full((3, n_groups), np.nan)
+        bounds = np.searchsorted(self._c_group, np.arange(n_groups + 1))
+        for g in np.flatnonzero(self._count > 0):
+            lo, hi = bounds[g], bounds[g + 1]
+            quantiles[:, g] = _centroid_quantiles(
+                self._c_mean[lo:hi],
+                self._c_weight[lo:hi],
+                self._min[g],
+                self._max[g],
+                (0.25, 0.5, 0.75),
+            )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self._m2 / (self._count - 1))
+        std[self._count < 2] = np.nan
+
+        if self._hue is None:
+            index = pd.Index([label[0] for label in self._group_labels], name=self._x)
+        else:
+            index = pd.MultiIndex.from_tuples(self._group_labels, names=self._keys)
+        describe = pd.DataFrame(
+            {
+                "count": self._count.astype(np.float64),
+                "mean": np.where(self._count > 0, self._mean, np.nan),
+                "std": std,
+                "min": self._min,
+                "25%": quantiles[0],
+                "50%": quantiles[1],
+                "75%": quantiles[2],
+                "max": self._max,
+            },
+            index=index,
+        )
+        return describe.sort_index()
+
+    def _group_id(self, label):
+        if label not in self._group_ids:
+            self._group_ids[label] = len(self._group_labels)
+            self._group_labels.append(label)
+        return self._group_ids[label]
+
+    def _merge_state(
+        self, count, mean, m2, data_min, data_max, c_group, c_mean, c_weight
+    ):
+        # 新しいグループの分だけ配列を拡張
+        n_new = len(self._group_labels) - len(self._count)
+        if n_new > 0:
+            self._count = np.concatenate((self._count, np.zeros(n_new, np.int64)))
+            self._mean = np.concatenate((self._mean, np.full(n_new, np.nan)))
+            self._m2 = np.concatenate((self._m2, np.zeros(n_new)))
+            self._min = np.concatenate((self._min, np.full(n_new, np.nan)))
+            self._max = np.concatenate((self._max, np.full(n_new, np.nan)))
+
+        # データ数, 平均値, 偏差平方和を統合 (Chanの方法)
+        count_a = self._count
+        total = count_a + count
+        mean_a = np.where(count_a > 0, self._mean, 0.0)
+        mean_b = np.where(count > 0, mean, 0.0)
+        delta = mean_b - mean_a
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(total > 0, count / total, 0.0)
+        self._mean = np.where(total > 0, mean_a + delta * ratio, np.nan)
+        self._m2 = (
+            np.where(count_a > 0, self._m2, 0.0)
+            + np.where(count > 0, m2, 0.0)
+            + delta * delta * count_a * ratio
+        )
+        self._count = total
+        self._min = np.fmin(self._min, data_min)
+        self._max = np.fmax(self._max, data_max)
+
+        # 重心を統合して圧縮
+        self._c_group, self._c_mean, self._c_weight = _compress_centroids(
+            np.concatenate((self._c_group, c_group)),
+            np.concatenate((self._c_mean, c_mean)),
+            np.concatenate((self._c_weight, c_weight)),
+            self._compression,
+        )
+
+
+def _compress_centroids(groups, means, weights, compression):
+    """全てのグループの重心を並び替え, t-digestの尺度関数で区切った区間毎に1つの重心にまとめる関数
+    尺度関数 k(q) = compression / (2π) * arcsin(2q - 1) の値が同じ整数部を持つ重心をまとめるため,
+    分位の両端 (q = 0, 1付近) の重心ほど小さく保たれる
+    """
+    order = np.lexsort((means, groups))
+    groups, means, weights = groups[order], means[order], weights[order]
+    if len(groups) == 0:
+        return groups, means, weights
+
+    # グループ内の累積重みから各重心の左端の分位を計算
+    totals = np.bincount(groups, weights=weights)
+    cum = np.cumsum(weights)
+    group_start = np.flatnonzero(np.diff(groups, prepend=-1))
+    offsets = np.repeat(
+        cum[group_start] - weights[group_start],
+        np.diff(np.append(group_start, len(groups))),
+    )
+    q_left = (cum - weights - offsets) / totals[groups]
+    k = np.floor(compression / (2 * np.pi) * np.arcsin(np.clip(2 * q_left - 1, -1, 1)))
+
+    # グループまたは尺度関数の整数部が変わる位置で区切る
+    boundaries = np.flatnonzero(
+        np.diff(groups, prepend=-1) | np.diff(k, prepend=np.nan).astype(bool)
+    )
+    new_weights = np.add.reduceat(weights, boundaries)
+    new_means = np.add.reduceat(means * weights, boundaries) / new_weights
+    return groups[boundaries], new_means, new_weights
+
+
+def _centroid_quantiles(means, weights, data_min, data_max, qs):
+    """1つのグループの重心から分位数を計算する関数
+    pandas.Series.quantileと同じく, 並べた値の位置q * (n - 1)で線形補間する
+    (重心の重みが全て1の場合は正確な値となる)
+    """
+    n = weights.sum()
+    # 各重心の中心の位置 (0始まり) と両端の値
+    centers = np.cumsum(weights) - weights / 2 - 0.5
+    positions = np.concatenate(([0.0], centers, [n - 1]))
+    values = np.concatenate(([data_min], means, [data_max]))
+    return np.interp(np.asarray(qs) * (n - 1), positions, values)
+
+
+class SeriesBuffer:
+    """1つの系列のx軸の値, 線の値, 網掛けの下端と上端を保持する追記可能なバッファ
+    容量を倍々に確保するため, 追記のコストは (償却で) 追加した点数に比例する
+    """
+
+    def __init__(self, x, center, lower, upper):
+        """
+        Args:
+            x: array-like
+                x軸の値
+            center: array-like
+                線の値 (平均値または中央値)
+            lower: array-like
+                網掛けの下端
+            upper: array-like
+                網掛けの上端
+        """
+        self._size = 0
+        self._x = np.empty(0, dtype=np.asarray(x).dtype)
+        self._values = np.empty((3, 0), dtype=np.float64)
+        self.append(x, center, lower, upper)
+
+    def append(self, x, center, lower, upper):
+        """末尾に点を追加する関数
+
+        Args:
+            x: array-like
+                追加するx軸の値
+            center: array-like
+                追加する線の値
+            lower: array-like
+                追加する網掛けの下端
+            upper: array-like
+                追加する網掛けの上端
+
+        Returns:
+            self: SeriesBuffer
+        """
+        x = np.asarray(x)
+        values = np.array([center, lower, upper], dtype=np.float64)
+        if values.shape[1:] != x.shape:
+            raise ValueError("x, center, lower and upper must have the same length")
+        size = self._size + len(x)
+        x_dtype = np.result_type(self._x, x)
+        if size > len(self._x) or x_dtype != self._x.dtype:
+            capacity = max(size, 2 * len(self._x), 16)
+            x_grown = np.empty(capacity, dtype=x_dtype)
+            x_grown[: self._size] = self._x[: self._size]
+            values_grown = np.empty((3, capacity), dtype=np.float64)
+            values_grown[:, : self._size] = self._values[:, : self._size]
+            self._x, self._values = x_grown, values_grown
+        self._x[self._size : size] = x
+        self._values[:, self._size : size] = values
+        self._size = size
+        return self
+
+    def replace(self, x, center, lower, upper):
+        """全ての点を置き換える関数 (引数はappendと同じ)
+
+        Returns:
+            self: SeriesBuffer
+        """
+        self._size = 0
+        return self.append(x, center, lower, upper)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def x(self):
+        """x軸の値 (バッファのview)"""
+        return self._x[: self._size]
+
+    @property
+    def center(self):
+        """線の値 (バッファのview)"""
+        return self._values[0, : self._size]
+
+    @property
+    def lower(self):
+        """網掛けの下端 (バッファのview)"""
+        return self._values[1, : self._size]
+
+    @property
+    def upper(self):
+        """網掛けの上端 (バッファのview)"""
+        return self._values[2, : self._size]
+
+
+class StatsCache:
+    """作図時に計算した統計量を, データと計算の種類毎に保持するLRUキャッシュ
+    データはオブジェクトの同一性 (弱参照) と, 形状, 列名, 計算に使用する列の一部の値による簡易的な指紋で識別する
+    (データ全体のハッシュは統計量の計算と同程度の時間がかかるため使用しない)
+    指紋に含まれない値をその場で書き換えた場合は検出できないため, clearを呼び出すこと
+    複数のスレッドで共有できる (計算中は排他しないため, 同じ結果を同時に計算する場合がある)
+    """
+
+    def __init__(self, maxsize=16):
+        """
+        Args:
+            maxsize: int
+                保持する結果の最大数 (超えた場合は最も長く使用されていない結果を削除)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind, data, params=None):
+        """保持している計算結果を取得する関数
+
+        Args:
+            kind: str
+                計算の種類 ("box_stats", "series_stats" 等)
+            data: pandas.DataFrame or dict
+                計算に使用したデータ
+            params: hashable
+                計算の設定 (列名等)
+
+        Returns:
+            result: 計算結果 (保持していない場合はNone)
+        """
+        objects, fingerprint = _data_fingerprint(data, params)
+        key = (kind, _hashable(params), tuple(id(o) for o in objects))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                refs, entry_fingerprint, result = entry
+                if (
+                    all(ref() is o for ref, o in zip(refs, objects))
+                    and entry_fingerprint == fingerprint
+                ):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return result
+                del self._entries[key]
+            self._misses += 1
+        return None
+
+    def put(self, kind, data, params, result):
+        """計算結果を保持する関数 (引数はgetと同じ)"""
+        objects, fingerprint = _data_fingerprint(data, params)
+        key = (kind, _hashable(params), tuple(id(o) for o in objects))
+        try:
+            refs = tuple(weakref.ref(o) for o in objects)
+        except TypeError:
+            # 弱参照を作成できないデータは保持しない
+            return
+        with self._lock:
+            self._entries[key] = (refs, fingerprint, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, kind, data, params, compute):
+        """保持している計算結果を取得し, 存在しない場合はcomputeで計算して保持する関数
+
+        Args:
+            kind, data, params:
+                getと同じ
+            compute: callable
+                引数なしで計算結果を返す関数
+
+        Returns:
+            result: 計算結果
+        """
+        result = self.get(kind, data, params)
+        if result is None:
+            result = compute()
+            self.put(kind, data, params, result)
+        return result
+
+    def clear(self):
+        """保持している全ての計算結果を削除する関数"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def hits(self):
+        """結果を再利用した回数"""
+        return self._hits
+
+    @property
+    def misses(self):
+        """結果が存在しなかった回数"""
+        return self._misses
+
+
+def _data_fingerprint(data, params):
+    """データの識別に使用するオブジェクトと, 形状, 列名, 一部の値からなる簡易的な指紋を取得する関数"""
+    if isinstance(data, Mapping):
+        objects = tuple(data.values())
+        fingerprint = tuple(
+            (key, np.shape(a), str(getattr(a, "dtype", "")), _sample_values(a))
+            for key, a in data.items()
+        )
+    else:
+        objects = (data,)
+        fingerprint = (
+            data.shape,
+            tuple(data.columns),
+            len(data.index),
+            _sample_values(data.index.to_numpy()),
+            tuple(str(dtype) for dtype in data.dtypes.unique()),
+        )
+        # 計算に使用する列 (不明な場合は全ての列) から等間隔に取り出した行の値を含める
+        # (データフレーム全体を配列に変換すると, 統合されていない場合にコピーが発生するため)
+        columns = [
+            i
+            for i, column in enumerate(data.columns)
+            if isinstance(params, tuple) and column in params
+        ] or list(range(data.shape[1]))
+        sample = data.iloc[_sample_positions(len(data.index)), columns]
+        if len(sample.dtypes.unique()) <= 1:
+            fingerprint += (_sample_values(sample.to_numpy(), sample.size),)
+        else:
+            fingerprint += tuple(
+                _sample_values(sample.iloc[:, i].to_numpy(), len(sample.index))
+                for i in range(sample.shape[1])
+            )
+    # x軸の値等の配列の設定も指紋に含める
+    if params is not None and not isinstance(params, (str, tuple)):
+        fingerprint += (_sample_values(np.asarray(params)),)
+    return objects, fingerprint
+
+
+def _sample_values(values, n_samples=64):
+    """配列から等間隔に取り出した最大n_samples個の値 (bytes)"""
+    values = np.asarray(values)
+    if values.size == 0:
+        return b""
+    sample = values.flat[_sample_positions(values.size, n_samples)]
+    if sample.dtype == object:
+        return repr(sample.tolist()).encode()
+    return sample.tobytes()
+
+
+def _sample_positions(size, n_samples=64):
+    """長さsizeの配列から等間隔に最大n_samples個の値を取り出す位置"""
+    return np.linspace(0, size - 1, min(n_samples, size)).astype(np.intp)
+
+
+def _hashable(params):
+    """計算の設定をキャッシュのキーに使用できる値に変換する関数 (配列は長さのみ)"""
+    if params is None or isinstance(params, (str, tuple)):
+        return params
+    return ("array", len(params))
@@ -1,7 +1,27 @@
+import math
+from collections.abc import Mapping
+from colorsys import rgb_to_hls
+import numpy as np
 import seaborn as sns
+import matplotlib.pyplot as plt
 import pandas as pd
-from matplotlib import patches
+from matplotlib import patches, rcParams
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.cbook import normalize_kwargs
+from matplotlib.colors import to_rgb
+from matplotlib.lines import Line2D
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextPath, TextToPath
+from matplotlib.transforms import Affine2D
 from .plot_defaults import SWARMPLOT_DEFAULTS, PLOT_DEFAULTS
+from .plot_stats import (
+    calc_box_stats,
+    calc_series_band,
+    pairwise_tests,
+    p_to_mark,
+)
+from .plot_layout import BoxLayout, BracketLevelTree, BracketPlan
+from .plot_decimate import decimate_indices
 
 
 def box_mean_plot(
@@ -12,6 +32,10 @@ def box_mean_plot(
     is_add_jitter=False,
     jitter_setting={},
     mean_setting={},
+    return_layout=False,
+    stats_cache=None,
+    legend_entries=None,
+    ax=None,
     **kwargs,
 ):
     """seaborn.boxplotに処理を追加した関数
@@ -38,41 +62,128 @@ def box_mean_plot(
             * 省略可能
         mean_setting: dict
             * ax.plotに渡す引数
+            * "is_batch": Falseを指定すると箱毎に平均値をプロットする
             * 省略可能
+        return_layout: bool
+            * Trueの場合は箱の配置(BoxLayout)も返す
+        stats_cache: StatsCache
+            * 指定した場合は各箱の統計量を保持し, 同じデータに対するsingle_describeで再利用する
+            * 省略可能
+        legend_entries: LegendEntries
+            * 指定した場合は凡例を作成せずに凡例の項目を記録する (凡例は呼び出し元で1度だけ作成する)
+            * 省略可能
+        ax: matplotlib.pyplot.Axes
+            * 作図するax
+            * 省略した場合はpyplotの現在のax (指定した場合はpyplotの状態を参照しない)
         **kwargs:
             seaborn.boxplotに渡す引数
 
     Returns:
         ax: matplotlib.pyplot.Axes (作成したグラフが入ったax)
+        layout: BoxLayout (return_layout=Trueの場合のみ)
     """
 
-    # dataとして入力されたdfのx列とhue列の型をstrに変換
-    data[x] = data[x].astype(str)
-    if hue is not None:
-        data[hue] = data[hue].astype(str)
+    # x列とhue列を文字列ラベルのカテゴリ型に変換した作図用のdfを作成 (dataは変更しない)
+    original_data = data
+    data, label_values = _to_label_frame(data, x, y, hue)
 
-    # 箱ひげ図を作成
-    ax = sns.boxplot(x=x, y=y, hue=hue, data=data, **kwargs)
+    if ax is None:
+        ax = plt.gca()
+
+    if legend_entries is None:
+        # 箱ひげ図を作成
+        ax = sns.boxplot(x=x, y=y, hue=hue, data=data, ax=ax, **kwargs)
+
+        # 箱の配置を取得 (以降の処理ではaxのartistを参照しない)
+        layout = get_box_layout(ax)
+    else:
+        # 凡例は呼び出し元で作成するため, seaborn.boxplotでは凡例を作成しない
+        n_patches = len(ax.patches)
+        ax = sns.boxplot(x=x, y=y, hue=hue, data=data, ax=ax, legend=False, **kwargs)
+
+        # 凡例の代わりにhueの順序から箱の配置を取得
+        hue_labels = None
+        if hue is not None:
+            hue_order = kwargs.get("hue_order")
+            hue_labels = (
+                list(data[hue].cat.categories)
+                if hue_order is None
+                else [str(h) for h in hue_order]
+            )
+        layout = get_box_layout(ax, hue_labels)
+
+        # hueの凡例の項目として, hue毎に最初の箱を記録
+        if hue is not None:
+            handles = _box_legend_handles(ax.patches[n_patches:], layout)
+            legend_entries.extend(
+                [handles[lb] for lb in layout.hue_labels if lb in handles],
+                [lb for lb in layout.hue_labels if lb in handles],
+            )
+            legend_entries.set_title(str(hue))
 
     # jitterを追加
     if is_add_jitter:
         # **kwargs内にhue_orderがある場合かつjitter_setting内にhue_orderがない場合はhue_orderをjitter_settingに追加
         if "hue_order" in kwargs and "hue_order" not in jitter_setting:
-            jitter_setting["hue_order"] = kwargs["hue_order"]
-        ax = add_jitter_plot(ax=ax, data=data, x=x, y=y, hue=hue, **jitter_setting)
+            jitter_setting = {**jitter_setting, "hue_order": kwargs["hue_order"]}
+        ax = add_jitter_plot(
+            ax=ax,
+            data=data,
+            x=x,
+            y=y,
+            hue=hue,
+            layout=layout,
+            legend_entries=legend_entries,
+            **jitter_setting,
+        )
+
+    # 各箱の統計量を一括で計算 (stats_cacheを指定した場合は元のデータに対する結果として保持)
+    if stats_cache is None:
+        stats = calc_box_stats(data, x, y, hue)
+    else:
+        stats, _ = stats_cache.get_or_compute(
+            "box_stats",
+            original_data,
+            (x, y, hue),
+            lambda: (calc_box_stats(data, x, y, hue), label_values),
+        )
 
     # 箱ひげ図に外れ値を除いた平均値をプロット
-    ax = add_mean_plot(ax=ax, data=data, x=x, y=y, hue=hue, **mean_setting)
+    ax = add_mean_plot(
+        ax=ax,
+        data=data,
+        x=x,
+        y=y,
+        hue=hue,
+        stats=stats,
+        layout=layout,
+        **mean_setting,
+    )
 
     # 空の凡例を削除
     if hue is None:
         if ax.get_legend() is not None:
             ax.get_legend().remove()
 
+    if return_layout:
+        return ax, layout
     return ax
 
 
-def add_jitter_plot(ax, data, x, y, hue=None, **kwargs):
+def add_jitter_plot(
+    ax,
+    data,
+    x,
+    y,
+    hue=None,
+    engine="auto",
+    swarm_threshold=1000,
+    max_points=None,
+    seed=0,
+    layout=None,
+    legend_entries=None,
+    **kwargs,
+):
     """box_mean_plotで作成した箱ひげ図にjitterをプロットする関数
 
     Args:
@@ -90,15 +201,48 @@ def add_jitter_plot(ax, data, x, y, hue=None, **kwargs):
         hue: str
             hueの列名 (dataの列名) (省略可能)
             大分類の中での分類
+        engine: str
+            * jitterの配置方法
+            * "swarm": seaborn.swarmplotで配置 (点数の2乗程度の計算時間)
+            * "grid": y方向の格子毎に点を左右に並べて配置 (点数にほぼ比例する計算時間)
+            * "auto": 1つの箱の点数がswarm_threshold以下の場合は"swarm", それ以外は"grid"
+        swarm_threshold: int
+            * engine="auto"の場合に"swarm"を使用する1つの箱の最大点数
+        max_points: int
+            * 1つの箱にプロットする最大点数
+            * 超えた場合はseedで決まる点を間引いてプロットする
+            * 省略した場合は全ての点をプロット
+        seed: int
+            * 間引きに使用する乱数のシード
+        layout: BoxLayout
+            * 箱の配置 (engine="grid"の場合に使用)
+            * 省略した場合はaxから取得する
+        legend_entries: LegendEntries
+            * 指定した場合は凡例を作成しない (jitterは凡例の項目を追加しない)
+            * 省略可能
         **kwargs:
-            seaborn.swarmplotに渡す引数
+            seaborn.swarmplot (engine="grid"の場合はax.scatter) に渡す引数
 
     Returns:
         ax: matplotlib.pyplot.Axes
     """
 
     # 現在のlegendを保存
-    handles, labels = ax.get_legend_handles_labels()
+    if legend_entries is None:
+        handles, labels = ax.get_legend_handles_labels()
+
+    # 箱ひげ図と同じ文字列ラベルのカテゴリ型で作図する
+    data = to_label_frame(data, x, y, hue)
+
+    # 各箱の点数が上限を超える場合は間引く
+    if max_points is not None:
+        data = _subsample_groups(data, x, hue, max_points, seed)
+
+    # 点数に応じて配置方法を選択
+    if engine == "auto":
+        group_keys = [x] if hue is None else [x, hue]
+        group_size = data.groupby(group_keys, observed=True).size()
+        engine = "swarm" if group_size.max() <= swarm_threshold else "grid"
 
     # swarmplotのデフォルト引数
     swarmplot_args = SWARMPLOT_DEFAULTS.copy()
@@ -106,6 +250,15 @@ def add_jitter_plot(ax, data, x, y, hue=None, **kwargs):
     # kwargsがある場合はswarmplot_argsに追加
     swarmplot_args.update(kwargs)
 
+    if engine == "grid":
+        if layout is None:
+            layout = get_box_layout(ax)
+        return _add_grid_jitter_plot(ax, data, x, y, layout, hue, **swarmplot_args)
+    elif engine != "swarm":
+        raise ValueError('engine must be "auto", "swarm" or "grid"')
+
+    # 凡例は箱ひげ図のものを使用するため, swarmplotでは凡例の項目を作成しない
+    swarmplot_args["legend"] = False
     ax = sns.swarmplot(
         ax=ax,
         x=x,
@@ -115,16 +268,217 @@ def add_jitter_plot(ax, data, x, y, hue=None, **kwargs):
         dodge=True,
         **swarmplot_args,
     )
-    # swarmplotで追加したlegendのみを削除
-    # 別の場所で改めてax.legendを実行した場合, 削除したlegendが復活するので注意
+    if legend_entries is None:
+        ax.legend(handles, labels)
+
+    return ax
+
+
+def _subsample_groups(data, x, hue, max_points, seed):
+    """各箱の点数がmax_points以下になるように, 乱数で決まる点を間引く関数
+    同じseedであれば常に同じ点が選ばれる
+
+    Args:
+        data: pandas.DataFrame
+            to_label_frameで作成したデータフレーム
+        x: str
+            x軸の列名
+        hue: str
+            hueの列名 (省略可能)
+        max_points: int
+            1つの箱の最大点数
+        seed: int
+            乱数のシード
+
+    Returns:
+        data: pandas.DataFrame
+            間引いた後のデータフレーム
+    """
+    group_codes = data[x].cat.codes.to_numpy().astype(np.intp)
     if hue is not None:
-        ax.get_legend().remove()
-    ax.legend(handles, labels)
+        n_hue = len(data[hue].cat.categories)
+        group_codes = group_codes * n_hue + data[hue].cat.codes.to_numpy()
+
+    # グループ内で乱数の順位がmax_points未満の点を残す
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(data)), group_codes))
+    rank = _rank_in_groups(group_codes[order])
+    keep = np.zeros(len(data), dtype=bool)
+    keep[order[rank < max_points]] = True
+    return data[keep]
+
+
+def _rank_in_groups(sorted_codes):
+    """グループコード順に並び替えた配列で, 各要素がグループ内で何番目かを求める関数
+
+    Args:
+        sorted_codes: numpy.ndarray
+            昇順に並び替えたグループコード
+
+    Returns:
+        rank: numpy.ndarray
+            グループ内での順位 (0始まり)
+    """
+    n = len(sorted_codes)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts = np.flatnonzero(is_start)
+    group_start = np.repeat(starts, np.diff(np.append(starts, n)))
+    return np.arange(n) - group_start
+
+
+def _add_grid_jitter_plot(
+    ax, data, x, y, layout, hue=None, size=5, palette=None, hue_order=None, **kwargs
+):
+    """箱ひげ図にjitterを格子状に配置してプロットする関数
+    y方向をマーカーの直径毎の格子に分け, 同じ格子に入る点を箱の中心から左右交互に並べる
+    並べた幅が箱の幅を超える箱は, 点の間隔を狭めて箱の幅に収める
+    並び替え1回の計算量で配置でき, 全ての点を1つのartistとしてプロットする
+
+    Args:
+        ax: matplotlib.pyplot.Axes
+            box_mean_plotで作成した箱ひげ図
+        data: pandas.DataFrame
+            to_label_frameで作成したデータフレーム
+        x: str
+            x軸の列名
+        y: str
+            y軸の列名
+        layout: BoxLayout
+            箱の配置
+        hue: str
+            hueの列名 (省略可能)
+        size: float
+            マーカーの直径 (ポイント, seaborn.swarmplotと同じ)
+        palette: list
+            hue毎の色のリスト (省略した場合はseabornのデフォルトカラーパレット)
+        hue_order: list
+            使用しない (hueの順番は箱ひげ図の凡例から取得)
+        **kwargs:
+            ax.scatterに渡す引数
+
+    Returns:
+        ax: matplotlib.pyplot.Axes
+    """
+    # 各点の箱の番号を取得 (箱ひげ図に存在しない箱の点は除外)
+    xtick_ids = pd.Index(layout.xtick_labels).get_indexer(data[x].cat.categories)
+    xtick_ids = xtick_ids[data[x].cat.codes.to_numpy()]
+    if hue is None:
+        hue_ids = np.zeros(len(data), dtype=np.intp)
+    else:
+        hue_ids = pd.Index(layout.hue_labels).get_indexer(data[hue].cat.categories)
+        hue_ids = hue_ids[data[hue].cat.codes.to_numpy()]
+    values = data[y].to_numpy(dtype=np.float64)
+    valid = (xtick_ids >= 0) & (hue_ids >= 0) & ~np.isnan(values)
+    xtick_ids = xtick_ids[valid]
+    hue_ids = hue_ids[valid]
+    values = values[valid]
+
+    # マーカーの直径をデータ座標に変換
+    bbox = ax.get_window_extent()
+    marker_px = size * ax.figure.dpi / 72
+    ylim = ax.get_ylim()
+    xlim = ax.get_xlim()
+    dy = marker_px * (ylim[1] - ylim[0]) / bbox.height
+    dx = marker_px * (xlim[1] - xlim[0]) / bbox.width
+
+    # 箱と y方向の格子の組み合わせ毎に, 格子内の順位を求める
+    hue_len = len(layout.hue_labels)
+    box_codes = xtick_ids * hue_len + hue_ids
+    bin_ids = np.floor((values - ylim[0]) / dy).astype(np.intp)
+    bin_ids -= bin_ids.min() if len(bin_ids) > 0 else 0
+    n_bins = bin_ids.max() + 1 if len(bin_ids) > 0 else 1
+    cell_codes = box_codes * n_bins + bin_ids
+    order = np.lexsort((values, cell_codes))
+    rank = np.empty(len(values), dtype=np.intp)
+    rank[order] = _rank_in_groups(cell_codes[order])
+
+    # 順位を中心から左右交互の位置に変換 (0, 1, -1, 2, -2, ...)
+    slot = (rank + 1) // 2 * np.where(rank % 2 == 1, 1, -1)
+
+    # 箱毎に, 最も広がる格子が箱の幅に収まるように点の間隔を決める
+    n_boxes = layout.centers.size
+    max_slot = np.zeros(n_boxes)
+    np.maximum.at(max_slot, box_codes, np.abs(slot))
+    with np.errstate(divide="ignore"):
+        spacing = np.minimum(dx, (layout.box_width / 2) / max_slot)
+
+    x_coods = layout.centers.ravel()[box_codes] + slot * spacing[box_codes]
+
+    # hue毎に色を設定
+    if palette is None:
+        palette = sns.color_palette()
+    colors = [to_rgb(palette[j]) for j in range(hue_len)]
+    scatter_args = {"edgecolor": _auto_line_color(colors)}
+    if "color" not in kwargs:
+        scatter_args["c"] = np.array(colors)[hue_ids]
+    scatter_args.update(kwargs)
+
+    ax.scatter(x_coods, values, s=size**2, **scatter_args)
 
     return ax
 
 
-def add_mean_plot(ax, data, x, y, hue=None, **kwargs):
+def to_label_frame(data: pd.DataFrame, x, y, hue=None):
+    """x列, hue列を文字列ラベルのカテゴリ型に変換した作図用のデータフレームを作成する関数
+    各列の値をstrに変換した場合と同じラベルを, 出現順のカテゴリとして持つ
+    ラベルへの変換は重複を除いた値に対してのみ行い, 各行は整数コードで保持する
+    入力されたdataは変更しない
+
+    Args:
+        data: pandas.DataFrame
+            * x, y, hueで指定された列を持つデータフレーム
+                * hueは省略可能
+        x: str
+            x軸の列名 (dataの列名)
+        y: str
+            y軸の列名 (dataの列名)
+        hue: str
+            hueの列名 (dataの列名) (省略可能)
+
+    Returns:
+        label_data: pandas.DataFrame
+            * x, y, hueの列のみを持つデータフレーム
+    """
+    return _to_label_frame(data, x, y, hue)[0]
+
+
+def _to_label_frame(data, x, y, hue=None):
+    """to_label_frameと同じデータフレームと, 列毎のラベルから元の値への対応を作成する関数
+
+    Returns:
+        label_data: pandas.DataFrame
+            to_label_frameの戻り値
+        label_values: dict
+            * key: x, hueの列名, value: ラベル -> 元の値のdict
+            * 元の値がカテゴリ型, 欠損値を含む, またはstrに変換すると同じになる値を含む場合はNone
+    """
+    label_data = {}
+    label_values = {}
+    for key in [x, y] if hue is None else [x, y, hue]:
+        if key == y:
+            label_data[key] = data[key]
+            continue
+        codes, uniques = pd.factorize(data[key], use_na_sentinel=False)
+        # strに変換すると同じラベルになる値をまとめる
+        label_codes, labels = pd.factorize(np.array([str(u) for u in uniques]))
+        label_data[key] = pd.Series(
+            pd.Categorical.from_codes(label_codes[codes], categories=labels),
+            index=data.index,
+            name=key,
+        )
+        is_exact = (
+            len(labels) == len(uniques)
+            and not pd.isna(uniques).any()
+            and not isinstance(data[key].dtype, pd.CategoricalDtype)
+        )
+        label_values[key] = dict(zip(labels, uniques)) if is_exact else None
+    return pd.DataFrame(label_data, index=data.index), label_values
+
+
+def add_mean_plot(
+    ax, data, x, y, hue=None, stats=None, layout=None, is_batch=True, **kwargs
+):
     """box_mean_plotで作成した箱ひげ図に, 外れ値を除いた平均値をプロットする関数
 
     Args:
@@ -142,6 +496,16 @@ def add_mean_plot(ax, data, x, y, hue=None, **kwargs):
         hue: str
             hueの列名 (dataの列名) (省略可能)
             大分類の中での分類
+        stats: pandas.DataFrame
+            * calc_box_statsで計算した各箱の統計量
+            * 省略した場合はdataから計算する
+        layout: BoxLayout
+            * 箱の配置
+            * 省略した場合はaxから取得する
+        is_batch: bool
+            * True: 全ての平均値を1つのartistとしてまとめてプロット
+                * 箱の数によらずartistの数が一定になる
+            * False: 箱毎にax.plotを実行してプロット
         **kwargs:
             ax.plotに渡す引数
 
@@ -155,54 +519,314 @@ def add_mean_plot(ax, data, x, y, hue=None, **kwargs):
     # kwargsがある場合はplot_argsに追加
     plot_args.update(kwargs)
 
-    # 箱ひげ図の幅を取得
-    boxwidth = get_boxwidth(ax)
+    # 各箱の統計量を取得
+    if stats is None:
+        stats = calc_box_stats(data, x, y, hue)
+
+    # 箱の配置を取得
+    if layout is None:
+        layout = get_box_layout(ax)
+    xticks_labels = layout.xtick_labels
+    leg_labels = layout.hue_labels
 
-    # legendのラベルを取得
+    # 各箱の外れ値を除いた平均値を取得 (データが存在しない箱はnan)
     if hue is None:
-        leg_labels = [None]
+        means = stats["mean"].reindex(xticks_labels).to_numpy()
+        means = means.reshape(len(xticks_labels), 1)
     else:
-        labels = ax.get_legend().get_texts()
-        leg_labels = [lb.get_text() for lb in labels]
-
-    # xticksのラベルを取得
-    xticks_labels = ax.get_xticklabels()
-    xticks_labels = [x.get_text() for x in xticks_labels]
+        box_keys = pd.MultiIndex.from_product([xticks_labels, leg_labels])
+        means = stats["mean"].reindex(box_keys).to_numpy()
+        means = means.reshape(len(xticks_labels), len(leg_labels))
+
+    # 箱ひげ図に外れ値を除いた平均値をまとめてプロット
+    if is_batch:
+        # 各点を線で結ばないようにマーカーのみを表示
+        plot_args.pop("ls", None)
+        plot_args["linestyle"] = "none"
+        ax.plot(layout.centers.ravel(), means.ravel(), **plot_args)
+        return ax
 
-    # 箱ひげ図に外れ値を除いた平均値をプロット
-    for i, xt_label in enumerate(xticks_labels):
-        for j, leg_label in enumerate(leg_labels):
-            # データの四分位範囲を取得
-            condition = data[x] == xt_label
-            if hue is not None:
-                condition = condition & (data[hue] == leg_label)
-            q1 = data[condition][y].quantile(0.25)
-            q3 = data[condition][y].quantile(0.75)
-            iqr = q3 - q1
-            lower_bound = q1 - 1.5 * iqr
-            upper_bound = q3 + 1.5 * iqr
-
-            # 四分位範囲内のデータのみを抽出
-            on_bound_condition = (
-                (data[x] == xt_label)
-                & (data[y] >= lower_bound)
-                & (data[y] <= upper_bound)
-            )
-            if hue is not None:
-                on_bound_condition = on_bound_condition & (data[hue] == leg_label)
-            df_tmp = data[on_bound_condition]
-            x_cood = get_boxcenter_x(boxwidth, i, j, len(leg_labels))
+    # 箱ひげ図に外れ値を除いた平均値を箱毎にプロット
+    for i in range(len(xticks_labels)):
+        for j in range(len(leg_labels)):
+            x_cood = layout.centers[i, j]
 
             # 平均値のプロット
             ax.plot(
                 x_cood,
-                [df_tmp[y].mean()],
+                [means[i, j]],
                 **plot_args,
             )
 
     return ax
 
 
+def box_stats_plot(
+    data: pd.DataFrame,
+    x,
+    y=None,
+    hue=None,
+    order=None,
+    hue_order=None,
+    fliers=None,
+    mean_setting={},
+    width=0.8,
+    palette=None,
+    saturation=0.75,
+    ax=None,
+    return_layout=False,
+    legend_entries=None,
+    **kwargs,
+):
+    """集計済みの統計量から箱ひげ図を作成する関数
+    matplotlib.axes.Axes.bxpで描画し, box_mean_plotと同じ位置に箱と平均値を配置する
+    生データを走査しないため, データ数によらず高速に描画できる
+    作成したaxにはadd_brackets_for_boxplotでブラケットを追加可能
+
+    Args:
+        data: pandas.DataFrame
+            * 1行が1つの箱に対応する統計量のデータフレーム
+            * x, hueで指定された列と以下の列を持つ
+                * q1: 第1四分位数
+                * median: 中央値
+                * q3: 第3四分位数
+                * whislo: ひげの下端
+                * whishi: ひげの上端
+                * mean: 平均値 (省略した場合は平均値をプロットしない)
+            * calc_box_statsの戻り値もそのまま使用可能
+        x: str
+            x軸の列名 (dataの列名)
+            大分類
+        y: str
+            y軸のラベル (省略可能)
+        hue: str
+            hueの列名 (dataの列名) (省略可能)
+            大分類の中での分類
+        order: list
+            * x軸のラベルの順番
+            * 省略した場合はdataでの出現順
+        hue_order: list
+            * hueのラベルの順番
+            * 省略した場合はdataでの出現順
+        fliers: dict
+            * 外れ値の配列
+            * key: xのラベル (hueを指定した場合は(xのラベル, hueのラベル))
+            * value: 外れ値の配列
+            * 省略可能
+        mean_setting: dict
+            * 平均値をプロットする際の設定 (add_mean_plotに渡す引数)
+            * 省略可能
+        width: float
+            * 同じx軸のラベルの箱全体の幅
+        palette: list
+            * 色のリスト
+            * 省略した場合はseabornのデフォルトカラーパレット
+        saturation: float
+            * 箱の塗りつぶし色の彩度 (seaborn.boxplotと同じ)
+        ax: matplotlib.pyplot.Axes
+            * 箱ひげ図を作成するax
+            * 省略した場合はpyplotの現在のax (指定した場合はpyplotの状態を参照しない)
+        return_layout: bool
+            * Trueの場合は箱の配置(BoxLayout)も返す
+        legend_entries: LegendEntries
+            * 指定した場合は凡例を作成せずに凡例の項目を記録する (凡例は呼び出し元で1度だけ作成する)
+            * 省略可能
+        **kwargs:
+            matplotlib.axes.Axes.bxpに渡す引数
+
+    Returns:
+        ax: matplotlib.pyplot.Axes (作成したグラフが入ったax)
+        layout: BoxLayout (return_layout=Trueの場合のみ)
+    """
+    if ax is None:
+        ax = plt.gca()
+
+    # calc_box_statsの戻り値のようにラベルがindexにある場合は列に戻す
+    if x not in data.columns:
+        data = data.reset_index()
+
+    required_cols = ["q1", "median", "q3", "whislo", "whishi"]
+    missing_cols = [c for c in required_cols if c not in data.columns]
+    if missing_cols:
+        raise ValueError(f"data must have columns {required_cols}")
+
+    # 各箱のラベルを取得
+    x_labels = [str(v) for v in data[x]]
+    hue_labels = [None] * len(data) if hue is None else [str(v) for v in data[hue]]
+    if order is None:
+        order = list(dict.fromkeys(x_labels))
+    order = [str(o) for o in order]
+    if hue is None:
+        hue_order = [None]
+    elif hue_order is None:
+        hue_order = list(dict.fromkeys(hue_labels))
+    else:
+        hue_order = [str(h) for h in hue_order]
+
+    # 色を設定 (seaborn.boxplotと同じ彩度と線の色)
+    if palette is None:
+        palette = sns.color_palette()
+    base_colors = [to_rgb(palette[j]) for j in range(len(hue_order))]
+    colors = [sns.desaturate(c, saturation) for c in base_colors]
+    line_color = _auto_line_color(base_colors)
+
+    # 箱の配置を作成
+    layout = BoxLayout(
+        order, hue_order if hue is not None else None, width / len(hue_order)
+    )
+    box_width = layout.box_width
+
+    # 各箱の統計量と位置を作成
+    fliers = {} if fliers is None else fliers
+    bxpstats = []
+    positions = []
+    box_colors = []
+    for row, x_label, hue_label in zip(
+        data.itertuples(index=False), x_labels, hue_labels
+    ):
+        if x_label not in order or hue_label not in hue_order:
+            continue
+        i = order.index(x_label)
+        j = hue_order.index(hue_label)
+        key = x_label if hue is None else (x_label, hue_label)
+        bxpstats.append(
+            {
+                "q1": row.q1,
+                "med": row.median,
+                "q3": row.q3,
+                "whislo": row.whislo,
+                "whishi": row.whishi,
+                "fliers": np.asarray(fliers.get(key, []), dtype=float),
+            }
+        )
+        positions.append(layout.centers[i, j])
+        box_colors.append(colors[j])
+
+    # 箱ひげ図を作成
+    line_props = {"color": line_color, "linewidth": 1}
+    bxp_args = {
+        "widths": box_width,
+        "capwidths": box_width / 2,
+        "patch_artist": True,
+        "manage_ticks": False,
+        "boxprops": {"edgecolor": line_color, "linewidth": 1},
+        "whiskerprops": line_props,
+        "capprops": line_props,
+        "medianprops": line_props,
+        "flierprops": {"markeredgecolor": line_color},
+    }
+    bxp_args.update(kwargs)
+    artists = ax.bxp(bxpstats, positions=positions, **bxp_args)
+    for box, color in zip(artists["boxes"], box_colors):
+        box.set_facecolor(color)
+
+    # 軸を設定 (seaborn.boxplotと同じ)
+    ax.set_xticks(range(len(order)), order)
+    ax.set_xlim(-0.5, len(order) - 0.5)
+    ax.xaxis.grid(False)
+    ax.set_xlabel(x)
+    if y is not None:
+        ax.set_ylabel(y)
+
+    # hueの凡例を作成
+    if hue is not None:
+        for hue_label, color in zip(hue_order, colors):
+            handle = ax.add_artist(
+                patches.Rectangle(
+                    (0, 0),
+                    0,
+                    0,
+                    facecolor=color,
+                    edgecolor=line_color,
+                    linewidth=1,
+                    label=hue_label,
+                )
+            )
+            if legend_entries is not None:
+                legend_entries.add(handle, hue_label)
+        if legend_entries is None:
+            ax.legend(title=hue)
+        else:
+            legend_entries.set_title(hue)
+
+    # 平均値をプロット
+    if "mean" in data.columns:
+        mean_index = (
+            pd.Index(x_labels)
+            if hue is None
+            else pd.MultiIndex.from_arrays([x_labels, hue_labels])
+        )
+        stats = pd.DataFrame({"mean": data["mean"].to_numpy()}, index=mean_index)
+        ax = add_mean_plot(
+            ax=ax,
+            data=None,
+            x=x,
+            y=y,
+            hue=hue,
+            stats=stats,
+            layout=layout,
+            **mean_setting,
+        )
+
+    if return_layout:
+        return ax, layout
+    return ax
+
+
+def _auto_line_color(colors):
+    """seabornと同じく, 塗りつぶし色から線の色 (灰色) を決める関数
+
+    Args:
+        colors: list
+            塗りつぶしに使用する色 (RGB) のリスト
+
+    Returns:
+        line_color: tuple
+            線の色 (RGB)
+    """
+    lum = min(rgb_to_hls(*c)[1] for c in colors) * 0.6
+    return (lum, lum, lum)
+
+
+def get_box_layout(ax, hue_labels=None):
+    """箱ひげ図が作成されたaxから箱の配置(BoxLayout)を作成する関数
+    axのartistを走査するため, 箱ひげ図の作成直後に1度だけ実行する
+
+    Args:
+        ax: matplotlib.pyplot.Axes
+            箱ひげ図が作成されたax
+        hue_labels: list of str
+            * hueのラベル (同じx軸のラベルの中で左から順)
+            * 省略した場合はaxの凡例から取得する
+
+    Returns:
+        layout: BoxLayout
+    """
+    xtick_labels = [lb.get_text() for lb in ax.get_xticklabels()]
+    if hue_labels is None:
+        legend = ax.get_legend()
+        hue_labels = (
+            [lb.get_text() for lb in legend.get_texts()] if legend is not None else None
+        )
+    return BoxLayout(xtick_labels, hue_labels, get_boxwidth(ax))
+
+
+def _box_legend_handles(box_patches, layout):
+    """箱ひげ図の箱 (PathPatch) から, hueのラベル毎に最初の箱を取得する関数
+    箱の中心のx座標に最も近い箱の配置からhueを判定する
+    """
+    handles = {}
+    offsets = layout.centers[0] - layout.centers[0].mean()
+    for patch in box_patches:
+        if isinstance(patch, patches.Rectangle):
+            continue
+        vertices = patch.get_path().vertices
+        center = (vertices[:, 0].min() + vertices[:, 0].max()) / 2
+        j = int(np.argmin(np.abs(offsets - (center - round(center)))))
+        handles.setdefault(layout.hue_labels[j], patch)
+    return handles
+
+
 def get_boxwidth(ax):
     # 各箱ひげ図のx座標の位置を取得 (ax.patches を使用)
     xlists = []
@@ -277,7 +901,14 @@ def get_boxcenter_x(boxwidth, xtick_id, hue_id, hue_len):
 
 
 def add_brackets_for_boxplot(
-    ax, brackets, bracket_base_y=None, h_ratio=0.02, hspace_ratio=0.1, fs=10
+    ax,
+    brackets,
+    bracket_base_y=None,
+    h_ratio=0.02,
+    hspace_ratio=0.1,
+    fs=10,
+    layout=None,
+    is_batch=True,
 ):
     """
     箱ひげ図が追加された状態のaxに[([str, str], [str, str], str), ([str, str], [str, str], str), ...]で指定される有意差を表示する
@@ -305,6 +936,12 @@ def add_brackets_for_boxplot(
             有意差を表示するブラケットの高さ間隔の(グラフエリア高さに対する)比率
         fs: int
             有意差マークのフォントサイズ
+        layout: BoxLayout
+            * 箱の配置
+            * 省略した場合はaxから取得する
+        is_batch: bool
+            * True: 全てのブラケットと有意差マークをそれぞれ1つのartistとしてまとめてプロット
+            * False: ブラケット毎にax.plot, ax.textを実行してプロット
 
     Returns:
         ax: matplotlib.pyplot.Axes
@@ -312,54 +949,189 @@ def add_brackets_for_boxplot(
     if not brackets:
         return ax
 
-    # x軸のラベルを取得
-    xtick_labels = [x.get_text() for x in ax.get_xticklabels()]
+    # 箱の配置を取得
+    if layout is None:
+        layout = get_box_layout(ax)
+
+    # ブラケットの配置を計算して適用
+    plan = compile_brackets(brackets, layout, h_ratio, hspace_ratio)
+    return apply_bracket_plan(ax, plan, bracket_base_y, fs, is_batch=is_batch)
 
-    # 凡例のラベルを取得
-    legend_labels = (
-        [lb.get_text() for lb in ax.get_legend().get_texts()]
-        if ax.get_legend()
-        else [None]
-    )
 
-    # 箱ひげ図の幅を取得
-    box_width = get_boxwidth(ax)
+def compile_brackets(brackets, layout, h_ratio=0.02, hspace_ratio=0.1):
+    """
+    ブラケットの指定を箱の配置に対して1度だけ計算し, BracketPlanを作成する関数
+    ラベルのチェック, x座標の計算, 重ならない段の探索を行う
+    作成したBracketPlanはapply_bracket_planで同じ配置の箱ひげ図に繰り返し適用できる
 
+    Args:
+        brackets: list of tuple([str, str], [str, str], str)
+            * add_brackets_for_boxplotと同じ形式
+        layout: BoxLayout
+            * 箱の配置
+        h_ratio: float
+            有意差を表示するブラケットの高さの(グラフエリア高さに対する)比率
+        hspace_ratio: float
+            有意差を表示するブラケットの高さ間隔の(グラフエリア高さに対する)比率
+
+    Returns:
+        plan: BracketPlan
+    """
     # 各ブラケットの形式をチェック
     for b in brackets:
-        check_bracket(b, xtick_labels, legend_labels)
+        check_bracket(b, layout.xtick_labels, layout.hue_labels)
+
+    # ブラケットの位置を計算 (段は基準位置0, 高さと間隔はグラフエリア高さに対する比率で計算)
+    brackets_pos_list = convert_brackets_to_positions(brackets, layout, 0, h_ratio)
+    brackets_pos_list = sorted(brackets_pos_list, key=lambda x: x["x2"] - x["x1"])
+    levels = assign_bracket_levels(
+        [(b["x1"], b["x2"]) for b in brackets_pos_list], h_ratio, hspace_ratio
+    )
+
+    return BracketPlan(
+        [b["x1"] for b in brackets_pos_list],
+        [b["x2"] for b in brackets_pos_list],
+        levels,
+        [b["mark"] for b in brackets_pos_list],
+        h_ratio,
+        hspace_ratio,
+        layout,
+    )
 
-    # ブラケットの高さと間隔を計算
-    bracket_height = h_ratio * get_graph_area(ax)[0]
-    bracket_hspace = hspace_ratio * get_graph_area(ax)[0]
-    ph = bracket_height
+
+def apply_bracket_plan(
+    ax, plan, bracket_base_y=None, fs=10, layout=None, is_batch=True
+):
+    """
+    compile_bracketsで作成したBracketPlanをaxに適用してブラケットを表示する関数
+    y軸の範囲に合わせてy座標を計算し, プロットのみを行う
+
+    Args:
+        ax: matplotlib.pyplot.Axes
+            * 箱ひげ図が追加された状態のax
+        plan: BracketPlan
+            * ブラケットの配置
+        bracket_base_y: float
+            有意差を表示するy軸の基準位置 (省略した場合はy軸の上端)
+        fs: int
+            有意差マークのフォントサイズ
+        layout: BoxLayout
+            * axの箱の配置 (省略可能)
+            * 指定した場合はplanの作成に使用した配置とラベルが一致するかをチェックする
+        is_batch: bool
+            * plot_bracketsと同じ
+
+    Returns:
+        ax: matplotlib.pyplot.Axes
+    """
+    if layout is not None and not plan.is_compatible(layout):
+        raise ValueError("the layout of ax does not match the layout of the plan")
+    if len(plan) == 0:
+        return ax
+
+    graph_height = get_graph_area(ax)[0]
+    ph = plan.h_ratio * graph_height
 
     # 基準となるy座標を設定
     if bracket_base_y is None:
         bracket_base_y = ax.get_ylim()[1]
 
-    base_y = bracket_base_y
-
-    # ブラケットの位置を計算
-    brackets_pos_list = convert_brackets_to_positions(
-        brackets, xtick_labels, legend_labels, base_y, bracket_height, box_width
+    # ブラケットをプロット
+    plot_brackets(
+        ax, plan.to_positions(bracket_base_y, graph_height), ph, fs, is_batch=is_batch
     )
-    brackets_pos_list = sorted(brackets_pos_list, key=lambda x: x["x2"] - x["x1"])
 
-    # ブラケットの位置を調整
-    brackets_confirmed = adjust_bracket_positions(
-        brackets_pos_list, base_y, bracket_height, bracket_hspace
-    )
+    return ax
 
-    # ブラケットをプロット
-    plot_brackets(ax, brackets_confirmed, ph, fs)
 
+def add_auto_brackets_for_boxplot(
+    ax,
+    data: pd.DataFrame,
+    x,
+    y,
+    hue=None,
+    pairs=None,
+    test="welch",
+    correction="holm",
+    thresholds=((0.001, "***"), (0.01, "**"), (0.05, "*")),
+    ns_mark=None,
+    n_permutations=10000,
+    seed=0,
+    layout=None,
+    return_results=False,
+    **kwargs,
+):
+    """
+    箱ひげ図が追加された状態のaxに, 箱同士の検定結果から作成した有意差を表示する
+    検定はpairwise_testsで全ての組み合わせについて一括で行う
+
+    Args:
+        ax: matplotlib.pyplot.Axes
+            * box_mean_plotまたはbox_stats_plotで作成した箱ひげ図
+        data: pandas.DataFrame
+            * 箱ひげ図の作成に使用したデータフレーム (集計前の生データ)
+        x: str
+            x軸の列名 (dataの列名)
+        y: str
+            y軸の列名 (dataの列名)
+        hue: str
+            hueの列名 (dataの列名) (省略可能)
+        pairs: list of tuple([str, str], [str, str])
+            * 検定する箱の組み合わせのリスト
+            * 省略した場合は全ての箱の組み合わせ
+        test: str
+            * 検定の種類 ("welch", "mannwhitney", "permutation")
+        correction: str
+            * 多重比較の補正方法 ("bonferroni", "holm", "fdr_bh", None)
+        thresholds: list of tuple(float, str)
+            * 有意差マークの(閾値, マーク)のリスト
+        ns_mark: str
+            * 有意差がない場合のマーク
+            * 省略した場合は有意差がない組み合わせのブラケットは表示しない
+        n_permutations: int
+            * test="permutation"の場合の並べ替えの回数
+        seed: int
+            * test="permutation"の場合の乱数のシード
+        layout: BoxLayout
+            * 箱の配置
+            * 省略した場合はaxから取得する
+        return_results: bool
+            * Trueの場合は(ax, 検定結果のデータフレーム)を返す
+        kwargs: add_brackets_for_boxplotの引数
+
+    Returns:
+        ax: matplotlib.pyplot.Axes
+        results: pandas.DataFrame (return_results=Trueの場合のみ)
+            * pairwise_testsの結果に有意差マークの列 (mark) を追加したもの
+    """
+    results = pairwise_tests(
+        data,
+        x,
+        y,
+        hue=hue,
+        pairs=pairs,
+        test=test,
+        correction=correction,
+        n_permutations=n_permutations,
+        seed=seed,
+    )
+    marks = p_to_mark(results["p_adj"], thresholds, ns_mark)
+    results["mark"] = pd.Series(marks, index=results.index, dtype=object)
+
+    # 有意差マークが存在する組み合わせのみブラケットを作成
+    brackets = [
+        (g1, g2, mark)
+        for g1, g2, mark in zip(results["group1"], results["group2"], marks)
+        if mark is not None
+    ]
+    add_brackets_for_boxplot(ax, brackets, layout=layout, **kwargs)
+
+    if return_results:
+        return ax, results
     return ax
 
 
-def convert_brackets_to_positions(
-    brackets, xtick_labels, legend_labels, y_base, bracket_height, box_width
-):
+def convert_brackets_to_positions(brackets, layout, y_base, bracket_height):
     """
     ブラケットの位置情報を計算する関数
 
@@ -374,14 +1146,12 @@ def convert_brackets_to_positions(
                     * 2つ目のstr: hueのラベル名
                 * タプルの要素3: p値を示す文字列(str)
             * hueが存在しない場合はhueのラベル名は空白
-        legend_labels: list
-            * 凡例のラベル
+        layout: BoxLayout
+            * 箱の配置
         y_base: float
             * ブラケットの基準位置
         bracket_height: float
             * ブラケットの高さ
-        box_width: float
-            * 箱ひげ図の幅
 
     Returns:
         brackets_pos_list: list of dict
@@ -400,40 +1170,9 @@ def convert_brackets_to_positions(
     """
     brackets_pos_list = []
     for b in brackets:
-        # ブラケットのx座標を計算
-        if b[0][0] not in xtick_labels:
-            raise ValueError("the label of brackets is not in xtick_labels")
-        if b[0][1] not in legend_labels and b[0][1] != "":
-            raise ValueError("the label of brackets is not in legend_labels")
-        if b[1][0] not in xtick_labels:
-            raise ValueError("the label of brackets is not in xtick_labels")
-        if b[1][1] not in legend_labels and b[1][1] != "":
-            raise ValueError("the label of brackets is not in legend_labels")
-
-        # xtick_labelsとlegend_labelsからx座標と凡例が何番目かを取得
-        x1_xtick_id = xtick_labels.index(b[0][0])
-        x2_xtick_id = xtick_labels.index(b[1][0])
-        x1_hue_id = legend_labels.index(b[0][1])
-        x2_hue_id = legend_labels.index(b[1][1])
-
-        # 凡例が空白の場合は0に設定
-        if b[0][1] == "":
-            x1_hue_id = 0
-        if b[1][1] == "":
-            x2_hue_id = 0
-
-        x1 = get_boxcenter_x(
-            box_width,
-            x1_xtick_id,
-            x1_hue_id,
-            len(legend_labels),
-        )
-        x2 = get_boxcenter_x(
-            box_width,
-            x2_xtick_id,
-            x2_hue_id,
-            len(legend_labels),
-        )
+        # ブラケットのx座標を計算 (存在しないラベルの場合はValueError)
+        x1 = layout.get_center(b[0][0], b[0][1])
+        x2 = layout.get_center(b[1][0], b[1][1])
         if x2 < x1:
             x1, x2 = x2, x1
         # ブラケットの位置情報を追加
@@ -452,6 +1191,7 @@ def convert_brackets_to_positions(
 def adjust_bracket_positions(brackets_pos_list, base_y, bracket_height, bracket_hspace):
     """
     ブラケットの高さを調整して, ブラケット同士が重ならないように座標を調整する関数
+    各ブラケットの段はassign_bracket_levelsで計算する
 
     Args:
         brackets_pos_list: list of dict
@@ -488,23 +1228,86 @@ def adjust_bracket_positions(brackets_pos_list, base_y, bracket_height, bracket_
                     * ブラケットの下端のy座標
                 * y_bar: float
     """
+    levels = assign_bracket_levels(
+        [(b["x1"], b["x2"]) for b in brackets_pos_list], bracket_height, bracket_hspace
+    )
     brackets_confirmed = []
-    for i, b in enumerate(brackets_pos_list):
-        if i == 0:
-            # 最初のブラケットの位置を設定
-            b["y_bottom"] = base_y
-            b["y_bar"] = base_y + bracket_height
-        else:
-            # 他のブラケットの位置を調整
-            b["y_bottom"] = search_y_pos(
-                brackets_confirmed, b, base_y, bracket_height, bracket_hspace
-            )
-            b["y_bar"] = b["y_bottom"] + bracket_height
+    for b, level in zip(brackets_pos_list, levels):
+        b["y_bottom"] = base_y + level * bracket_hspace
+        b["y_bar"] = b["y_bottom"] + bracket_height
         brackets_confirmed.append(b)
     return brackets_confirmed
 
 
-def plot_brackets(ax, brackets, ph, fs):
+def assign_bracket_levels(spans, bracket_height, bracket_hspace):
+    """
+    各ブラケットをリストの順に, 既存のブラケットと重ならない最も低い段に割り当てる関数
+    段の使用状況はx方向の区間毎にBracketLevelTreeで管理し, 1つのブラケットの配置をO(log n)で行う
+    段kのブラケットの下端は基準位置 + k * bracket_hspaceとなる
+
+    Args:
+        spans: list of tuple(float, float)
+            * ブラケットの(左端, 右端)のx座標
+        bracket_height: float
+            * ブラケットの高さ
+        bracket_hspace: float
+            * ブラケットの高さ間隔
+
+    Returns:
+        levels: list of int
+            * ブラケットの段 (引数spansに対応)
+    """
+    if not spans:
+        return []
+    if bracket_hspace <= 0:
+        raise ValueError("bracket_hspace must be positive")
+
+    # ブラケットの端のx座標を番号に変換
+    # 番号pの端は区間2p, 端pと端p+1の間は区間2p+1に対応する
+    xs = np.unique([x for span in spans for x in span])
+    n_cells = 2 * len(xs) - 1
+    # 端を含む範囲 (段0の判定に使用) と端を含まない範囲 (段1以上の判定に使用) の使用状況
+    # 幅0のブラケット同士は段1以上では重ならないため, 端を含まない範囲とは別に管理する
+    closed_levels = BracketLevelTree(n_cells)
+    open_levels = BracketLevelTree(n_cells)
+    point_levels = BracketLevelTree(n_cells)
+
+    # 高さと高さ間隔の比 (浮動小数点の誤差で整数からわずかにずれた場合は整数とみなす)
+    ratio = bracket_height / bracket_hspace
+    # 段0に配置する場合に重なるとみなす段 (上下で接する場合も重なるとみなす)
+    closed_mask = (1 << (math.floor(ratio + 1e-9) + 1)) - 1
+    # 段1以上に配置する場合に上下で重なるとみなす段の差 (上下で接する場合は重ならない)
+    n_neighbor = math.ceil(ratio - 1e-9) - 1
+
+    levels = []
+    for x1, x2 in spans:
+        left = 2 * int(np.searchsorted(xs, x1))
+        right = 2 * int(np.searchsorted(xs, x2))
+
+        if closed_levels.query(left, right) & closed_mask == 0:
+            level = 0
+        else:
+            # 段0と, 上下で重なる段を使用済みとして最も低い空き段を探す
+            if left < right:
+                used = open_levels.query(left + 1, right - 1)
+                used |= point_levels.query(left + 1, right - 1)
+            else:
+                used = open_levels.query(left, left)
+            blocked = used | 1
+            for k in range(1, n_neighbor + 1):
+                blocked |= (used << k) | (used >> k)
+            level = (~blocked & (blocked + 1)).bit_length() - 1
+
+        closed_levels.add(left, right, level)
+        if left < right:
+            open_levels.add(left + 1, right - 1, level)
+        else:
+            point_levels.add(left, left, level)
+        levels.append(level)
+    return levels
+
+
+def plot_brackets(ax, brackets, ph, fs, is_batch=True):
     """
     複数のブラケットをプロットし, 各ブラケットにp値を表すマークをプロットする関数
 
@@ -524,14 +1327,33 @@ def plot_brackets(ax, brackets, ph, fs):
                     * ブラケットの下端のy座標
                 * y_bar: float
                     * ブラケットの上端のy座標
+                * color: ブラケットとマークの色 (省略可能, デフォルト: "black")
+                * lw: float
+                    * ブラケットの線の太さ (省略可能, デフォルト: 1)
         ph: float
             * マークをプロットするy座標 (ブラケットの上端からの相対位置)
         fs: int
             * 有意差マークのフォントサイズ
+        is_batch: bool
+            * True: 全てのブラケットを1つのLineCollection, 全てのマークを1つのPathCollectionとしてプロット
+                * ブラケットの数によらずartistの数が一定になる
+            * False: ブラケット毎にax.plot, ax.textを実行してプロット
     """
+    if is_batch:
+        plot_brackets_batch(ax, brackets, ph, fs)
+        return
+
     for b in brackets:
         # ブラケットをプロット
-        plot_bracket(ax, b["x1"], b["x2"], b["y_bottom"], b["y_bar"])
+        plot_bracket(
+            ax,
+            b["x1"],
+            b["x2"],
+            b["y_bottom"],
+            b["y_bar"],
+            color=b.get("color", "black"),
+            lw=b.get("lw", 1),
+        )
         # p値を表す文字列をプロット
         ax.text(
             (b["x1"] + b["x2"]) / 2,
@@ -540,10 +1362,83 @@ def plot_brackets(ax, brackets, ph, fs):
             ha="center",
             va="center",
             fontsize=fs,
+            color=b.get("color", "black"),
         )
 
 
-def plot_bracket(ax, x1, x2, y_bottom, y_top):
+def plot_brackets_batch(ax, brackets, ph, fs):
+    """
+    複数のブラケットを1つのLineCollectionとして, 各ブラケットのマークを1つのPathCollectionとしてプロットする関数
+    マークは文字列の形状 (TextPath) をマーカーとして描画するため, ax.textとほぼ同じ見た目になる
+
+    Args:
+        ax: matplotlib.pyplot.Axes
+            * ブラケットをプロットする対象のax
+        brackets: list of dict
+            * ブラケットの位置情報 (plot_bracketsと同じ)
+        ph: float
+            * マークをプロットするy座標 (ブラケットの上端からの相対位置)
+        fs: int
+            * 有意差マークのフォントサイズ
+
+    Returns:
+        (lines, marks): (LineCollection, PathCollection)
+    """
+    if not brackets:
+        return None, None
+
+    colors = [b.get("color", "black") for b in brackets]
+
+    # ブラケットをまとめてプロット
+    segments = [
+        [
+            (b["x1"], b["y_bottom"]),
+            (b["x1"], b["y_bar"]),
+            (b["x2"], b["y_bar"]),
+            (b["x2"], b["y_bottom"]),
+        ]
+        for b in brackets
+    ]
+    lines = LineCollection(
+        segments, colors=colors, linewidths=[b.get("lw", 1) for b in brackets]
+    )
+    ax.add_collection(lines)
+
+    # 同じ文字列の形状は1度だけ作成し, 中心が原点になるように移動
+    font = FontProperties(size=fs)
+    text_to_path = TextToPath()
+    # ax.textと同じく, 行の高さは"lp"の高さ以上とする
+    _, lp_height, lp_descent = text_to_path.get_text_width_height_descent(
+        "lp", font, ismath=False
+    )
+    mark_paths = {}
+    for mark in dict.fromkeys(b["mark"] for b in brackets):
+        path = TextPath((0, 0), mark, prop=font)
+        # ax.text(va="center")と同じく, 文字列の行の高さの中心を原点にする
+        _, height, descent = text_to_path.get_text_width_height_descent(
+            mark, font, ismath=False
+        )
+        height = max(height, lp_height)
+        descent = max(descent, lp_descent)
+        center_x = path.get_extents().x0 + path.get_extents().width / 2
+        center_y = height / 2 - descent
+        mark_paths[mark] = path.transformed(Affine2D().translate(-center_x, -center_y))
+
+    # マークをまとめてプロット (形状はポイント単位で, 位置はデータ座標で指定)
+    marks = PathCollection(
+        [mark_paths[b["mark"]] for b in brackets],
+        offsets=[((b["x1"] + b["x2"]) / 2, ph + b["y_bar"]) for b in brackets],
+        offset_transform=ax.transData,
+        transform=Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans,
+        facecolors=colors,
+        linewidths=0,
+    )
+    ax.add_collection(marks, autolim=False)
+
+    return lines, marks
+
+
+def plot_bracket(ax, x1, x2, y_bottom, y_top, color="black", lw=1):
     """
     ブラケットをプロットする関数
 
@@ -558,77 +1453,20 @@ def plot_bracket(ax, x1, x2, y_bottom, y_top):
             * ブラケットの下端のy座標
         y_top: float
             * ブラケットの上端のy座標
+        color: str
+            * ブラケットの色
+        lw: float
+            * ブラケットの線の太さ
     """
     # ブラケットをプロット
     ax.plot(
         [x1, x1, x2, x2],
         [y_bottom, y_top, y_top, y_bottom],
-        lw=1,
-        color="black",
+        lw=lw,
+        color=color,
     )
 
 
-def search_y_pos(brackets_confirmed, b, base_y, bracket_height, bracket_hspace):
-    """brackets_confirmedに追加されるbのy座標を再帰的に探索する関数
-    bracketの占有範囲は[x1, y_bottom]から[x2, y_bar]で表現される四角形
-    base_yの高さに配置できる場合はbase_yがy_bottomとなる
-    base_yに配置すると重なる場合はy_bottomにbracket_hspaceを加算し,
-
-    Args:
-        brackets_confirmed: list
-            * すでに設定されたブラケットのリスト
-        b: dict
-            * 追加するブラケット (x1, x2)が既知
-        base_y: float
-            * ブラケットの最小y座標
-        bracket_height: float
-            * ブラケットの高さ
-        bracket_hspace: float
-            * ブラケットの高さ間隔
-
-    Returns:
-        y_bottom: float
-            * ブラケットの下端のy座標
-    """
-
-    # bとすでに設定されたブラケットが重なっているかを判定
-    is_overlapped = False
-    for b_confirmed in brackets_confirmed:
-        # bとb_confirmedが重なっている場合
-        if (
-            b["x1"] <= b_confirmed["x2"]
-            and b["x2"] >= b_confirmed["x1"]
-            and b["y_bottom"] <= b_confirmed["y_bar"]
-            and b["y_bar"] >= b_confirmed["y_bottom"]
-        ):
-            is_overlapped = True
-            break
-
-    # 重なっていない場合はbase_yを返す
-    if not is_overlapped:
-        return base_y
-
-    # 重なっている場合は再帰的にy座標を探索
-    else:
-        # 重ならない高さを探索
-        new_base_y = base_y + bracket_hspace
-        for b_confirmed in brackets_confirmed:
-            if (
-                b["x1"] < b_confirmed["x2"]
-                and b["x2"] > b_confirmed["x1"]
-                and new_base_y < b_confirmed["y_bar"]
-                and new_base_y + bracket_height > b_confirmed["y_bottom"]
-            ):
-                return search_y_pos(
-                    brackets_confirmed,
-                    b,
-                    new_base_y,
-                    bracket_height,
-                    bracket_hspace,
-                )
-        return new_base_y
-
-
 def get_graph_area(ax):
     """グラフエリアの高さを取得する関数
 
@@ -698,7 +1536,22 @@ def check_bracket(bracket, xtick_labels, legend_labels):
         raise ValueError("the label of brackets is out of range")
 
 
-def line_mean_sd_plot(data: pd.DataFrame, order=None, marks=[], **kwargs):
+def line_mean_sd_plot(
+    data: pd.DataFrame,
+    order=None,
+    marks=[],
+    backend="seaborn",
+    decimate=None,
+    n_buckets=None,
+    x=None,
+    return_artists=False,
+    band="sd",
+    band_setting={},
+    stats_cache=None,
+    legend_entries=None,
+    ax=None,
+    **kwargs,
+):
     """
     seaborn.lineplotに処理を追加した関数
     列名毎に平均と標準偏差を線グラフにプロットする
@@ -708,17 +1561,57 @@ def line_mean_sd_plot(data: pd.DataFrame, order=None, marks=[], **kwargs):
             * index: x軸の値
             * 各列: データ
                 * 列名が同じ列をまとめて平均と標準偏差をプロットする
+            * SeriesStatsAccumulatorで逐次計算した結果も使用可能
+            * dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能
+                * numpy.ndarray, numpy.memmap等をDataFrameに変換せずに区間毎に読み出して計算する
         order: list
             * 凡例の順番を指定
             * 省略可能
         marks: list
             * 凡例のマーカーを指定(系列数より多い必要がある)
             * 省略した場合はマーカーなし
+        backend: str
+            * "seaborn": 系列毎にseaborn.lineplotでプロット
+            * "matplotlib": 計算済みの平均値と標準偏差をax.plot, ax.fill_betweenで直接プロット
+                * seaborn.lineplotと同じ見た目で, seabornの集計処理を経由しないため高速
+        decimate: str
+            * 平均値と標準偏差を計算した後, プロットする点を間引く方法 (decimate_indicesを参照)
+            * "lttb": 区間毎に1点を選ぶ, "minmax": 区間毎に最初, 最小, 最大, 最後の点を選ぶ
+            * 省略した場合は間引かない
+        n_buckets: int
+            * 間引く場合の区間の数 (省略した場合はaxの幅のピクセル数)
+        x: array-like
+            * dataがdictの場合のx軸の値 (全ての系列で共通, 省略した場合は0からの連番)
+        return_artists: bool
+            * Trueの場合は(ax, 系列毎のartistと統計量のdict)を返す
+                * dictのkey: 系列名, value: {"line": Line2D, "band": 網掛けのPolyCollection,
+                  "x": x軸の値, "center": 線の値, "lower": 網掛けの下端, "upper": 網掛けの上端}
+                  (x, center, lower, upperは間引く前の配列)
+        band: str
+            * 網掛けの範囲 (calc_series_bandを参照)
+            * "sd" (既定): 平均値 ± 標準偏差, "sem": 平均値 ± 標準誤差,
+              "percentile": 中央値と四分位範囲, "bootstrap": 平均値の95%信頼区間
+            * "percentile"の場合は中央値の線をプロットする
+        band_setting: dict
+            * calc_series_bandに渡す引数 (percentiles, ci, n_boot, seed, n_jobs)
+        stats_cache: StatsCache
+            * 指定した場合は平均値と標準偏差を保持し, 同じデータに対するseries_describeで再利用する
+            * 省略可能
+        legend_entries: LegendEntries
+            * 指定した場合は凡例を作成せずに凡例の項目を記録する (凡例は呼び出し元で1度だけ作成する)
+            * 省略可能
+        ax: matplotlib.pyplot.Axes
+            * 作図するax
+            * 省略した場合はpyplotの現在のax (指定した場合はpyplotの状態を参照しない)
         **kwargs:
-            seaborn.lineplotに渡す引数
+            * backend="seaborn"の場合: seaborn.lineplotに渡す引数
+            * backend="matplotlib"の場合: ax.plotに渡す引数
     """
+    if backend not in ("seaborn", "matplotlib"):
+        raise ValueError('backend must be "seaborn" or "matplotlib"')
+
     # 時系列グラフの元データを作成
-    unique_cols = data.columns.unique()
+    unique_cols = _series_labels(data)
 
     # markが指定されていない場合Noneを代入
     if len(marks) == 0:
@@ -741,44 +1634,240 @@ def line_mean_sd_plot(data: pd.DataFrame, order=None, marks=[], **kwargs):
     if order is not None:
         unique_cols = order
 
-    # 同じ名前の列毎に平均値と標準偏差のdfを作成
+    # 同じ名前の列毎の中心の値と網掛けの範囲を一括で計算
+    data_center, data_lower, data_upper = calc_series_band(
+        data, band, x=x, stats_cache=stats_cache, **band_setting
+    )
+    suffix = "_median" if band == "percentile" else "_mean"
+
+    if ax is None:
+        ax = plt.gca()
+
+    if decimate is not None and n_buckets is None:
+        n_buckets = _default_n_buckets(ax)
+
+    if backend == "matplotlib":
+        ax, artists = _line_mean_sd_plot_matplotlib(
+            data_center,
+            data_lower,
+            data_upper,
+            suffix,
+            unique_cols,
+            marks,
+            markeredgecolor,
+            decimate,
+            n_buckets,
+            legend_entries,
+            ax=ax,
+            **kwargs,
+        )
+        return (ax, artists) if return_artists else ax
+
+    # 凡例は呼び出し元で作成するため, seaborn.lineplotでは凡例を作成しない
+    if legend_entries is not None:
+        kwargs = {**kwargs, "legend": False}
+
+    artists = {}
     for i, col in enumerate(unique_cols):
-        # col列のみを抽出
-        data_tmp = data[col]
-        # col列の平均値と標準偏差を新しいdfとして作成
-        data_mean_sd = pd.DataFrame(index=data.index)
-
-        # data_tmpの平均値と標準偏差を計算
-        if data_tmp.ndim == 1:
-            data_mean_sd[col + "_mean"] = data_tmp[0]
-            data_mean_sd[col + "_std"] = 0
-        else:
-            data_mean_sd[col + "_mean"] = data_tmp.mean(axis=1)  # type: ignore
-            data_mean_sd[col + "_std"] = data_tmp.std(axis=1)  # type: ignore
+        center = data_center[col].rename(col + suffix)
+        lower = data_lower[col]
+        upper = data_upper[col]
+        x = data_center.index
+
+        # プロットする点を間引く
+        if decimate is not None:
+            rows = _decimation_rows(x, center.to_numpy(), decimate, n_buckets)
+            center = center.iloc[rows]
+            lower = lower.iloc[rows]
+            upper = upper.iloc[rows]
+            x = x[rows]
 
         # グラフを作成
+        n_lines = len(ax.lines)
         ax = sns.lineplot(
-            x=data_mean_sd.index,
-            y=col + "_mean",
-            data=data_mean_sd,
+            x=x,
+            y=center,
             label=col,
             marker=marks[i],
             markeredgecolor=markeredgecolor[i],
+            ax=ax,
             **kwargs,
         )
-        # 平均値に標準偏差を網掛け
-        ax.fill_between(
-            data_mean_sd.index,
-            data_mean_sd[col + "_mean"] - data_mean_sd[col + "_std"],
-            data_mean_sd[col + "_mean"] + data_mean_sd[col + "_std"],
+        # 網掛けを追加
+        collection = ax.fill_between(
+            x,
+            lower,
+            upper,
             alpha=0.2,
         )
+        line = ax.lines[n_lines]
+        if legend_entries is not None:
+            legend_entries.add(line, col)
+        artists[col] = {
+            "line": line,
+            "band": collection,
+            "x": data_center.index.to_numpy(),
+            "center": data_center[col].to_numpy(),
+            "lower": data_lower[col].to_numpy(),
+            "upper": data_upper[col].to_numpy(),
+        }
+
+    return (ax, artists) if return_artists else ax
+
+
+def _line_mean_sd_plot_matplotlib(
+    data_center,
+    data_lower,
+    data_upper,
+    suffix,
+    unique_cols,
+    marks,
+    markeredgecolor,
+    decimate=None,
+    n_buckets=None,
+    legend_entries=None,
+    ax=None,
+    **kwargs,
+):
+    """line_mean_sd_plotの線と網掛けをax.plot, ax.fill_betweenで直接プロットする関数
+    seaborn.lineplot (hueなし) と同じく, 線の色はaxの色の周期から取得し,
+    x軸の値で並べ替えて欠損値を除いた平均値を線でプロットする
+    """
+    # seaborn.lineplotと同じ線の既定値
+    line_kwargs = {"markeredgewidth": 0.75, "dashes": ""}
+    line_kwargs.update(normalize_kwargs(kwargs, Line2D))
 
-    return ax
+    x = data_center.index.to_numpy()
+    x_order = np.argsort(x, kind="stable")
+    x_sorted = x[x_order]
+
+    artists = {}
+    for i, col in enumerate(unique_cols):
+        center = data_center[col].to_numpy()
+        lower = data_lower[col].to_numpy()
+        upper = data_upper[col].to_numpy()
+
+        if decimate is None:
+            y_sorted = center[x_order]
+            is_valid = ~pd.isna(x_sorted) & ~np.isnan(y_sorted)
+            line_x, line_y = x_sorted[is_valid], y_sorted[is_valid]
+            band_x, band_lower, band_upper = x, lower, upper
+        else:
+            # プロットする点を間引く
+            rows = _decimation_rows(x, center, decimate, n_buckets)
+            line_x, line_y = x[rows], center[rows]
+            band_x, band_lower, band_upper = line_x, lower[rows], upper[rows]
+
+        # 平均値の線をプロット
+        (line,) = ax.plot(
+            line_x,
+            line_y,
+            label=col,
+            marker=marks[i],
+            markeredgecolor=markeredgecolor[i],
+            **line_kwargs,
+        )
+        # 網掛けを追加
+        collection = ax.fill_between(band_x, band_lower, band_upper, alpha=0.2)
+        if legend_entries is not None:
+            legend_entries.add(line, col)
+        artists[col] = {
+            "line": line,
+            "band": collection,
+            "x": x,
+            "center": center,
+            "lower": lower,
+            "upper": upper,
+        }
+
+    # seaborn.lineplotと同じく, 軸ラベルが未設定の場合のみ設定する
+    if len(unique_cols) > 0:
+        if not ax.get_xlabel() and data_center.index.name is not None:
+            ax.set_xlabel(str(data_center.index.name))
+        if not ax.get_ylabel():
+            ax.set_ylabel(unique_cols[0] + suffix)
+    if legend_entries is None:
+        ax.legend()
+
+    return ax, artists
+
+
+def update_line_mean_sd_artists(
+    line, band, x, center, lower, upper, decimate=None, n_buckets=None, is_sorted=False
+):
+    """
+    line_mean_sd_plotでプロットした1つの系列の線と網掛けを, artistを作り直さずに新しいデータで更新する関数
+
+    Args:
+        line: matplotlib.lines.Line2D
+            * 平均値 (または中央値) の線
+        band: matplotlib.collections.PolyCollection
+            * 網掛け (ax.fill_betweenの戻り値)
+        x: numpy.ndarray
+            * x軸の値
+        center: numpy.ndarray
+            * 線の値
+        lower: numpy.ndarray
+            * 網掛けの下端
+        upper: numpy.ndarray
+            * 網掛けの上端
+        decimate: str
+            * プロットする点を間引く方法 (line_mean_sd_plotと同じ)
+        n_buckets: int
+            * 間引く場合の区間の数
+        is_sorted: bool
+            * True: x軸の値は昇順で, x軸の値と線の値に欠損値を含まないとみなし, 並べ替えと欠損値の除去を行わない
+            * 間引かない場合は与えた配列を複製せずにartistに設定する
+    """
+    x = np.asarray(x)
+    center = np.asarray(center, dtype=np.float64)
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.asarray(upper, dtype=np.float64)
+    if decimate is not None and n_buckets is None:
+        n_buckets = _default_n_buckets(line.axes)
+    if not is_sorted:
+        rows = _decimation_rows(x, center, decimate, n_buckets)
+    elif decimate is not None:
+        rows = decimate_indices(_numeric_x(x), center, decimate, n_buckets)
+    else:
+        rows = None
+    if rows is not None:
+        x, center, lower, upper = x[rows], center[rows], lower[rows], upper[rows]
+
+    line.set_data(x, center)
+    if hasattr(band, "set_data"):
+        band.set_data(x, lower, upper)
+    else:
+        # matplotlib 3.10未満: 欠損値で区切られた区間毎に網掛けの多角形を作成
+        is_valid = ~np.isnan(lower) & ~np.isnan(upper)
+        run_ids = np.cumsum(~is_valid)[is_valid]
+        x_num = np.asarray(band.axes.convert_xunits(x[is_valid]), dtype=np.float64)
+        polygons = []
+        for r in np.unique(run_ids):
+            m = run_ids == r
+            polygons.append(
+                np.concatenate(
+                    (
+                        np.column_stack((x_num[m], lower[is_valid][m])),
+                        np.column_stack((x_num[m], upper[is_valid][m]))[::-1],
+                    )
+                )
+            )
+        band.set_verts(polygons)
 
 
 def line_group_coloring_plot(
-    data: pd.DataFrame, order=[], marks=[], color_palette=sns.color_palette(), **kwargs
+    data: pd.DataFrame,
+    order=[],
+    marks=[],
+    color_palette=sns.color_palette(),
+    is_batch=False,
+    decimate=None,
+    n_buckets=None,
+    x=None,
+    legend_entries=None,
+    ax=None,
+    **kwargs,
 ):
     """
     seaborn.lineplotに処理を追加した関数
@@ -789,6 +1878,7 @@ def line_group_coloring_plot(
             * index: x軸の値
             * 各列: データ
                 * 列名が同じ列をまとめて色分けしてプロットする
+            * dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能 (各行を1つの線としてプロットする)
         order: list
             * 凡例の順番を指定
             * 省略可能
@@ -798,14 +1888,34 @@ def line_group_coloring_plot(
         color_palette: list
             * 色のリスト
             * 省略した場合はseabornのデフォルトカラーパレット
+        is_batch: bool
+            * True: 同じ名前の列 (試行) をまとめて1つのLineCollectionとしてプロット
+                * マーカーは系列毎に1つのLine2Dとしてプロットし, 凡例は系列毎に1つ作成する
+                * 列数によらずartistの数が系列数に比例する
+            * False: 列毎にseaborn.lineplotを実行してプロット
+        decimate: str
+            * プロットする点を間引く方法 ("lttb", "minmax") (decimate_indicesを参照)
+            * 省略した場合は間引かない
+        n_buckets: int
+            * 間引く場合の区間の数 (省略した場合はaxの幅のピクセル数)
+        x: array-like
+            * dataがdictの場合のx軸の値 (全ての系列で共通, 省略した場合は0からの連番)
+        legend_entries: LegendEntries
+            * 指定した場合は凡例を作成せずに凡例の項目を記録する (凡例は呼び出し元で1度だけ作成する)
+            * 省略可能
+        ax: matplotlib.pyplot.Axes
+            * 作図するax
+            * 省略した場合はpyplotの現在のax (指定した場合はpyplotの状態を参照しない)
         **kwargs:
-            seaborn.lineplotに渡す引数
+            * is_batch=Falseの場合: seaborn.lineplotに渡す引数
+            * is_batch=Trueの場合: 線の設定 (linewidth, linestyle, alpha, zorder等) と
+              マーカーの設定 (markersize, markeredgewidth等)
 
     Returns:
         ax: matplotlib.pyplot.Axes
     """
     # 時系列グラフの元データを作成
-    unique_cols = data.columns.unique()
+    unique_cols = _series_labels(data)
 
     # markが指定されていない場合Noneを代入
     if len(marks) == 0:
@@ -827,27 +1937,267 @@ def line_group_coloring_plot(
     # グラフを作成
     # colnameをあらかじめorderに追加しておくことで, colnameの順番を固定する
     colname = order
+    for name in unique_cols:
+        if name not in colname:
+            colname.append(name)
+    # 列名と色, マーカーの番号の対応
+    name_index = {name: i for i, name in enumerate(colname)}
+
+    if ax is None:
+        ax = plt.gca()
+
+    if decimate is not None and n_buckets is None:
+        n_buckets = _default_n_buckets(ax)
+
+    if is_batch:
+        return _line_group_coloring_plot_batch(
+            data,
+            name_index,
+            marks,
+            color_palette,
+            markeredgecolor,
+            decimate,
+            n_buckets,
+            x,
+            legend_entries,
+            ax=ax,
+            **kwargs,
+        )
+
+    # 凡例は呼び出し元で作成するため, seaborn.lineplotでは凡例を作成しない
+    # 凡例の項目は名前毎に最初の線を使用する
+    if legend_entries is not None:
+        kwargs = {**kwargs, "legend": False}
+    legend_lines = {}
 
     # dataの列毎に時系列グラフを作成
-    for i, col in enumerate(data.columns):
-        # s.name毎に色を変えてlineplotを作成
-        series = data.iloc[:, i]
-        if series.name not in colname:
-            colname.append(series.name)
+    for name, trial_x, y in _iter_trials(data, x):
         # 名前毎に色を変えてlineplotを作成
+        k = name_index[name]
+        # プロットする点を間引く
+        if decimate is not None:
+            rows = _decimation_rows(trial_x, y, decimate, n_buckets)
+            trial_x = trial_x[rows]
+            y = y[rows]
+        is_first = legend_entries is not None and name not in legend_lines
+        if is_first:
+            n_lines = len(ax.lines)
         ax = sns.lineplot(
-            x=series.index,
-            y=series.values,
-            label=series.name,
-            color=color_palette[colname.index(series.name)],
-            marker=marks[colname.index(series.name)],
-            markeredgecolor=markeredgecolor[colname.index(series.name)],
+            x=trial_x,
+            y=y,
+            label=name,
+            color=color_palette[k],
+            marker=marks[k],
+            markeredgecolor=markeredgecolor[k],
+            ax=ax,
             **kwargs,
         )
+        if is_first:
+            legend_lines[name] = ax.lines[n_lines]
+        if legend_entries is not None:
+            legend_entries.add(legend_lines[name], name)
 
     # 凡例に同じ文字列が複数表示されるのを防ぐ
-    handles, labels = ax.get_legend_handles_labels()
-    by_label = dict(zip(labels, handles))
-    ax.legend(by_label.values(), by_label.keys())
+    if legend_entries is None:
+        handles, labels = ax.get_legend_handles_labels()
+        by_label = dict(zip(labels, handles))
+        ax.legend(by_label.values(), by_label.keys())
 
     return ax
+
+
+def _line_group_coloring_plot_batch(
+    data,
+    name_index,
+    marks,
+    color_palette,
+    markeredgecolor,
+    decimate=None,
+    n_buckets=None,
+    x=None,
+    legend_entries=None,
+    ax=None,
+    **kwargs,
+):
+    """line_group_coloring_plotの同じ名前の列 (試行) をまとめて1つのLineCollectionとしてプロットする関数
+    seaborn.lineplotと同じく, 各列はx軸の値で並べ替えて欠損値を除いてプロットする
+    試行は一定の数毎に読み出すため, numpy.memmapを間引いてプロットする場合も全体をメモリに読み込まない
+    """
+    # seaborn.lineplotと同じ線とマーカーの既定値
+    line_kwargs = {"markeredgewidth": 0.75, "linestyle": "-"}
+    line_kwargs.update(normalize_kwargs(kwargs, Line2D))
+    marker_keys = ("markersize", "markeredgewidth", "markerfacecolor", "markevery")
+    marker_kwargs = {k: line_kwargs.pop(k) for k in marker_keys if k in line_kwargs}
+    for k in ("alpha", "zorder"):
+        if k in line_kwargs:
+            marker_kwargs[k] = line_kwargs[k]
+    linewidth = line_kwargs.pop("linewidth", rcParams["lines.linewidth"])
+    linestyle = line_kwargs.pop("linestyle")
+
+    x_values, groups = _trial_groups(data, x)
+    x_order = np.argsort(x_values, kind="stable")
+    # LineCollectionは単位を変換しないため, 日時等のx軸の値はaxの単位で数値に変換する
+    ax.xaxis.update_units(x_values)
+    x_sorted = np.asarray(ax.convert_xunits(x_values[x_order]), dtype=np.float64)
+    is_sorted = bool(np.all(x_order == np.arange(len(x_order))))
+    block_rows = max(1, 2**22 // max(1, len(x_sorted)))
+
+    for name, source in groups:
+        k = name_index[name]
+        # 試行を一定の数毎に読み出して線の座標を作成
+        segments = []
+        for lo in range(0, len(source), block_rows):
+            trials = np.asarray(source[lo : lo + block_rows], dtype=np.float64)
+            if not is_sorted:
+                trials = trials[:, x_order]
+            block_segments = _trial_segments(x_sorted, trials, decimate, n_buckets)
+            if len(source) <= block_rows:
+                segments = block_segments
+            else:
+                segments.extend(block_segments)
+
+        # 同じ名前の列の線をまとめてプロット
+        lines = LineCollection(
+            segments,
+            colors=[color_palette[k]],
+            linewidths=linewidth,
+            linestyles=linestyle,
+            **line_kwargs,
+        )
+        ax.add_collection(lines)
+
+        # 同じ名前の列のマーカーをまとめてプロット
+        if marks[k] is not None:
+            marker_xy = np.concatenate([seg.reshape(-1, 2) for seg in segments])
+            ax.plot(
+                marker_xy[:, 0],
+                marker_xy[:, 1],
+                linestyle="none",
+                color=color_palette[k],
+                marker=marks[k],
+                markeredgecolor=markeredgecolor[k],
+                **marker_kwargs,
+            )
+
+        # 凡例用の線 (データを持たない線としてaxに追加)
+        handle = ax.add_line(
+            Line2D(
+                [],
+                [],
+                color=color_palette[k],
+                linewidth=linewidth,
+                linestyle=linestyle,
+                marker=marks[k],
+                markeredgecolor=markeredgecolor[k],
+                label=name,
+                **marker_kwargs,
+            )
+        )
+        if legend_entries is not None:
+            legend_entries.add(handle, name)
+
+    ax.autoscale_view()
+    if legend_entries is None:
+        ax.legend()
+
+    return ax
+
+
+def _series_labels(data):
+    """線グラフのデータの系列名 (重複なし, 出現順) を取得する関数"""
+    if isinstance(data, Mapping):
+        return pd.Index(list(data.keys()))
+    return data.columns.unique()
+
+
+def _iter_trials(data, x=None):
+    """線グラフのデータの試行毎に(系列名, x軸の値, y軸の値)を返すジェネレータ"""
+    if isinstance(data, Mapping):
+        x_values, groups = _trial_groups(data, x)
+        index = pd.Index(x_values)
+        for name, arr in groups:
+            for y in arr:
+                yield name, index, np.asarray(y, dtype=np.float64)
+        return
+    for i in range(data.shape[1]):
+        series = data.iloc[:, i]
+        yield series.name, series.index, series.to_numpy()
+
+
+def _trial_groups(data, x=None):
+    """線グラフのデータからx軸の値と, 系列毎の(系列名, 2次元配列 (試行数, 点数))のリストを取得する関数
+    dictの場合は配列をコピーせずにそのまま返す
+    """
+    if isinstance(data, Mapping):
+        groups = [(name, np.atleast_2d(arr)) for name, arr in data.items()]
+        n_points = groups[0][1].shape[1] if groups else 0
+        x_values = np.arange(n_points) if x is None else np.asarray(x)
+        return x_values, groups
+    values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, names = pd.factorize(data.columns)
+    groups = [(name, values[:, codes == code].T) for code, name in enumerate(names)]
+    return data.index.to_numpy(), groups
+
+
+def _trial_segments(x_sorted, trials, decimate=None, n_buckets=None):
+    """試行 (試行数, 点数) 毎の線の座標を作成する関数 (欠損値は除き, 必要に応じて間引く)"""
+    is_valid = ~np.isnan(trials) & ~np.isnan(x_sorted)
+    if not is_valid.all():
+        segments = []
+        for y, v in zip(trials, is_valid):
+            trial_x, y = x_sorted[v], y[v]
+            if decimate is not None:
+                idx = decimate_indices(trial_x, y, decimate, n_buckets)
+                trial_x, y = trial_x[idx], y[idx]
+            segments.append(np.column_stack((trial_x, y)))
+        return segments
+
+    trial_x = np.broadcast_to(x_sorted, trials.shape)
+    # プロットする点を全ての試行についてまとめて間引く
+    if decimate is not None:
+        idx = decimate_indices(x_sorted, trials, decimate, n_buckets)
+        trial_x = x_sorted[idx]
+        trials = np.take_along_axis(trials, idx, axis=1)
+    # (試行数, 点数, 2)の配列としてまとめて作成
+    return np.stack((trial_x, trials), axis=-1)
+
+
+def _default_n_buckets(ax):
+    """間引く場合の区間の数 (axの幅のピクセル数) を取得する関数"""
+    return max(1, int(np.ceil(ax.get_window_extent().width)))
+
+
+def _numeric_x(x):
+    """x軸の値 (数値または日時) を間引きの計算に使用する浮動小数点数の配列に変換する関数"""
+    x = np.asarray(x)
+    if x.dtype.kind in "mM":
+        x_num = x.astype("int64").astype(np.float64)
+        x_num[pd.isna(x)] = np.nan
+        return x_num
+    return x.astype(np.float64)
+
+
+def _decimation_rows(x, y, decimate, n_buckets):
+    """x軸の値で並べ替えて欠損値を除き, 間引いた後に残す行の番号を取得する関数
+
+    Args:
+        x: array-like
+            x軸の値 (数値または日時)
+        y: numpy.ndarray
+            y軸の値
+        decimate: str
+            * 間引く方法 (decimate_indicesを参照)
+            * Noneの場合は並べ替えて欠損値を除くのみ
+        n_buckets: int
+            区間の数
+
+    Returns:
+        rows: numpy.ndarray
+            残す行の番号 (x軸の値の昇順)
+    """
+    x_num = _numeric_x(x)
+    x_order = np.argsort(x_num, kind="stable")
+    rows = x_order[~np.isnan(x_num[x_order]) & ~np.isnan(y[x_order])]
+    if decimate is None:
+        return rows
+    return rows[decimate_indices(x_num[rows], y[rows], decimate, n_buckets)]
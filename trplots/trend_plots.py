@@ -1,21 +1,137 @@
+import numpy as np
 import seaborn as sns
+from matplotlib.artist import Artist
 from .plot_utils import (
     box_mean_plot,
+    box_stats_plot,
     add_brackets_for_boxplot,
+    add_auto_brackets_for_boxplot,
+    apply_bracket_plan,
     line_mean_sd_plot,
     line_group_coloring_plot,
+    update_line_mean_sd_artists,
+    _decimation_rows,
 )
-from .plot_config import configure_ax
+from .plot_config import configure_ax, set_legend
+from .plot_layout import LegendEntries
+from .plot_stats import calc_series_band, SeriesBuffer
+from .plot_describe import single_describe, series_describe
+
+
+def _build_legend(ax, legend_entries, legend_setting=None):
+    """記録した凡例の項目からaxの凡例を作成する関数 (既存の凡例は置き換える)
+
+    Args:
+        ax: matplotlib.pyplot.Axes
+        legend_entries: LegendEntries
+        legend_setting: tuple
+            * configure_axで指定した (legend_correspondence_dict, legend_kwargs)
+            * 省略した場合は記録したタイトルを使用する
+
+    Returns:
+        legend: matplotlib.legend.Legend
+    """
+    if legend_setting is None:
+        legend_correspondence_dict, legend_kwargs = {}, {}
+        if legend_entries.title is not None:
+            legend_kwargs["title"] = legend_entries.title
+    else:
+        legend_correspondence_dict, legend_kwargs = legend_setting
+    set_legend(ax, legend_correspondence_dict, legend_entries, **legend_kwargs)
+    return ax.get_legend()
+
+
+class _DeferredLegend(Artist):
+    """最初の描画時に記録した凡例の項目から凡例を1度だけ作成するartist
+    作成時にaxから自身を取り除き, 作成した凡例をその描画で描画する
+    (axes_locator等のaxの設定は変更せず, TrendPlotsのインスタンスも参照しない)
+    """
+
+    zorder = 5
+
+    def __init__(self, legend_entries, legend_setting=None):
+        super().__init__()
+        self._legend_entries = legend_entries
+        self._legend_setting = legend_setting
+        # axの範囲で切り取られるartistとしてtight_layout等で無視されないようにする
+        self.set_clip_on(False)
+
+    @property
+    def is_pending(self):
+        """凡例をまだ作成していないかどうか"""
+        return self.axes is not None
+
+    def build(self):
+        """凡例を作成する関数 (作成済みの場合は何もしない)
+
+        Returns:
+            legend: matplotlib.legend.Legend (作成済みの場合はNone)
+        """
+        ax = self.axes
+        if ax is None:
+            return None
+        self.remove()
+        return _build_legend(ax, self._legend_entries, self._legend_setting)
+
+    def draw(self, renderer):
+        legend = self.build()
+        if legend is not None:
+            legend.draw(renderer)
+
+    def get_window_extent(self, renderer=None):
+        # tight_layout等で描画前に範囲を求める場合も凡例を作成して含める
+        legend = self.build()
+        if legend is None:
+            return super().get_window_extent(renderer)
+        return legend.get_window_extent(renderer)
+
+    def get_tightbbox(self, renderer=None):
+        legend = self.build()
+        if legend is None:
+            return None
+        return legend.get_tightbbox(renderer)
+
+
+def _plotted_points(x, center, lower, upper):
+    """系列の点をx軸の値で並べ替え, x軸の値または線の値が欠損値の点を除く関数 (プロットする点と同じ)"""
+    x = np.asarray(x)
+    center = np.asarray(center, dtype=np.float64)
+    rows = _decimation_rows(x, center, None, None)
+    return (
+        x[rows],
+        center[rows],
+        np.asarray(lower, dtype=np.float64)[rows],
+        np.asarray(upper, dtype=np.float64)[rows],
+    )
 
 
 class TrendPlots:
-    def __init__(self, ax):
+    def __init__(self, ax, stats_cache=None):
         """
         Args:
             ax: matplotlib.pyplot.Axes
+            stats_cache: StatsCache
+                * 作図時に計算した統計量を保持するキャッシュ
+                * 省略した場合は統計量を保持せず, single_describe, series_describeで毎回計算する
+                * 複数のインスタンスで共有することも可能
+                * データは形状, 列名と各列の一部の値で識別するため, 作図後にデータを
+                  その場で書き換えた場合は検出できないことがある (stats_cache.clear()を呼び出すこと)
         """
         self._ax = ax
+        self._stats_cache = stats_cache
         self._graphs_in_ax = []
+        self._box_layout = None
+        self._test_results = None
+        # line_mean_sd_plotの系列毎の (線, 網掛け, バッファ, 網掛けと間引きの設定)
+        self._live_series = {}
+        # blit用の背景 (背景, 背景を保存した時のaxの範囲)
+        self._blit_background = None
+        # 作図時に記録した凡例の項目 (凡例はconfigure_axまたは最初の描画時に1度だけ作成する)
+        self._legend_entries = LegendEntries()
+        # configure_axで指定した凡例の設定 (legend_correspondence_dict, legend_kwargs)
+        self._legend_setting = None
+        # 描画時に凡例を作成するartist (予約していない場合はNone)
+        self._deferred_legend = None
 
     def add_box_mean_plot(
         self,
@@ -68,7 +184,7 @@ class TrendPlots:
             raise ValueError(
                 "line_mean_sd_plot and line_group_coloring_plot cannot be used together"
             )
-        self._ax = box_mean_plot(
+        self._ax, self._box_layout = box_mean_plot(
             ax=self._ax,
             data=data,
             x=x,
@@ -77,13 +193,96 @@ class TrendPlots:
             is_add_jitter=is_add_jitter,
             jitter_setting=jitter_setting,
             mean_setting=mean_setting,
+            return_layout=True,
+            stats_cache=self._stats_cache,
+            legend_entries=self._legend_entries,
             **kwargs,
         )
+        self._defer_legend()
         self._graphs_in_ax.append("box_mean_plot")
         return self._ax
 
+    def add_box_stats_plot(
+        self,
+        data,
+        x,
+        y=None,
+        hue=None,
+        order=None,
+        hue_order=None,
+        fliers=None,
+        mean_setting={},
+        **kwargs,
+    ):
+        """集計済みの統計量から箱ひげ図を作成する関数
+        add_box_mean_plotと同じ位置に箱と平均値を配置するため, add_bracketsを併用可能
+
+        Args:
+            data: pandas.DataFrame
+                * 1行が1つの箱に対応する統計量のデータフレーム
+                * x, hueで指定された列とq1, median, q3, whislo, whishi列を持つ
+                    * mean列がある場合は平均値をプロットする
+                * calc_box_statsの戻り値もそのまま使用可能
+            x: str
+                x軸の列名 (dataの列名)
+                大分類
+            y: str
+                y軸のラベル (省略可能)
+            hue: str
+                hueの列名 (dataの列名) (省略可能)
+                大分類の中での分類
+            order: list
+                * x軸のラベルの順番
+                * 省略可能
+            hue_order: list
+                * hueのラベルの順番
+                * 省略可能
+            fliers: dict
+                * 外れ値の配列 (key: xのラベル または (xのラベル, hueのラベル))
+                * 省略可能
+            mean_setting: dict
+                * 平均値をプロットする際の設定
+                * **kwargsとして渡される
+            **kwargs:
+                box_stats_plotに渡す引数
+
+        Returns:
+            ax: matplotlib.pyplot.Axes (作成したグラフが入ったax)
+        """
+        # line_mean_sd_plot, line_group_coloring_plotとの併用を禁止
+        if (
+            "line_mean_sd_plot" in self._graphs_in_ax
+            or "line_group_coloring_plot" in self._graphs_in_ax
+        ):
+            raise ValueError(
+                "line_mean_sd_plot and line_group_coloring_plot cannot be used together"
+            )
+        self._ax, self._box_layout = box_stats_plot(
+            data=data,
+            x=x,
+            y=y,
+            hue=hue,
+            order=order,
+            hue_order=hue_order,
+            fliers=fliers,
+            mean_setting=mean_setting,
+            ax=self._ax,
+            return_layout=True,
+            legend_entries=self._legend_entries,
+            **kwargs,
+        )
+        self._defer_legend()
+        self._graphs_in_ax.append("box_stats_plot")
+        return self._ax
+
     def add_brackets(
-        self, brackets, bracket_base_y=None, h_ratio=0.02, hspace_ratio=0.1, fs=10
+        self,
+        brackets,
+        bracket_base_y=None,
+        h_ratio=0.02,
+        hspace_ratio=0.1,
+        fs=10,
+        is_batch=True,
     ):
         """
         箱ひげ図が追加された状態のaxに[([str, str], [str, str], str), ([str, str], [str, str], str), ...]で指定される有意差を表示する
@@ -109,17 +308,147 @@ class TrendPlots:
                 有意差を表示するブラケットの高さ間隔の(グラフエリア高さに対する)比率
             fs: int
                 有意差マークのフォントサイズ
+            is_batch: bool
+                * True: 全てのブラケットと有意差マークをそれぞれ1つのartistとしてまとめてプロット
+                * False: ブラケット毎にax.plot, ax.textを実行してプロット
         """
         # box_mean_plotが存在しない場合はエラーを出力
         if not self._graphs_in_ax:
             raise ValueError("box_mean_plot must be executed before add_brackets")
         self._ax = add_brackets_for_boxplot(
-            self._ax, brackets, bracket_base_y, h_ratio, hspace_ratio, fs
+            self._ax,
+            brackets,
+            bracket_base_y,
+            h_ratio,
+            hspace_ratio,
+            fs,
+            layout=self._box_layout,
+            is_batch=is_batch,
+        )
+        self._graphs_in_ax.append("add_brackets")
+        return self._ax
+
+    def add_bracket_plan(self, plan, bracket_base_y=None, fs=10, is_batch=True):
+        """
+        compile_bracketsで作成したBracketPlanを適用してブラケットを表示する
+        同じ配置の箱ひげ図に同じブラケットを繰り返し表示する場合に使用する
+
+        Args:
+            plan: BracketPlan
+                * ブラケットの配置 (compile_brackets(brackets, box_layout, ...)で作成)
+                * 箱の配置 (ラベルの並び) がこのaxと一致しない場合はエラーを出力
+            bracket_base_y: float
+                有意差を表示するy軸の基準位置
+            fs: int
+                有意差マークのフォントサイズ
+            is_batch: bool
+                add_bracketsと同じ
+        """
+        # box_mean_plotが存在しない場合はエラーを出力
+        if not self._graphs_in_ax:
+            raise ValueError("box_mean_plot must be executed before add_bracket_plan")
+        self._ax = apply_bracket_plan(
+            self._ax,
+            plan,
+            bracket_base_y,
+            fs,
+            layout=self._box_layout,
+            is_batch=is_batch,
+        )
+        self._graphs_in_ax.append("add_brackets")
+        return self._ax
+
+    def add_auto_brackets(
+        self,
+        data,
+        x,
+        y,
+        hue=None,
+        pairs=None,
+        test="welch",
+        correction="holm",
+        thresholds=((0.001, "***"), (0.01, "**"), (0.05, "*")),
+        ns_mark=None,
+        n_permutations=10000,
+        seed=0,
+        bracket_base_y=None,
+        h_ratio=0.02,
+        hspace_ratio=0.1,
+        fs=10,
+        is_batch=True,
+    ):
+        """
+        箱ひげ図が追加された状態のaxに, 箱同士の検定結果から作成した有意差を表示する
+        検定結果はtest_resultsで取得できる
+
+        Args:
+            data: pandas.DataFrame
+                * 箱ひげ図の作成に使用したデータフレーム (集計前の生データ)
+            x: str
+                x軸の列名 (dataの列名)
+            y: str
+                y軸の列名 (dataの列名)
+            hue: str
+                hueの列名 (dataの列名) (省略可能)
+            pairs: list of tuple([str, str], [str, str])
+                * 検定する箱の組み合わせのリスト
+                * 省略した場合は全ての箱の組み合わせ
+            test: str
+                * 検定の種類 ("welch", "mannwhitney", "permutation")
+            correction: str
+                * 多重比較の補正方法 ("bonferroni", "holm", "fdr_bh", None)
+            thresholds: list of tuple(float, str)
+                * 有意差マークの(閾値, マーク)のリスト
+            ns_mark: str
+                * 有意差がない場合のマーク
+                * 省略した場合は有意差がない組み合わせのブラケットは表示しない
+            n_permutations: int
+                * test="permutation"の場合の並べ替えの回数
+            seed: int
+                * test="permutation"の場合の乱数のシード
+            bracket_base_y, h_ratio, hspace_ratio, fs, is_batch:
+                add_bracketsと同じ
+        """
+        # 箱ひげ図が存在しない場合はエラーを出力
+        if not self._graphs_in_ax:
+            raise ValueError("box_mean_plot must be executed before add_auto_brackets")
+        self._ax, self._test_results = add_auto_brackets_for_boxplot(
+            self._ax,
+            data,
+            x,
+            y,
+            hue=hue,
+            pairs=pairs,
+            test=test,
+            correction=correction,
+            thresholds=thresholds,
+            ns_mark=ns_mark,
+            n_permutations=n_permutations,
+            seed=seed,
+            layout=self._box_layout,
+            return_results=True,
+            bracket_base_y=bracket_base_y,
+            h_ratio=h_ratio,
+            hspace_ratio=hspace_ratio,
+            fs=fs,
+            is_batch=is_batch,
         )
         self._graphs_in_ax.append("add_brackets")
         return self._ax
 
-    def add_line_mean_sd_plot(self, data, order=None, marks=[], **kwargs):
+    def add_line_mean_sd_plot(
+        self,
+        data,
+        order=None,
+        marks=[],
+        backend="seaborn",
+        decimate=None,
+        n_buckets=None,
+        x=None,
+        band="sd",
+        band_setting={},
+        **kwargs,
+    ):
         """
         seaborn.lineplotに処理を追加した関数
         列名毎に平均と標準偏差を線グラフにプロットする
@@ -129,29 +458,222 @@ class TrendPlots:
                 * index: x軸の値
                 * 各列: データ
                     * 列名が同じ列をまとめて平均と標準偏差をプロットする
+                * SeriesStatsAccumulator, dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能
             order: list
                 * 凡例の順番を指定
                 * 省略可能
             marks: list
                 * 凡例のマーカーを指定(系列数より多い必要がある)
                 * 省略した場合はマーカーなし
+            backend: str
+                * "seaborn": seaborn.lineplotでプロット
+                * "matplotlib": ax.plot, ax.fill_betweenで直接プロット (同じ見た目で高速)
+            decimate: str
+                * プロットする点を間引く方法 ("lttb", "minmax") (省略した場合は間引かない)
+                * 平均値と標準偏差は間引く前の全てのデータで計算する
+            n_buckets: int
+                * 間引く場合の区間の数 (省略した場合はaxの幅のピクセル数)
+            x: array-like
+                * dataがdict (系列名 -> 2次元配列 (試行数, 点数)) の場合のx軸の値
+            band: str
+                * 網掛けの範囲 ("sd", "sem", "percentile", "bootstrap")
+            band_setting: dict
+                * calc_series_bandに渡す引数 (percentiles, ci, n_boot, seed, n_jobs)
             **kwargs:
-                seaborn.lineplotに渡す引数
+                seaborn.lineplot (backend="matplotlib"の場合はax.plot) に渡す引数
         """
-        # box_mean_plot, line_group_coloring_plotとの併用を禁止
+        # box_mean_plot, box_stats_plot, line_group_coloring_plotとの併用を禁止
         if (
             "box_mean_plot" in self._graphs_in_ax
+            or "box_stats_plot" in self._graphs_in_ax
             or "line_group_coloring_plot" in self._graphs_in_ax
         ):
             raise ValueError(
                 "box_mean_plot and line_group_coloring_plot cannot be used together"
             )
-        self._ax = line_mean_sd_plot(data, order, marks, ax=self._ax, **kwargs)
+        self._ax, artists = line_mean_sd_plot(
+            data,
+            order,
+            marks,
+            backend=backend,
+            decimate=decimate,
+            n_buckets=n_buckets,
+            x=x,
+            return_artists=True,
+            stats_cache=self._stats_cache,
+            band=band,
+            band_setting=band_setting,
+            legend_entries=self._legend_entries,
+            ax=self._ax,
+            **kwargs,
+        )
+        self._defer_legend()
+        for col, artist in artists.items():
+            self._live_series[col] = {
+                "line": artist["line"],
+                "band": artist["band"],
+                "buffer": SeriesBuffer(
+                    *_plotted_points(
+                        artist["x"], artist["center"], artist["lower"], artist["upper"]
+                    )
+                ),
+                "band_estimator": band,
+                "band_setting": band_setting,
+                "decimate": decimate,
+                "n_buckets": n_buckets,
+            }
         self._graphs_in_ax.append("line_mean_sd_plot")
         return self._ax
 
+    def update_line_mean_sd_plot(
+        self, data, x=None, append=False, blit=False, autoscale=True
+    ):
+        """add_line_mean_sd_plotでプロットした系列のデータを追加または置き換える関数
+        線と網掛けのartistを作り直さずにset_dataで更新するため, 逐次データを追加するモニタリングに使用できる
+        網掛けの範囲はプロット時と同じband, band_settingで計算する
+        blit=Trueの場合は保存した背景の上に系列の線と網掛けのみを再描画する
+
+        1回の更新のコスト:
+            * 統計量の計算, 並べ替え, 欠損値の除去とバッファへの追記は追加した点数に比例する
+            * append=Trueかつ間引かない場合は, バッファを複製せずにartistに設定し, axの範囲は追加した点のみで広げる
+            * 線の描画と網掛けの多角形の作成 (matplotlibのset_data) は全ての点数に比例する
+            * 間引く場合 (decimateを指定した場合) は全ての点を間引き直すため, 全ての点数に比例する
+            * append=Falseの場合と間引く場合のautoscale (relimによるaxの範囲の調整) は全ての点数に比例する
+
+        Args:
+            data: pandas.DataFrame
+                * add_line_mean_sd_plotと同じ形式 (index: x軸の値, 各列: データ)
+                * プロット済みの系列の一部のみを含んでもよい
+                * SeriesStatsAccumulator, dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能
+            x: array-like
+                * dataがdictの場合のx軸の値
+            append: bool
+                * True: dataの点を既存の点の後に追加 (x軸の値は既存の点より後であること)
+                * False: 系列の点をdataの点で置き換える
+            blit: bool
+                * True: blitで系列の線と網掛けのみを再描画する (axの範囲が変わった場合は全体を再描画)
+                * False: canvas.draw_idleで再描画を予約する
+            autoscale: bool
+                * True: 更新後のデータに合わせてaxの範囲を調整する
+
+        Returns:
+            ax: matplotlib.pyplot.Axes (作成したグラフが入ったax)
+        """
+        if not self._live_series:
+            raise ValueError("line_mean_sd_plot must be added before updating")
+        # 系列毎にプロット時と同じ方法で網掛けの範囲を計算 (同じ方法の系列はまとめて計算)
+        bands = {}
+        labels = None
+        for series in self._live_series.values():
+            key = (series["band_estimator"], repr(series["band_setting"]))
+            if key not in bands:
+                bands[key] = calc_series_band(
+                    data, series["band_estimator"], x=x, **series["band_setting"]
+                )
+                labels = bands[key][0].columns
+        for col in labels:
+            if col not in self._live_series:
+                raise ValueError(f"{col} is not in the series of line_mean_sd_plot")
+
+        appended = []
+        for col in labels:
+            series = self._live_series[col]
+            key = (series["band_estimator"], repr(series["band_setting"]))
+            new_x, center, lower, upper = _plotted_points(
+                bands[key][0].index.to_numpy(),
+                *(df[col].to_numpy() for df in bands[key]),
+            )
+            buffer = series["buffer"]
+            if append:
+                buffer.append(new_x, center, lower, upper)
+            else:
+                buffer.replace(new_x, center, lower, upper)
+            # バッファは並べ替えと欠損値の除去を済ませた点のみを保持する
+            update_line_mean_sd_artists(
+                series["line"],
+                series["band"],
+                buffer.x,
+                buffer.center,
+                buffer.lower,
+                buffer.upper,
+                series["decimate"],
+                series["n_buckets"],
+                is_sorted=True,
+            )
+            if append and series["decimate"] is None:
+                appended.append((new_x, center, lower, upper))
+
+        if autoscale:
+            if len(appended) == len(labels):
+                # 追加した点のみでaxの範囲を広げる
+                for new_x, center, lower, upper in appended:
+                    x_num = np.asarray(self._ax.convert_xunits(new_x), dtype=np.float64)
+                    for y in (center, lower, upper):
+                        xy = np.column_stack((x_num, y))
+                        self._ax.update_datalim(xy[np.isfinite(xy).all(axis=1)])
+            else:
+                # relimは網掛け (Collection) を含まないため別途範囲に加える
+                self._ax.relim()
+                for series in self._live_series.values():
+                    self._ax.update_datalim(
+                        series["band"].get_datalim(self._ax.transData)
+                    )
+            self._ax.autoscale_view()
+
+        canvas = self._ax.figure.canvas
+        if not blit:
+            canvas.draw_idle()
+            return self._ax
+
+        artists = [
+            artist
+            for series in self._live_series.values()
+            for artist in (series["band"], series["line"])
+        ]
+        view = (
+            self._ax.get_xlim(),
+            self._ax.get_ylim(),
+            tuple(self._ax.bbox.bounds),
+        )
+        if self._blit_background is None or self._blit_background[1] != view:
+            # 系列以外を描画した背景を保存
+            for artist in artists:
+                artist.set_animated(True)
+            canvas.draw()
+            self._blit_background = (canvas.copy_from_bbox(self._ax.bbox), view)
+        else:
+            canvas.restore_region(self._blit_background[0])
+        for artist in artists:
+            self._ax.draw_artist(artist)
+        canvas.blit(self._ax.bbox)
+        canvas.flush_events()
+        return self._ax
+
+    def finish_live_update(self):
+        """update_line_mean_sd_plot(blit=True)で設定したblit用の状態を解除する関数
+        保存 (savefig) する前に呼び出すと, 系列の線と網掛けが通常通り描画される
+
+        Returns:
+            ax: matplotlib.pyplot.Axes (作成したグラフが入ったax)
+        """
+        for series in self._live_series.values():
+            series["line"].set_animated(False)
+            series["band"].set_animated(False)
+        self._blit_background = None
+        self._ax.figure.canvas.draw_idle()
+        return self._ax
+
     def add_line_group_coloring_plot(
-        self, data, order=[], marks=[], color_palette=sns.color_palette(), **kwargs
+        self,
+        data,
+        order=[],
+        marks=[],
+        color_palette=sns.color_palette(),
+        is_batch=False,
+        decimate=None,
+        n_buckets=None,
+        x=None,
+        **kwargs,
     ):
         """
         seaborn.lineplotに処理を追加した関数
@@ -162,6 +684,7 @@ class TrendPlots:
                 * index: x軸の値
                 * 各列: データ
                     * 列名が同じ列をまとめて色分けしてプロットする
+                * dict (系列名 -> 2次元配列 (試行数, 点数)) も使用可能
             order: list
                 * 凡例の順番を指定
                 * 省略可能
@@ -171,20 +694,41 @@ class TrendPlots:
             color_palette: list
                 * 色のリスト
                 * 省略した場合はseabornのデフォルトカラーパレット
+            is_batch: bool
+                * True: 同じ名前の列をまとめて1つのLineCollectionとしてプロット (列数が多い場合に高速)
+                * False: 列毎にseaborn.lineplotを実行してプロット
+            decimate: str
+                * プロットする点を間引く方法 ("lttb", "minmax") (省略した場合は間引かない)
+            n_buckets: int
+                * 間引く場合の区間の数 (省略した場合はaxの幅のピクセル数)
+            x: array-like
+                * dataがdict (系列名 -> 2次元配列 (試行数, 点数)) の場合のx軸の値
             **kwargs:
-                seaborn.lineplotに渡す引数
+                seaborn.lineplotに渡す引数 (is_batch=Trueの場合は線とマーカーの設定)
         """
-        # box_mean_plot, line_mean_sd_plotとの併用を禁止
+        # box_mean_plot, box_stats_plot, line_mean_sd_plotとの併用を禁止
         if (
             "box_mean_plot" in self._graphs_in_ax
+            or "box_stats_plot" in self._graphs_in_ax
             or "line_mean_sd_plot" in self._graphs_in_ax
         ):
             raise ValueError(
                 "box_mean_plot and line_mean_sd_plot cannot be used together"
             )
         self._ax = line_group_coloring_plot(
-            data, order, marks, color_palette, ax=self._ax, **kwargs
+            data,
+            order,
+            marks,
+            color_palette,
+            is_batch=is_batch,
+            decimate=decimate,
+            n_buckets=n_buckets,
+            x=x,
+            legend_entries=self._legend_entries,
+            ax=self._ax,
+            **kwargs,
         )
+        self._defer_legend()
         self._graphs_in_ax.append("line_group_coloring_plot")
 
     def configure_ax(
@@ -245,7 +789,12 @@ class TrendPlots:
                 凡例の設定
             **kwargs:
                 ax.set()に渡す引数
+
+        凡例は作図時に記録した項目からここで1度だけ作成する
+        この後にグラフを追加した場合は, 同じ凡例の設定で描画時に作り直す
         """
+        self._cancel_deferred_legend()
+        self._legend_setting = (legend_correspondence_dict, legend_kwargs)
         self._ax = configure_ax(
             self._ax,
             xlabel,
@@ -264,13 +813,100 @@ class TrendPlots:
             ylabel_loc_y,
             legend_correspondence_dict,
             legend_kwargs,
+            self._recorded_legend_entries(),
             **kwargs,
         )
 
+    def _recorded_legend_entries(self):
+        # TrendPlotsで項目を記録していない場合はaxの全てのartistから凡例を作成する
+        return self._legend_entries if len(self._legend_entries) > 0 else None
+
+    def update_legend(self):
+        """記録した凡例の項目から凡例を直ちに作成する関数 (既存の凡例は置き換える)
+        凡例はconfigure_axまたは最初の描画時に作成されるため, 通常は呼び出す必要はない
+        描画前に凡例 (ax.get_legend()) を参照する場合に呼び出す
+        """
+        self._cancel_deferred_legend()
+        if len(self._legend_entries) == 0:
+            return
+        _build_legend(self._ax, self._legend_entries, self._legend_setting)
+
+    def _defer_legend(self):
+        """記録した凡例の項目から次の描画時に凡例を作成するように予約する関数
+        予約済みの場合は何もしないため, グラフを追加する毎にax.legendを呼び出さない
+        """
+        if len(self._legend_entries) == 0:
+            return
+        if self._deferred_legend is not None and self._deferred_legend.is_pending:
+            return
+        self._deferred_legend = _DeferredLegend(
+            self._legend_entries, self._legend_setting
+        )
+        self._ax.add_artist(self._deferred_legend)
+
+    def _cancel_deferred_legend(self):
+        if self._deferred_legend is not None and self._deferred_legend.is_pending:
+            self._deferred_legend.remove()
+        self._deferred_legend = None
+
+    def single_describe(self, data, x, y, hue=None):
+        """add_box_mean_plotで使用したのと同じデータを与えるとその概要を返す関数
+        作図時に計算した統計量を保持している場合は再計算せずに使用する
+
+        Args:
+            data: pandas.DataFrame
+                * add_box_mean_plotと同じデータフレーム
+            x: str
+                x軸の列名 (dataの列名)
+            y: str
+                y軸の列名 (dataの列名)
+            hue: str
+                hueの列名 (dataの列名) (省略可能)
+
+        Returns:
+            describe: pandas.DataFrame
+        """
+        return single_describe(data, x, y, hue, stats_cache=self._stats_cache)
+
+    def series_describe(self, data, x=None, compact=False):
+        """add_line_mean_sd_plotで使用したのと同じデータを与えるとその概要を返す関数
+        作図時に計算した平均値と標準偏差を保持している場合は再計算せずに使用する
+
+        Args:
+            data: pandas.DataFrame
+                * add_line_mean_sd_plotと同じデータ
+            x: array-like
+                * dataがdictの場合のx軸の値
+            compact: bool
+                * Trueの場合はnumpyの構造化配列を返す (series_describeを参照)
+
+        Returns:
+            describe: pandas.DataFrame or numpy.ndarray
+        """
+        return series_describe(
+            data, x=x, compact=compact, stats_cache=self._stats_cache
+        )
+
+    @property
+    def stats_cache(self):
+        return self._stats_cache
+
     @property
     def graphs_in_ax(self):
         return self._graphs_in_ax
 
+    @property
+    def box_layout(self):
+        return self._box_layout
+
+    @property
+    def test_results(self):
+        return self._test_results
+
+    @property
+    def legend_entries(self):
+        return self._legend_entries
+
     @property
     def ax(self):
         return self._ax
@@ -1,39 +1,88 @@
 from .plot_defaults import FLIERPROPS_DEFAULTS, SWARMPLOT_DEFAULTS, PLOT_DEFAULTS
 from .trend_plots import TrendPlots
+from .plot_layout import BoxLayout, BracketPlan, LegendEntries
 from .plot_utils import (
     box_mean_plot,
+    box_stats_plot,
+    get_box_layout,
     get_boxwidth,
     get_boxcenter_x,
     add_brackets_for_boxplot,
+    add_auto_brackets_for_boxplot,
+    compile_brackets,
+    apply_bracket_plan,
     plot_bracket,
     get_graph_area,
     check_bracket,
     line_mean_sd_plot,
     line_group_coloring_plot,
 )
+from .plot_stats import (
+    calc_box_stats,
+    calc_series_stats,
+    calc_series_band,
+    SeriesStatsAccumulator,
+    StatsCache,
+    GroupDescribeAccumulator,
+    pairwise_tests,
+    adjust_p_values,
+    p_to_mark,
+)
+from .plot_decimate import decimate_indices, lttb_indices, minmax_indices
 from .plot_describe import (
     single_describe,
     series_describe,
+    streaming_describe,
+    batch_describe,
+    save_batch_describe,
+    load_batch_describe,
 )
 from .plot_config import configure_ax
+from .plot_render import render_figure, render_figures
 
 __all__ = [
     "FLIERPROPS_DEFAULTS",
     "SWARMPLOT_DEFAULTS",
     "PLOT_DEFAULTS",
     "TrendPlots",
+    "BoxLayout",
+    "BracketPlan",
+    "LegendEntries",
     "box_mean_plot",
+    "box_stats_plot",
+    "get_box_layout",
     "get_boxwidth",
     "get_boxcenter_x",
     "add_brackets_for_boxplot",
+    "add_auto_brackets_for_boxplot",
+    "compile_brackets",
+    "apply_bracket_plan",
     "plot_bracket",
     "get_graph_area",
     "check_bracket",
     "line_mean_sd_plot",
     "line_group_coloring_plot",
+    "calc_box_stats",
+    "calc_series_stats",
+    "calc_series_band",
+    "SeriesStatsAccumulator",
+    "StatsCache",
+    "GroupDescribeAccumulator",
+    "pairwise_tests",
+    "adjust_p_values",
+    "p_to_mark",
+    "decimate_indices",
+    "lttb_indices",
+    "minmax_indices",
     "single_describe",
     "series_describe",
+    "streaming_describe",
+    "batch_describe",
+    "save_batch_describe",
+    "load_batch_describe",
     "configure_ax",
+    "render_figure",
+    "render_figures",
 ]
 
 if __name__ == "__main__":